@@ -0,0 +1,60 @@
+"""
+Benchmarks adding relationships to a Graph one at a time and in one batch.
+A fifth of the relationships are duplicates, which both ways leave out.
+
+Run from the root of the repository: python -m benchmarks.add_relationships [number of relationships]
+"""
+
+import gc
+import sys
+import time
+
+import tisane as ts
+from tisane.graph import Graph
+from tisane.variable import Associates, Causes, Exactly, Has
+
+
+# @returns @param n_relationships relationships among measures of 100 units, of which a fifth are duplicate has relationships
+def make_relationships(n_relationships: int) -> list:
+    n_measures = n_relationships // 5
+    units = [ts.Unit(f"Unit_{i}") for i in range(100)]
+    measures = [ts.Unit("Unit").numeric(f"Measure_{i}") for i in range(n_measures)]
+    relationships = list()
+    for (i, m) in enumerate(measures):
+        unit = units[i % len(units)]
+        relationships.append(Has(variable=unit, measure=m, repetitions=Exactly(1)))
+        relationships.append(Causes(m, measures[(i + 1) % n_measures]))
+        relationships.append(Associates(m, measures[(i + 7) % n_measures]))
+        relationships.append(Causes(m, measures[(i + 13) % n_measures]))
+        relationships.append(Has(variable=unit, measure=m, repetitions=Exactly(1)))
+    return relationships
+
+
+# @returns seconds taken by @param add to add @param relationships to a new Graph, and the number of edges added
+def time_adding(add, relationships: list):
+    # Time each way on its own, without the garbage collector walking the other's graph
+    gc.collect()
+    gr = Graph()
+    start = time.perf_counter()
+    add(gr, relationships)
+    elapsed = time.perf_counter() - start
+    return (elapsed, len(gr.get_edges()))
+
+
+def add_one_at_a_time(gr: Graph, relationships: list):
+    for r in relationships:
+        gr.add_relationship(r)
+
+
+def main(n_relationships: int):
+    relationships = make_relationships(n_relationships)
+    (one_at_a_time, n_edges) = time_adding(add_one_at_a_time, relationships)
+    (batch, n_batch_edges) = time_adding(Graph.add_relationships, relationships)
+    assert n_batch_edges == n_edges
+    print(
+        f"{len(relationships)} relationships ({n_edges} edges): one at a time {one_at_a_time:.2f}s, in one batch {batch:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
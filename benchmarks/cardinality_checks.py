@@ -0,0 +1,42 @@
+"""
+Benchmarks assigning data to a wide design, which computes every variable's
+cardinality and categories from the data and checks them against the design.
+
+Run from the root of the repository: python -m benchmarks.cardinality_checks [number of columns] [number of rows]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import tisane as ts
+
+
+# @returns design with a unit, a numeric dependent variable, and @param n_columns - 2 nominal measures,
+# and data for it with @param n_rows rows, one per unit
+def make_design_and_data(n_columns: int, n_rows: int):
+    rng = np.random.default_rng(0)
+    unit = ts.Unit("Unit")
+    measures = [unit.nominal(f"Measure_{i}") for i in range(n_columns - 2)]
+    dv = unit.numeric("Dependent_variable")
+    df = pd.DataFrame(
+        {f"Measure_{i}": rng.integers(0, 10, n_rows) for i in range(n_columns - 2)}
+    )
+    df["Unit"] = np.arange(n_rows)
+    df["Dependent_variable"] = rng.random(n_rows)
+    return (ts.Design(dv=dv, ivs=measures), df)
+
+
+def main(n_columns: int, n_rows: int):
+    (design, df) = make_design_and_data(n_columns, n_rows)
+    start = time.perf_counter()
+    design.assign_data(df)
+    elapsed = time.perf_counter() - start
+    print(f"{n_columns} columns x {n_rows} rows: assign_data {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    arguments = [int(n) for n in sys.argv[1:]]
+    main(*(arguments + [500, 200000][len(arguments) :]))
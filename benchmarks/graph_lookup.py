@@ -0,0 +1,53 @@
+"""
+Benchmarks building a design and inferring its model candidates as the number of variables grows.
+Looking variables up by name should keep the time growing roughly linearly with the number of variables.
+
+Run from the root of the repository: python -m benchmarks.graph_lookup [number of variables ...]
+"""
+
+import sys
+import time
+
+import tisane as ts
+from tisane.graph_inference import (
+    infer_main_effects_with_explanations,
+    infer_interaction_effects_with_explanations,
+    infer_random_effects_with_explanations,
+)
+
+
+# @returns design with @param n_variables measures of one unit, each causing the dependent variable
+# Every other measure is associated with the one before it
+def make_design(n_variables: int, n_ivs: int = 5) -> ts.Design:
+    unit = ts.Unit("Unit")
+    dv = unit.numeric("Dependent_variable")
+    measures = [unit.numeric(f"Measure_{i}") for i in range(n_variables)]
+    for (i, m) in enumerate(measures):
+        m.causes(dv)
+        if i % 2 == 1:
+            measures[i - 1].associates_with(m)
+    return ts.Design(dv=dv, ivs=measures[:n_ivs])
+
+
+def main(sizes):
+    for n_variables in sizes:
+        start = time.perf_counter()
+        design = make_design(n_variables)
+        built = time.perf_counter()
+        # The inference rules, without family and link functions, which do not use the graph
+        gr = design.graph
+        (main_effects, _) = infer_main_effects_with_explanations(gr, design)
+        (interaction_effects, _) = infer_interaction_effects_with_explanations(
+            gr, design, list(main_effects)
+        )
+        infer_random_effects_with_explanations(
+            gr, design, list(main_effects), interaction_effects
+        )
+        inferred = time.perf_counter()
+        print(
+            f"{n_variables} variables: design {built - start:.2f}s, inference {inferred - built:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1250, 2500, 5000])
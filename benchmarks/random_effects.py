@@ -0,0 +1,58 @@
+"""
+Benchmarks random-effects inference for many interactions, which classifies
+every measure in them as varying within or between its unit.
+
+Run from the root of the repository: python -m benchmarks.random_effects [number of measures] [number of interactions] [number of runs]
+"""
+
+import itertools
+import sys
+import time
+
+import tisane as ts
+from tisane.graph_inference import (
+    infer_interaction_effects_with_explanations,
+    infer_random_effects_with_explanations,
+)
+
+
+# @returns design with @param n_measures measures of a participant, every other one repeated within participants,
+# and @param n_interactions pairs of measures that moderate each other's effect on the dependent variable
+def make_design(n_measures: int, n_interactions: int) -> ts.Design:
+    participant = ts.Unit("Participant", cardinality=100)
+    condition = ts.SetUp("Condition", order=[1, 2], cardinality=2)
+    dv = participant.numeric("Dependent_variable", number_of_instances=condition)
+    measures = [
+        participant.nominal(
+            f"Measure_{i}", cardinality=2, number_of_instances=(2 if i % 2 else 1)
+        )
+        for i in range(n_measures)
+    ]
+    for m in measures:
+        m.causes(dv)
+    pairs = itertools.islice(itertools.combinations(measures, 2), n_interactions)
+    for (a, b) in pairs:
+        a.moderates(moderator=b, on=dv)
+    return ts.Design(dv=dv, ivs=measures)
+
+
+def main(n_measures: int, n_interactions: int, n_runs: int):
+    design = make_design(n_measures, n_interactions)
+    main_effects = list(design.ivs)
+    (interaction_effects, _) = infer_interaction_effects_with_explanations(
+        design.graph, design, main_effects
+    )
+    start = time.perf_counter()
+    for _ in range(n_runs):
+        infer_random_effects_with_explanations(
+            design.graph, design, main_effects, interaction_effects
+        )
+    elapsed = time.perf_counter() - start
+    print(
+        f"{n_measures} measures, {len(interaction_effects)} interactions: random effects {elapsed:.3f}s for {n_runs} runs"
+    )
+
+
+if __name__ == "__main__":
+    arguments = [int(n) for n in sys.argv[1:]]
+    main(*(arguments + [50, 200, 50][len(arguments) :]))
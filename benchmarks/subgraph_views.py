@@ -0,0 +1,48 @@
+"""
+Benchmarks main-effects inference, which filters the graph into causal and
+conceptual subgraphs while it searches for ancestors of the dependent variable.
+Reports the wall-clock time and the peak memory allocated during inference.
+
+Run from the root of the repository: python -m benchmarks.subgraph_views [number of measures] [number of IVs]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import tisane as ts
+from tisane.graph_inference import infer_main_effects_with_explanations
+
+
+# @returns design with @param n_measures measures of one unit, each causing the dependent variable,
+# and the first @param n_ivs of them as independent variables
+# Every other measure is associated with the one before it, and every tenth is caused by the measure two before it
+def make_design(n_measures: int, n_ivs: int) -> ts.Design:
+    unit = ts.Unit("Unit")
+    dv = unit.numeric("Dependent_variable")
+    measures = [unit.numeric(f"Measure_{i}") for i in range(n_measures)]
+    for (i, m) in enumerate(measures):
+        m.causes(dv)
+        if i % 2 == 1:
+            measures[i - 1].associates_with(m)
+        if i >= 2 and i % 10 == 0:
+            measures[i - 2].causes(m)
+    return ts.Design(dv=dv, ivs=measures[:n_ivs])
+
+
+def main(n_measures: int, n_ivs: int):
+    design = make_design(n_measures, n_ivs)
+    tracemalloc.start()
+    start = time.perf_counter()
+    infer_main_effects_with_explanations(design.graph, design)
+    elapsed = time.perf_counter() - start
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{n_measures} measures, {n_ivs} IVs: main effects {elapsed:.2f}s, peak {peak / 2**20:.1f}MiB"
+    )
+
+
+if __name__ == "__main__":
+    arguments = [int(n) for n in sys.argv[1:]]
+    main(*(arguments + [1000, 50][len(arguments) :]))
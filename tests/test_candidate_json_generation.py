@@ -2,7 +2,8 @@ from tisane.random_effects import RandomIntercept, RandomSlope
 from unittest import main
 from tisane.variable import Measure
 import tisane as ts
-from tisane.main import collect_model_candidates, collect_model_candidates
+from tisane.main import collect_model_candidates, write_data_columns
+from tisane.data import summarize_data
 from tisane.graph_inference import (
     infer_interaction_effects_with_explanations,
     infer_random_effects_with_explanations,
@@ -12,6 +13,10 @@ from tisane.graph_inference import (
 )
 from tisane.family_link_inference import infer_family_functions, infer_link_functions
 
+import numpy as np
+import pandas as pd
+import tempfile
+import json
 import unittest
 
 
@@ -675,5 +680,35 @@ class CandidateJSONGenerationTest(unittest.TestCase):
                 name_key = f"{re.groups.name}, {re.iv.name}, {type(re).__name__}"
             self.assertIn(name_key, random_explanations.keys())
 
+    def test_data_summaries_and_columns(self):
+        df = pd.DataFrame(
+            {
+                "count": [0, 1, 2, 2, None],
+                "score": [1.5, 2.5, 3.0, 4.0, 5.0],
+                "group": ["a", "b", "a", "b", "a"],
+            }
+        )
+
+        summary = summarize_data(df)
+        # Summaries can be written out to JSON
+        json.dumps(summary)
+        self.assertEqual(summary["count"]["count"], 4)
+        self.assertEqual(summary["count"]["missing"], 1)
+        self.assertTrue(summary["count"]["non-negative integers"])
+        self.assertFalse(summary["score"]["non-negative integers"])
+        self.assertAlmostEqual(summary["score"]["mean"], df["score"].mean())
+        self.assertAlmostEqual(summary["score"]["std"], df["score"].std())
+        histogram = summary["score"]["histogram"]
+        self.assertEqual(sum(histogram["counts"]), 5)
+        self.assertEqual(len(histogram["bin edges"]), len(histogram["counts"]) + 1)
+        self.assertEqual(summary["group"], {"count": 5, "missing": 0, "unique": 2})
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            paths = write_data_columns(df, output_dir)
+            # Only numeric columns are written out
+            self.assertSetEqual(set(paths.keys()), {"count", "score"})
+            values = np.load(paths["score"], mmap_mode="r")
+            self.assertListEqual(values.tolist(), df["score"].tolist())
+
     # TODO: Check that the explanations are correct
     # TODO: Add tests from effects infrence helpers that put all these together
@@ -341,3 +341,43 @@ class ConstructStatisticalModelTest(unittest.TestCase):
         self.assertIn(family, family_link_paired.keys())
         link = sm.link_function
         self.assertIn(link, family_link_paired[family])
+
+    def test_construct_from_selection_without_files(self):
+        u0 = ts.Unit("Unit")
+        m0 = u0.numeric("Measure_0")
+        m1 = u0.numeric("Measure_1")
+        dv = u0.nominal("Dependent_variable", cardinality=2)
+        m0.causes(dv)
+        m1.associates_with(dv)
+
+        design = ts.Design(dv=dv, ivs=[m0, m1])
+
+        files_before = set(os.listdir(os.getcwd()))
+        candidates = ts.infer_model_candidates(design)
+        self.assertEqual(candidates.main_effects, {m0, m1})
+        self.assertEqual(candidates.interaction_effects, set())
+        self.assertIn(m0.name, candidates.explanations)
+        candidates_dict = candidates.to_dict()
+        self.assertCountEqual(
+            candidates_dict["input"]["generated main effects"], [m0.name, m1.name]
+        )
+        self.assertEqual(candidates_dict["input"]["dv type"], "Nominal")
+        self.assertNotIn("data", candidates_dict["input"])
+
+        # The selection has the same format as the model spec output by the GUI
+        selection = {
+            "dependent variable": dv.name,
+            "family": "BinomialFamily",
+            "interaction effects": [],
+            "link": "LogitLink",
+            "main effects": [m0.name],
+            "random effects": {},
+        }
+        sm = ts.construct_statistical_model_from_selection(candidates, selection)
+        self.assertEqual(design.dv, sm.dependent_variable)
+        self.assertEqual({m0}, sm.main_effects)
+        self.assertEqual(set(), sm.random_effects)
+        self.assertEqual(type(sm.family_function).__name__, "BinomialFamily")
+        self.assertEqual(type(sm.link_function).__name__, "LogitLink")
+        # Nothing was written out
+        self.assertEqual(files_before, set(os.listdir(os.getcwd())))
@@ -0,0 +1,416 @@
+"""
+Tests loading data and computing the statistics that designs are checked against.
+"""
+
+import tisane as ts
+from tisane.data_cache import StatisticsCache
+from tisane.data import (
+    CardinalitySketch,
+    DataVector,
+    Dataset,
+    SQLDataset,
+    StreamingDataset,
+    get_file_format,
+)
+import numpy as np
+import pandas as pd
+import importlib.util
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+
+class DataTest(unittest.TestCase):
+    # Temporary directory for the files written by a test, removed after the test
+    output_dir: str
+    # Two rows for each of three units, with the columns of make_condition_design
+    condition_df: pd.DataFrame
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        self.condition_df = pd.DataFrame(
+            {
+                "Unit": [1, 1, 2, 2, 3, 3],
+                "Condition": ["A", "A", "B", "B", "C", "C"],
+                "Dependent_variable": [0.5, 1.5, 2.5, 3.5, 4.5, 5.5],
+            }
+        )
+
+    # @returns design with a Unit, its nominal Condition, and a numeric Dependent_variable with @param number_of_instances per unit
+    def make_condition_design(self, number_of_instances=1, **kwargs) -> ts.Design:
+        unit = ts.Unit("Unit")
+        condition = unit.nominal("Condition")
+        dv = unit.numeric("Dependent_variable", number_of_instances=number_of_instances)
+        return ts.Design(dv=dv, ivs=[condition], **kwargs)
+
+    # @returns path of @param file_name in the test's output directory, with @param df written to it
+    # The format of the file is chosen by its extension
+    def write_data(self, df: pd.DataFrame, file_name: str = "data.csv") -> str:
+        path = os.path.join(self.output_dir, file_name)
+        file_format = get_file_format(path)
+        if file_format == "parquet":
+            df.to_parquet(path)
+        elif file_format == "feather":
+            df.to_feather(path)
+        else:
+            df.to_csv(path, index=False)
+        return path
+
+    def test_unique_values_computed_once_per_column(self):
+        df = pd.DataFrame({"Nominal_variable": ["A", "B", "A"]})
+        data = Dataset(source=df)
+
+        unique_values = data.get_unique_values("Nominal_variable")
+        self.assertListEqual(unique_values.tolist(), ["A", "B"])
+        self.assertIs(data.get_unique_values("Nominal_variable"), unique_values)
+
+    def test_load_only_design_columns_from_csv(self):
+        unit = ts.Unit("Unit")
+        week = ts.SetUp("Week")
+        condition = unit.nominal("Condition", categories=["A", "B"])
+        dv = unit.numeric("Dependent_variable", number_of_instances=week)
+
+        df = pd.DataFrame(
+            {
+                "Unit": [1, 1, 2, 2],
+                "Week": ["w1", "w2", "w1", "w2"],
+                "Condition": ["A", "A", "B", "B"],
+                "Dependent_variable": [0.5, 1.5, 2.5, 3.5],
+                "Unused": ["x", "y", "z", "w"],
+            }
+        )
+        design = ts.Design(dv=dv, ivs=[condition]).assign_data(self.write_data(df))
+
+        data = design.get_data()
+        self.assertSetEqual(
+            set(data.columns), {"Unit", "Week", "Condition", "Dependent_variable"}
+        )
+        self.assertEqual(data["Condition"].dtype, "category")
+        self.assertEqual(data["Week"].dtype, "category")
+        self.assertEqual(data["Unit"].dtype, "int8")
+        self.assertEqual(data["Dependent_variable"].dtype, "float64")
+        self.assertEqual(condition.get_cardinality(), 2)
+
+    def test_streaming_dataset_matches_in_memory(self):
+        # A fourth unit with one row and a missing condition, and a missing value of the dependent variable
+        df = pd.concat(
+            [
+                self.condition_df,
+                pd.DataFrame(
+                    {"Unit": [4], "Condition": [None], "Dependent_variable": [6.0]}
+                ),
+            ],
+            ignore_index=True,
+        )
+        df.loc[5, "Dependent_variable"] = None
+        design = self.make_condition_design(2).assign_data(
+            self.write_data(df), chunksize=3
+        )
+        data = design.dataset
+        self.assertIsInstance(data, StreamingDataset)
+        self.assertIsNone(design.get_data())
+
+        self.assertEqual(data.get_length(), 7)
+        self.assertEqual(design.graph.get_variable("Unit").get_cardinality(), 4)
+        # A, B, C, and missing
+        self.assertEqual(design.graph.get_variable("Condition").get_cardinality(), 4)
+        self.assertDictEqual(
+            data.get_row_counts("Unit").to_dict(), {1: 2, 2: 2, 3: 2, 4: 1}
+        )
+
+        summary = data.get_summary()["Dependent_variable"]
+        expected = Dataset(df).get_summary()["Dependent_variable"]
+        self.assertEqual(summary["count"], expected["count"])
+        self.assertEqual(summary["missing"], expected["missing"])
+        self.assertAlmostEqual(summary["mean"], expected["mean"])
+        self.assertAlmostEqual(summary["std"], expected["std"])
+        self.assertEqual(summary["min"], expected["min"])
+        self.assertEqual(summary["max"], expected["max"])
+
+        # Observed combinations are found by reading the file again
+        combinations = data.get_observed_combinations(["Unit", "Condition"])
+        self.assertEqual(len(combinations), 4)
+
+    def test_approximate_unit_cardinality(self):
+        ids = pd.Series(np.arange(20000))
+        sketch = CardinalitySketch(0.02).add(ids)
+        self.assertTrue(sketch.is_within_error(20000))
+        self.assertAlmostEqual(sketch.estimate(), 20000, delta=3 * 0.02 * 20000)
+        # Sketches of parts of a column merge into a sketch of the whole column
+        merged = CardinalitySketch(0.02).add(ids[:12000])
+        merged.merge(CardinalitySketch(0.02).add(ids[8000:]))
+        self.assertEqual(merged.estimate(), sketch.estimate())
+
+        unit = ts.Unit("Unit", cardinality=20001)
+        condition = unit.nominal("Condition")
+        dv = unit.numeric("Dependent_variable")
+        df = pd.DataFrame(
+            {
+                "Unit": ids,
+                "Condition": np.where(ids % 2 == 0, "A", "B"),
+                "Dependent_variable": np.zeros(len(ids)),
+            }
+        )
+        # Exact counts report the mismatch
+        with self.assertRaises(ValueError):
+            ts.Design(dv=dv, ivs=[condition]).assign_data(df)
+        # Approximate counts cannot tell 20000 and 20001 apart
+        with self.assertWarns(UserWarning):
+            ts.Design(dv=dv, ivs=[condition], approximate_cardinality=0.02).assign_data(
+                df
+            )
+
+        design = self.make_condition_design(approximate_cardinality=0.02).assign_data(
+            self.write_data(df), chunksize=5000
+        )
+        # Only a sketch of the ids is kept while reading the file
+        with self.assertRaises(ValueError):
+            design.dataset.get_unique_values("Unit")
+        self.assertEqual(
+            design.graph.get_variable("Unit").get_cardinality(), sketch.estimate()
+        )
+
+    def test_column_statistics_cache(self):
+        df = self.condition_df
+        path = self.write_data(df)
+        cache_dir = os.path.join(self.output_dir, "cache")
+
+        def make_design():
+            return self.make_condition_design(2).assign_data(
+                path, chunksize=4, cache_dir=cache_dir
+            )
+
+        summary = make_design().dataset.get_summary()
+
+        # The file is unchanged, so it is not read again
+        with patch.object(StreamingDataset, "_read_chunks", side_effect=AssertionError):
+            design = make_design()
+        self.assertDictEqual(design.dataset.get_summary(), summary)
+        self.assertEqual(design.dataset.get_length(), 6)
+
+        # Changing the file changes its fingerprint
+        pd.concat([df, df.iloc[[0]].assign(Unit=4)]).to_csv(path, index=False)
+        with self.assertWarns(UserWarning):
+            design = make_design()
+        self.assertEqual(design.dataset.get_length(), 7)
+        self.assertEqual(len(design.dataset.get_unique_values("Unit")), 4)
+
+        # The least recently used entries are evicted first
+        cache = StatisticsCache(os.path.join(self.output_dir, "small"), max_size=100)
+        cache.store("a", "x" * 60)
+        cache.store("b", "y" * 60)
+        self.assertIsNone(cache.load("a"))
+        self.assertEqual(cache.load("b"), "y" * 60)
+
+        # An entry that cannot be unpickled is removed
+        with open(cache._get_entry_path("b"), "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(cache.load("b"))
+        self.assertFalse(os.path.exists(cache._get_entry_path("b")))
+
+        # A value that cannot be pickled leaves no temporary file behind
+        with self.assertRaises(Exception):
+            cache.store("c", lambda: None)
+        self.assertListEqual(os.listdir(cache.directory), [])
+
+    def test_data_vector_encoding(self):
+        df = pd.DataFrame(
+            {
+                "Condition": ["B", "A", None, "B", "C"],
+                "Score": [1.0, 2.5, np.nan, 4.0, 5.0],
+            }
+        )
+        data = Dataset(df)
+        condition = data.get_vector("Condition")
+        # Each column is encoded once and shared
+        self.assertIs(data.get_vector("Condition"), condition)
+        # get_column still returns the column itself
+        self.assertIsInstance(data.get_column("Condition"), pd.Series)
+        self.assertIs(data.get_column("Condition"), condition.column)
+        self.assertListEqual(condition.get_codes().tolist(), [0, 1, 2, 0, 3])
+        self.assertEqual(condition.get_cardinality(), 4)  # B, A, missing, and C
+        self.assertEqual(condition.get_missing_code(), 2)
+        self.assertIs(data.get_unique_values("Condition"), condition.get_categories())
+        self.assertEqual(data.get_summary()["Condition"]["unique"], 3)
+
+        # Categorical columns (e.g., loaded from a CSV with compact dtypes) are encoded the same way
+        categorical_data = Dataset(
+            df.assign(
+                Condition=df["Condition"].astype("category"),
+                Group=pd.Categorical([2, 1, None, 2, 3]),
+            )
+        )
+        categorical = categorical_data.get_vector("Condition")
+        self.assertListEqual(categorical.get_codes().tolist(), [0, 1, 2, 0, 3])
+        self.assertEqual(categorical.get_missing_code(), 2)
+        self.assertEqual(list(categorical.get_categories()[[0, 1, 3]]), ["B", "A", "C"])
+        group = categorical_data.get_vector("Group")
+        self.assertListEqual(group.get_codes().tolist(), [0, 1, 2, 0, 3])
+        self.assertEqual(group.get_missing_code(), 2)
+        self.assertEqual(categorical_data.get_summary()["Group"]["unique"], 3)
+        # Finding the categories first, then the codes, gives the same encoding
+        for column in [df["Condition"], categorical_data.dataset["Group"]]:
+            vector = DataVector(column.name, column)
+            self.assertEqual(vector.get_cardinality(), 4)
+            self.assertEqual(vector.get_missing_code(), 2)
+            self.assertListEqual(vector.get_codes().tolist(), [0, 1, 2, 0, 3])
+
+        score = data.get_vector("Score")
+        self.assertTrue(score.is_numeric())
+        self.assertFalse(condition.is_numeric())
+        # Float columns are not copied
+        self.assertTrue(np.shares_memory(score.get_values(), df["Score"].values))
+        self.assertEqual(data.get_summary()["Score"]["count"], 4)
+        self.assertAlmostEqual(data.get_summary()["Score"]["mean"], 3.125)
+
+    def test_sql_dataset_matches_in_memory(self):
+        df = pd.DataFrame(
+            {
+                "Student": [1, 1, 2, 2, 3, 3],
+                "School": ["s1", "s1", "s1", "s1", "s2", None],
+                "Tutoring": ["y", "y", "n", "n", "y", "y"],
+                "Score": [1.0, 2.0, 3.0, 4.0, 5.0, np.nan],
+            }
+        )
+        connection = sqlite3.connect(":memory:")
+        df.to_sql("scores", connection, index=False)
+
+        def make_design():
+            student = ts.Unit("Student")
+            school = ts.Unit("School")
+            student.nests_within(school)
+            tutoring = student.nominal("Tutoring", number_of_instances=1)
+            score = student.numeric("Score", number_of_instances=2)
+            return ts.Design(dv=score, ivs=[tutoring])
+
+        in_memory = Dataset(df)
+        design = make_design().assign_data(connection, table="scores")
+        dataset = design.dataset
+        self.assertIsInstance(dataset, SQLDataset)
+        # The checks are computed by the database, without reading any column
+        self.assertEqual(len(dataset._columns), 0)
+        self.assertEqual(dataset.get_length(), 6)
+        for name in ["Student", "School", "Tutoring"]:
+            self.assertEqual(
+                dataset.get_cardinality(name), in_memory.get_cardinality(name)
+            )
+            self.assertCountEqual(
+                pd.Series(dataset.get_unique_values(name)).astype(str),
+                pd.Series(in_memory.get_unique_values(name)).astype(str),
+            )
+        self.assertEqual(
+            dataset.get_row_counts("Student").to_dict(),
+            in_memory.get_row_counts("Student").to_dict(),
+        )
+        self.assertEqual(
+            dataset.get_unique_counts_per("Student", ["School", "Score"]).to_dict(),
+            in_memory.get_unique_counts_per("Student", ["School", "Score"]).to_dict(),
+        )
+        self.assertEqual(design.graph.get_variable("School").cardinality, 3)
+
+        # Columns are read when their values are needed
+        self.assertEqual(dataset.get_summary(), in_memory.get_summary())
+        self.assertTrue(dataset.get_data().astype(object).equals(df.astype(object)))
+
+        # A student in two schools
+        connection.execute("UPDATE scores SET School = 's2' WHERE Score = 2.0")
+        with self.assertRaises(ValueError) as context:
+            make_design().assign_data(connection, table="scores")
+        self.assertIn("Student = 1 belongs to 2", str(context.exception))
+        with self.assertRaises(ValueError):
+            make_design().assign_data(connection)
+
+    def test_get_file_format(self):
+        self.assertEqual(get_file_format("path/to/data.csv"), "csv")
+        self.assertEqual(get_file_format("path/to/data.parquet"), "parquet")
+        self.assertEqual(get_file_format("path/to/data.PQ"), "parquet")
+        self.assertEqual(get_file_format("path/to/data.feather"), "feather")
+        self.assertEqual(get_file_format("path/to/data.arrow"), "feather")
+        self.assertIsNone(Dataset(pd.DataFrame({"a": [1]})).get_data_format())
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "requires pyarrow")
+    def test_columnar_file_matches_csv(self):
+        df = self.condition_df.assign(Unused=0)
+        for file_name in ["data.parquet", "data.feather"]:
+            with self.subTest(file_name=file_name):
+                path = self.write_data(df, file_name)
+                design = self.make_condition_design(2).assign_data(path)
+                # Only the columns in the design are read
+                self.assertNotIn("Unused", design.get_data().columns)
+                self.assertEqual(design.graph.get_variable("Unit").get_cardinality(), 3)
+                self.assertEqual(
+                    design.graph.get_variable("Condition").get_cardinality(), 3
+                )
+
+                design = self.make_condition_design(2).assign_data(path, chunksize=4)
+                self.assertEqual(design.dataset.get_length(), 6)
+                self.assertEqual(design.graph.get_variable("Unit").get_cardinality(), 3)
+
+    def test_interaction_observed_combinations(self):
+        unit = ts.Unit("Unit")
+        a = unit.nominal("A", cardinality=3)
+        b = unit.nominal("B", cardinality=3)
+        x = unit.numeric("X")
+        dv = unit.numeric("Dependent_variable")
+        a.moderates([b, x], on=dv)
+
+        df = pd.DataFrame(
+            {
+                "Unit": [1, 2, 3, 4, 5],
+                "A": ["a1", "a1", "a2", "a3", "a2"],
+                "B": ["b1", "b1", "b2", "b3", "b2"],
+                "X": [0.1, 0.2, 0.3, 0.4, 0.5],
+                "Dependent_variable": [100, 100, 100, 100, 100],
+            }
+        )
+        data = Dataset(source=df)
+
+        combinations = data.get_observed_combinations(["A", "B"])
+        self.assertListEqual(combinations["A"].tolist(), ["a1", "a2", "a3"])
+        self.assertListEqual(combinations["B"].tolist(), ["b1", "b2", "b3"])
+
+        design = ts.Design(dv=dv, ivs=[a, b, x])
+        interaction = design.graph.get_interaction([a, b, x])
+        # By default, every combination of the moderators' categories is counted
+        self.assertEqual(interaction.calculate_cardinality_from_data(data), 9)
+        self.assertEqual(
+            interaction.calculate_cardinality_from_data(data, observed=True), 3
+        )
+        self.assertListEqual(
+            interaction.calculate_categories_from_data(data, observed=True),
+            ["a1.b1", "a2.b2", "a3.b3"],
+        )
+
+        design = ts.Design(dv=dv, ivs=[a, b, x], observed_interactions=True)
+        design.assign_data(df)
+        interaction = design.graph.get_interaction([a, b, x])
+        self.assertEqual(interaction.get_cardinality(), 3)
+        self.assertListEqual(interaction.get_categories(), ["a1.b1", "a2.b2", "a3.b3"])
+
+        # Numeric moderators are left out of the labels in both modes, wherever they appear
+        z = unit.numeric("Z")
+        x.moderates([a], on=dv)
+        x.moderates([z], on=dv)
+        design = ts.Design(dv=dv, ivs=[a, x, z])
+        interaction = design.graph.get_interaction([x, a])
+        for observed in [False, True]:
+            self.assertListEqual(
+                list(interaction.calculate_categories_from_data(data, observed)),
+                ["a1", "a2", "a3"],
+            )
+            self.assertEqual(
+                interaction.calculate_cardinality_from_data(data, observed), 3
+            )
+        numeric_interaction = design.graph.get_interaction([x, z])
+        for observed in [False, True]:
+            self.assertListEqual(
+                numeric_interaction.calculate_categories_from_data(data, observed),
+                [""],
+            )
+            self.assertEqual(
+                numeric_interaction.calculate_cardinality_from_data(data, observed), 1
+            )
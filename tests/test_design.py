@@ -0,0 +1,228 @@
+"""
+Tests checking and updating designs against their data.
+"""
+
+import tisane as ts
+from tisane.variable import Nominal, Ordinal, Numeric
+import pandas as pd
+import unittest
+
+
+class DesignTest(unittest.TestCase):
+    def test_cardinality_mismatches_reported_together(self):
+        unit = ts.Unit("Unit", cardinality=2)
+        nominal = unit.nominal("Nominal_variable", categories=["A", "B"])
+        ordinal = unit.ordinal("Ordinal_variable", order=[1, 2])
+        dv = unit.numeric("Dependent_variable")
+
+        df = pd.DataFrame(
+            {
+                "Unit": [1, 2, 3],
+                "Nominal_variable": ["A", "B", "C"],
+                "Ordinal_variable": [1, 2, 3],
+                "Dependent_variable": [100, 100, 100],
+            }
+        )
+
+        with self.assertRaises(ValueError) as context:
+            ts.Design(dv=dv, ivs=[nominal, ordinal]).assign_data(df)
+        message = str(context.exception)
+        self.assertIn("Unit Unit", message)
+        self.assertIn("Variable Nominal_variable", message)
+        self.assertIn("Variable Ordinal_variable", message)
+
+    def test_check_nesting_and_number_of_instances(self):
+        df = pd.DataFrame(
+            {
+                "Student": [1, 1, 2, 2, 3, 3, 4],
+                "School": ["s1", "s1", "s1", "s1", "s2", "s2", "s2"],
+                "Week": [1, 2, 1, 2, 1, 2, 1],
+                "Tutoring": ["y", "y", "n", "n", "y", "y", "n"],
+                "Score": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0],
+            }
+        )
+
+        def make_design(data: pd.DataFrame):
+            student = ts.Unit("Student")
+            school = ts.Unit("School")
+            student.nests_within(school)
+            week = ts.SetUp("Week", cardinality=2)
+            tutoring = student.nominal("Tutoring", number_of_instances=1)
+            score = student.numeric("Score", number_of_instances=week)
+            return ts.Design(dv=score, ivs=[tutoring]).assign_data(data)
+
+        design = make_design(df)
+        self.assertEqual(design.dataset.get_row_counts("Student")[4], 1)
+
+        # A student in two schools, and a student tutored in one week but not the other
+        wrong = df.copy()
+        wrong.loc[1, "School"] = "s2"
+        wrong.loc[3, "Tutoring"] = "y"
+        with self.assertRaises(ValueError) as context:
+            make_design(wrong)
+        message = str(context.exception)
+        self.assertIn("Student = 1 belongs to 2", message)
+        self.assertIn("Student = 2 has 2 different values of Tutoring", message)
+
+        # More weeks per student than the week has values
+        wrong = pd.concat([df, df.iloc[[0]].assign(Week=3)], ignore_index=True)
+        with self.assertRaises(ValueError):
+            make_design(wrong)
+
+        # Fewer rows than an exact number of instances only warns
+        unit = ts.Unit("Student")
+        score = unit.numeric("Score", number_of_instances=2)
+        with self.assertWarns(UserWarning):
+            ts.Design(dv=score, ivs=[]).assign_data(df)
+
+    def test_parallel_cardinality_checks_match_sequential(self):
+        df = pd.DataFrame(
+            {f"Measure_{i}": [j % (i + 2) for j in range(20)] for i in range(12)}
+        )
+        df["Unit"] = range(20)
+        df["Dependent_variable"] = 0.0
+
+        def check(n_workers: int):
+            unit = ts.Unit("Unit")
+            # Every other measure has fewer categories than in the data
+            measures = [
+                unit.nominal(f"Measure_{i}", cardinality=i + 2 - (i % 2))
+                for i in range(12)
+            ]
+            dv = unit.numeric("Dependent_variable")
+            with self.assertRaises(ValueError) as context:
+                ts.Design(dv=dv, ivs=measures).assign_data(df, n_workers=n_workers)
+            return str(context.exception)
+
+        sequential = check(None)
+        self.assertEqual(len(sequential.split("\n")), 6)
+        self.assertEqual(check(4), sequential)
+
+    def test_append_data(self):
+        df = pd.DataFrame(
+            {
+                "Student": [1, 1, 2, 2],
+                "School": ["s1", "s1", "s2", "s2"],
+                "Tutoring": ["y", "y", "n", "n"],
+                "Score": [1.0, 2.0, 3.0, 4.0],
+            }
+        )
+        batch = pd.DataFrame(
+            {
+                "Student": [3, 3],
+                "School": ["s1", "s1"],
+                "Tutoring": ["maybe", "maybe"],
+                "Score": [5.0, 6.0],
+            }
+        )
+
+        def make_design(data: pd.DataFrame):
+            student = ts.Unit("Student")
+            school = ts.Unit("School")
+            student.nests_within(school)
+            tutoring = student.nominal("Tutoring", number_of_instances=1)
+            score = student.numeric("Score", number_of_instances=2)
+            return ts.Design(dv=score, ivs=[tutoring]).assign_data(data)
+
+        design = make_design(df)
+        with self.assertWarnsRegex(UserWarning, "of Tutoring .*maybe"):
+            design.append_data(batch)
+        # Calculated cardinalities and categories are updated with the new rows
+        appended = make_design(pd.concat([df, batch], ignore_index=True))
+        student = design.graph.get_variable("Student")
+        tutoring = design.graph.get_variable("Tutoring")
+        self.assertEqual(student.cardinality, 3)
+        self.assertEqual(tutoring.cardinality, 3)
+        self.assertEqual(list(tutoring.categories), ["y", "n", "maybe"])
+        self.assertEqual(design.dataset.get_length(), 6)
+        self.assertTrue(design.dataset.get_data().equals(appended.dataset.get_data()))
+        self.assertEqual(
+            design.dataset.get_row_counts("Student").to_dict(),
+            appended.dataset.get_row_counts("Student").to_dict(),
+        )
+
+        # A student who moved to another school in the new rows
+        with self.assertRaises(ValueError) as context:
+            design.append_data(batch.assign(Student=1, School="s2"))
+        self.assertIn("Student = 1 belongs to 2", str(context.exception))
+
+        with self.assertRaises(ValueError):
+            ts.Design(dv=ts.Unit("Student").numeric("Score"), ivs=[]).append_data(df)
+
+    def test_design_from_schema(self):
+        df = pd.DataFrame(
+            {
+                "Student": [1, 1, 2, 2, 3, 3],
+                "School": ["s1", "s1", "s1", "s1", "s2", "s2"],
+                "Week": [1, 2, 1, 2, 1, 2],
+                "Tutoring": pd.Categorical(
+                    ["y", "y", "n", "n", "y", "y"], categories=["y", "n", "maybe"]
+                ),
+                "Grade": pd.Categorical(
+                    ["A", "A", "B", "B", "A", "A"], categories=["B", "A"], ordered=True
+                ),
+                "Score": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+            }
+        )
+        schema = {
+            "Student": {"type": "unit", "nests_within": "School"},
+            "School": "unit",
+            "Week": {"type": "setup", "cardinality": 2},
+            "Tutoring": {"unit": "Student"},
+            "Grade": {"unit": "Student"},
+            "Score": {"unit": "Student", "number_of_instances": "Week"},
+        }
+        design = ts.Design.from_schema(df, schema, dv="Score")
+
+        tutoring = design.graph.get_variable("Tutoring")
+        self.assertIsInstance(tutoring, Nominal)
+        # Categories come from the categorical column, including ones not in the data
+        self.assertEqual(tutoring.categories, ["y", "n", "maybe"])
+        self.assertEqual(tutoring.cardinality, 3)
+        grade = design.graph.get_variable("Grade")
+        self.assertIsInstance(grade, Ordinal)
+        self.assertEqual(grade.ordered_cat, ["B", "A"])
+        self.assertIsInstance(design.graph.get_variable("Score"), Numeric)
+        self.assertEqual(design.graph.get_variable("Student").cardinality, 3)
+        self.assertCountEqual([v.name for v in design.ivs], ["Tutoring", "Grade"])
+        self.assertTrue(
+            design.graph.has_edge(
+                design.graph.get_variable("Student"),
+                design.graph.get_variable("School"),
+                "nests",
+            )
+        )
+
+        # The same checks as declaring the variables one at a time
+        with self.assertRaises(ValueError):
+            ts.Design.from_schema(
+                df.assign(School=["s1"] * 5 + ["s2"]), schema, dv="Score"
+            )
+        with self.assertRaises(ValueError):
+            ts.Design.from_schema(
+                df, {**schema, "Score": {"type": "numeric"}}, dv="Score"
+            )
+        # References to variables that are not in the schema name the entry and the variable
+        with self.assertRaisesRegex(ValueError, "Student .*District"):
+            ts.Design.from_schema(
+                df,
+                {**schema, "Student": {"type": "unit", "nests_within": "District"}},
+                dv="Score",
+            )
+        with self.assertRaisesRegex(ValueError, "Score .*Day"):
+            ts.Design.from_schema(
+                df,
+                {**schema, "Score": {"unit": "Student", "number_of_instances": "Day"}},
+                dv="Score",
+            )
+        with self.assertRaisesRegex(ValueError, "Attendance"):
+            ts.Design.from_schema(df, schema, dv="Attendance")
+        with self.assertRaisesRegex(ValueError, "Mood"):
+            ts.Design.from_schema(df, schema, dv="Score", ivs=["Tutoring", "Mood"])
+        # An ordinal variable needs an order, or a column to infer it from
+        with self.assertRaisesRegex(ValueError, "Rank"):
+            ts.Design.from_schema(
+                df,
+                {**schema, "Rank": {"type": "ordinal", "unit": "Student"}},
+                dv="Score",
+            )
@@ -337,6 +337,30 @@ class EffectsInferenceTest(unittest.TestCase):
         self.assertIsInstance(ri, RandomIntercept)
         self.assertIs(ri.groups, u1)
 
+    def test_random_nested_only_units_nesting_dv_unit(self):
+        u0 = ts.Unit("Unit 0")
+        u1 = ts.Unit("Unit 1")
+        u2 = ts.Unit("Unit 2")
+        u3 = ts.Unit("Unit 3")
+        dv = u0.numeric("Dependent_variable")
+        m2 = u2.numeric("Measure_2")
+
+        u0.nests_within(u1)
+        # Another nesting chain, which does not include the unit that has the DV
+        u2.nests_within(u3)
+
+        design = ts.Design(dv=dv, ivs=[m2])
+        gr = design.graph
+
+        main_effects = design.ivs
+        (random_effects, random_explanations) = infer_random_effects_with_explanations(
+            gr=gr, query=design, main_effects=main_effects
+        )
+        self.assertEqual(len(random_effects), 1)
+        ri = random_effects.pop()
+        self.assertIsInstance(ri, RandomIntercept)
+        self.assertIs(ri.groups, u1)
+
     # Barr et al. 2013 example
     def test_composed_measures_with_repeats(self):
         subject = ts.Unit("Subject", cardinality=12)
@@ -7,6 +7,7 @@ from tisane.random_effects import RandomIntercept, RandomSlope
 import tisane as ts
 from tisane import graph_inference
 from tisane.graph_inference import (
+    CausalAncestors,
     cast_to_variables,
     construct_random_effects_for_composed_measures,
     construct_random_effects_for_nests,
@@ -15,6 +16,7 @@ from tisane.graph_inference import (
     filter_interactions_involving_variables,
     filter_random_candidates,
     find_common_ancestors,
+    find_interactions_for_main_effects,
     find_largest_subset_of_variables_that_vary_within_unit,
     find_variable_causal_ancestors,
     find_all_causal_ancestors,
@@ -576,6 +578,36 @@ class EffectsInferenceHelpersTest(unittest.TestCase):
         )
         self.assertEqual(len(interactions), 0)
 
+    def test_find_interactions_for_main_effects(self):
+        u0 = ts.Unit("Unit")
+        m0 = u0.numeric("Measure")
+        m1 = u0.numeric("Measure_1")
+        m2 = u0.numeric("Measure_2")
+        dv = u0.numeric("Dependent_variable")
+
+        m0.causes(dv)
+        m1.moderates(moderator=[m2], on=dv)
+
+        design = ts.Design(dv=dv, ivs=[m0, m1, m2])
+        gr = design.graph
+
+        interactions = find_interactions_for_main_effects(
+            gr=gr, on=dv, variables=[m1, m2]
+        )
+        self.assertSetEqual(interactions, {"Measure_1*Measure_2"})
+
+        # "Measure" is a substring of the interaction name but does not moderate it
+        interactions = find_interactions_for_main_effects(
+            gr=gr, on=dv, variables=[m0, m1]
+        )
+        self.assertSetEqual(interactions, set())
+
+        # The interaction is on dv, not m0
+        interactions = find_interactions_for_main_effects(
+            gr=gr, on=m0, variables=[m1, m2]
+        )
+        self.assertSetEqual(interactions, set())
+
     def test_filter_interactions_involving_variables_none_found(self):
         u0 = ts.Unit("Unit")
         m0 = u0.numeric("Measure_0")
@@ -1429,3 +1461,37 @@ class EffectsInferenceHelpersTest(unittest.TestCase):
     # TODO
     def test_get_identifier_for_subset_interaction(self):
         pass
+
+    def test_causal_ancestors_single_sweep(self):
+        u0 = ts.Unit("Unit")
+        m0 = u0.numeric("Measure_0")
+        m1 = u0.numeric("Measure_1")
+        m2 = u0.numeric("Measure_2")
+        m3 = u0.numeric("Measure_3")
+        dv = u0.numeric("Dependent_variable")
+
+        m0.causes(m1)
+        m1.causes(m2)
+        m3.causes(m2)
+        m2.causes(dv)
+
+        design = ts.Design(dv=dv, ivs=[m1, m2])
+        gr = design.graph
+
+        ancestry = CausalAncestors(gr=gr, variables=design.ivs)
+        self.assertSetEqual(ancestry.get_ancestors(m1), {m0.name})
+        self.assertSetEqual(ancestry.get_ancestors(m2), {m0.name, m1.name, m3.name})
+        self.assertSetEqual(
+            ancestry.get_ancestors(dv), {m0.name, m1.name, m2.name, m3.name}
+        )
+
+        # The causes edge between the IVs m1 and m2 is ignored for common ancestors
+        (common, common_to_children) = ancestry.get_common_ancestors(design.ivs)
+        self.assertSetEqual(common, set())
+        self.assertDictEqual(common_to_children, dict())
+
+        # m0 causes m1 directly and dv through m1 and m2
+        ancestry = CausalAncestors(gr=gr, variables=[m1, dv])
+        (common, common_to_children) = ancestry.get_common_ancestors([m1, dv])
+        self.assertSetEqual(common, {m0.name})
+        self.assertDictEqual(common_to_children, {m0.name: [m1.name, dv.name]})
@@ -2,6 +2,7 @@ from tisane.graph import Graph
 import tisane as ts
 from tisane.variable import Causes, Has, Moderates, Nests, Associates
 
+import networkx as nx
 import unittest
 
 
@@ -355,3 +356,282 @@ class GraphTest(unittest.TestCase):
         gr = design.graph
 
         self.assertTrue(gr.has_edge(start=subject, end=word, edge_type="has"))
+
+    def test_edge_index_after_update_edge(self):
+        v1 = ts.Unit("V1")
+        v2 = v1.nominal("V2")
+
+        gr = Graph()
+        gr.causes(v1, v2, Causes(v1, v2))
+        self.assertTrue(gr.has_edge(v1, v2, "causes"))
+
+        gr.update_edge(v1, v2, new_edge_type="associates")
+        self.assertFalse(gr.has_edge(v1, v2, "causes"))
+        self.assertTrue(gr.has_edge(v1, v2, "associates"))
+        (n0, n1, edge_data) = gr.get_edge(v1, v2, "associates")
+        self.assertEqual(n0, v1.name)
+        self.assertEqual(n1, v2.name)
+        self.assertEqual(edge_data["edge_type"], "associates")
+
+    def test_edge_index_in_subgraphs(self):
+        v1 = ts.Unit("V1")
+        v2 = v1.nominal("V2")
+        v3 = v1.nominal("V3")
+
+        gr = Graph()
+        gr.causes(v1, v2, Causes(v1, v2))
+        gr.associates(v2, v3, Associates(v2, v3))
+        gr.has(v1, v2, v1.relationships[0], 1)
+
+        causal_sub = gr.get_causal_subgraph()
+        self.assertTrue(causal_sub.has_edge(v1, v2, "causes"))
+        self.assertFalse(causal_sub.has_edge(v1, v2, "has"))
+        self.assertFalse(causal_sub.has_edge(v2, v3, "associates"))
+
+        # The original graph is left untouched
+        self.assertTrue(gr.has_edge(v1, v2, "has"))
+        self.assertTrue(gr.has_edge(v2, v3, "associates"))
+        self.assertTrue(gr.has_edge(v3, v2, "associates"))
+
+        no_outgoing = gr.remove_outgoing_edges(v2)
+        self.assertFalse(no_outgoing.has_edge(v2, v3, "associates"))
+        self.assertTrue(no_outgoing.has_edge(v3, v2, "associates"))
+
+    def test_node_lookups_by_name(self):
+        v1 = ts.Unit("V1")
+        v2 = v1.nominal("V2")
+        v3 = v1.nominal("V3")
+
+        gr = Graph()
+        gr.causes(v2, v3, Causes(v2, v3))
+
+        self.assertIs(gr.get_variable("V2"), v2)
+        self.assertIsNone(gr.get_variable("V1"))
+        (name, data) = gr.get_node(v3)
+        self.assertEqual(name, "V3")
+        self.assertIs(data["variable"], v3)
+        self.assertIsNone(gr.get_node(v1))
+        self.assertEqual(gr._get_variable_node(v2), ("V2", v2))
+        self.assertListEqual(list(gr.get_predecessors(v3)), ["V2"])
+        self.assertIsNone(gr.get_predecessors(v1))
+
+    def test_unit_hierarchy(self):
+        student = ts.Unit("student")
+        classroom = ts.Unit("classroom")
+        school = ts.Unit("school")
+        score = student.numeric("score")
+        size = classroom.numeric("size")
+        student.nests_within(classroom)
+        classroom.nests_within(school)
+
+        design = ts.Design(dv=score, ivs=[size])
+        gr = design.graph
+
+        self.assertIs(gr.get_identifier_for_variable(score), student)
+        self.assertIs(gr.get_identifier_for_variable(size), classroom)
+        self.assertIs(gr.get_identifier_for_variable(school), school)
+        self.assertListEqual(
+            gr.get_ordered_units(), [student.name, classroom.name, school.name]
+        )
+        hierarchy = gr.get_unit_hierarchy()
+        self.assertSetEqual(
+            hierarchy.get_nesting_units(student.name), {classroom.name, school.name}
+        )
+        self.assertSetEqual(hierarchy.get_nesting_units(school.name), set())
+        self.assertSetEqual(
+            hierarchy.get_nesting_groups(student.name), {classroom.name}
+        )
+
+        # The hierarchy is cached until the graph changes
+        self.assertIs(gr.get_unit_hierarchy(), hierarchy)
+        age = student.numeric("age")
+        gr.has(student, age, age.get_unit_relationship(), 1)
+        self.assertIsNot(gr.get_unit_hierarchy(), hierarchy)
+        self.assertIs(gr.get_identifier_for_variable(age), student)
+
+    def test_unit_membership(self):
+        participant = ts.Unit("participant")
+        condition = ts.SetUp("condition", order=[1, 2], cardinality=2)
+        age = participant.numeric("age")
+        treatment = participant.nominal(
+            "treatment", cardinality=2, number_of_instances=2
+        )
+        accuracy = participant.numeric(
+            "accuracy", number_of_instances=ts.Exactly(2).per(cardinality=condition)
+        )
+
+        design = ts.Design(dv=accuracy, ivs=[age, treatment])
+        hierarchy = design.graph.get_unit_hierarchy()
+
+        membership = hierarchy.get_membership(treatment)
+        self.assertIs(membership.unit, participant)
+        self.assertIs(membership.has_obj.measure, treatment)
+        self.assertTrue(membership.is_within)
+        self.assertTrue(hierarchy.is_within(accuracy))
+        self.assertFalse(hierarchy.is_within(age))
+        # Units do not belong to another unit
+        self.assertIsNone(hierarchy.get_membership(participant))
+        self.assertFalse(hierarchy.is_within(participant))
+
+    def test_subgraph_views_share_structure(self):
+        v1 = ts.Unit("V1")
+        v2 = v1.nominal("V2")
+        v3 = v1.nominal("V3")
+
+        gr = Graph()
+        causes_obj = Causes(v1, v2)
+        gr.causes(v1, v2, causes_obj)
+        gr.associates(v2, v3, Associates(v2, v3))
+
+        causal_sub = gr.get_causal_subgraph()
+        # Variables and edge objects are shared, not copied
+        self.assertIs(causal_sub.get_variable("V2"), v2)
+        (n0, n1, edge_data) = causal_sub.get_edge(v1, v2, "causes")
+        self.assertIs(edge_data["edge_obj"], causes_obj)
+
+        # Views cannot be modified
+        with self.assertRaises(nx.NetworkXError):
+            causal_sub._graph.add_edge("V3", "V1")
+
+        # Views without a node filter keep every node
+        self.assertEqual(len(causal_sub.get_nodes()), len(gr.get_nodes()))
+
+    def test_subgraph_views_follow_changes_to_graph(self):
+        v1 = ts.Unit("V1")
+        v2 = v1.nominal("V2")
+        v3 = v1.nominal("V3")
+
+        gr = Graph()
+        gr.causes(v1, v2, Causes(v1, v2))
+        causal_sub = gr.get_causal_subgraph()
+        self.assertTrue(causal_sub.has_edge(v1, v2, "causes"))
+        self.assertFalse(causal_sub.has_edge(v2, v3, "causes"))
+
+        # A view held across changes to its graph answers lookups for the graph as it is now
+        gr.causes(v2, v3, Causes(v2, v3))
+        self.assertTrue(causal_sub.has_edge(v2, v3, "causes"))
+        self.assertIsNotNone(causal_sub.get_edge(v2, v3, "causes"))
+
+        gr.update_edge(v2, v3, "associates")
+        self.assertFalse(causal_sub.has_edge(v2, v3, "causes"))
+        self.assertIsNone(causal_sub.get_edge(v2, v3, "causes"))
+        self.assertTrue(gr.has_edge(v2, v3, "associates"))
+
+        # So do views of views
+        conceptual_sub = gr.get_conceptual_subgraph()
+        without_v2 = conceptual_sub.remove_outgoing_edges(v2)
+        self.assertFalse(without_v2.has_edge(v2, v3, "associates"))
+        gr.update_edge(v2, v3, "causes")
+        self.assertEqual(without_v2.get_version(), gr.get_version())
+        self.assertFalse(without_v2.has_edge(v2, v3, "causes"))
+        self.assertTrue(conceptual_sub.has_edge(v2, v3, "causes"))
+
+    def test_derived_results_are_memoized_per_version(self):
+        v1 = ts.Unit("V1")
+        v2 = v1.nominal("V2")
+        v3 = v1.nominal("V3")
+
+        gr = Graph()
+        gr.causes(v1, v2, Causes(v1, v2))
+        version = gr.get_version()
+
+        causal_sub = gr.get_causal_subgraph()
+        self.assertIs(gr.get_causal_subgraph(), causal_sub)
+        self.assertEqual(gr.get_version(), version)
+
+        # Adding a variable, adding an edge, or updating an edge invalidates the cache
+        gr._add_variable(v3)
+        self.assertGreater(gr.get_version(), version)
+        self.assertIsNot(gr.get_causal_subgraph(), causal_sub)
+
+        gr.causes(v2, v3, Causes(v2, v3))
+        causal_sub = gr.get_causal_subgraph()
+        self.assertTrue(causal_sub.has_edge(v2, v3, "causes"))
+
+        gr.update_edge(v2, v3, "associates")
+        self.assertFalse(gr.get_causal_subgraph().has_edge(v2, v3, "causes"))
+
+        # Only the most recently used results are kept
+        for i in range(gr._memo_size + 1):
+            gr.memoize(("key", i), lambda: i)
+        self.assertEqual(len(gr._memo), gr._memo_size)
+        self.assertNotIn(("key", 0), gr._memo)
+
+    def test_interaction_variables_are_interned(self):
+        u = ts.Unit("Unit")
+        a = u.nominal("A", cardinality=2)
+        b = u.nominal("B", cardinality=3)
+        dv = u.numeric("DV")
+
+        a.moderates(moderator=[b], on=dv)
+        b.moderates(moderator=[a], on=dv)
+
+        design = ts.Design(dv=dv, ivs=[a, b])
+        gr = design.graph
+
+        interactions = [
+            v
+            for v in gr.get_variables()
+            if isinstance(v, ts.variable.Nominal) and v.isInteraction
+        ]
+        self.assertEqual(len(interactions), 1)
+        ixn = interactions[0]
+        self.assertIs(gr.get_interaction([b, a]), ixn)
+        self.assertListEqual([m.name for m in ixn.moderators], ["A", "B"])
+        self.assertEqual(ixn.get_cardinality(), 6)
+        self.assertTrue(gr.has_edge(ixn, dv, "associates"))
+        self.assertTrue(gr.has_edge(u, ixn, "has"))
+
+    def test_add_relationships_matches_one_at_a_time(self):
+        school = ts.Unit("School")
+        student = ts.Unit("Student")
+        week = ts.SetUp("Week")
+        student.nests_within(school)
+        a = student.nominal("A", cardinality=2)
+        b = student.nominal("B", cardinality=3)
+        score = student.numeric("Score", number_of_instances=week)
+        size = school.numeric("Size")
+        a.causes(score)
+        size.associates_with(score)
+        a.moderates(moderator=[b], on=score)
+
+        relationships = list()
+        for v in [score, a, b, size, student, school]:
+            relationships.extend(v.relationships)
+        # Relationships repeated in the batch are added once
+        self.assertGreater(len(relationships), len(set(map(id, relationships))))
+
+        one_at_a_time = Graph()
+        for r in relationships:
+            one_at_a_time.add_relationship(r)
+        batch = Graph()
+        batch.add_relationships(relationships)
+
+        # Each graph creates its own interaction variable
+        def describe_nodes(gr: Graph):
+            return [
+                (n, type(d["variable"]), d["is_identifier"])
+                for (n, d) in gr.get_nodes()
+            ]
+
+        def describe_edges(gr: Graph):
+            return [
+                (n0, n1, k, d["edge_type"])
+                for (n0, n1, k, d) in gr._graph.edges(keys=True, data=True)
+            ]
+
+        self.assertListEqual(describe_nodes(batch), describe_nodes(one_at_a_time))
+        self.assertListEqual(describe_edges(batch), describe_edges(one_at_a_time))
+        self.assertDictEqual(batch._edge_index, one_at_a_time._edge_index)
+        self.assertListEqual(
+            [v.name for v in batch.get_identifiers()],
+            [v.name for v in one_at_a_time.get_identifiers()],
+        )
+        ixn = batch.get_interaction([a, b])
+        self.assertTrue(batch.has_edge(student, ixn, "has"))
+
+        # Adding them again changes nothing
+        version = batch.get_version()
+        batch.add_relationships(relationships)
+        self.assertEqual(batch.get_version(), version)
+        self.assertEqual(len(batch.get_edges()), len(one_at_a_time.get_edges()))
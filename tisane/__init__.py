@@ -1,6 +1,8 @@
 from tisane.main import (
     infer_model,
     infer_statistical_model_from_design,
+    infer_model_candidates,
+    construct_statistical_model_from_selection,
 )
 
 from tisane.variable import Unit, SetUp, Exactly, AtMost
@@ -56,6 +56,14 @@ load_data_from_csv_template = """
     df = pd.read_csv('{path}')
 """
 
+load_data_from_parquet_template = """
+    df = pd.read_parquet('{path}')
+"""
+
+load_data_from_feather_template = """
+    df = pd.read_feather('{path}')
+"""
+
 load_data_from_dataframe_template = """
     # Dataframe is stored in local file: data.csv
     # You may want to replace the data path with an existing data file you already have.
@@ -108,6 +116,8 @@ pymer4_code_templates = {
     "preamble": pymer4_preamble,
     "model_function_wrapper": model_function_wrapper,
     "load_data_from_csv_template": load_data_from_csv_template,
+    "load_data_from_parquet_template": load_data_from_parquet_template,
+    "load_data_from_feather_template": load_data_from_feather_template,
     "load_data_from_dataframe_template": load_data_from_dataframe_template,
     "load_data_no_data_source": load_data_no_data_source,
     "model_template": pymer4_model_template,
@@ -120,6 +130,8 @@ statsmodels_code_templates = {
     "preamble": statsmodels_preamble,
     "model_function_wrapper": model_function_wrapper,
     "load_data_from_csv_template": load_data_from_csv_template,
+    "load_data_from_parquet_template": load_data_from_parquet_template,
+    "load_data_from_feather_template": load_data_from_feather_template,
     "load_data_from_dataframe_template": load_data_from_dataframe_template,
     "load_data_no_data_source": load_data_no_data_source,
     "model_template": statsmodels_model_template,
@@ -221,7 +233,10 @@ def generate_pymer4_code(statistical_model: StatisticalModel):
     else:
         data = statistical_model.get_data()
         if data.has_data_path():
-            data_code = pymer4_code_templates["load_data_from_csv_template"]
+            # Load the data from the same file and in the same format as Tisane did
+            data_code = pymer4_code_templates[
+                f"load_data_from_{data.get_data_format()}_template"
+            ]
             data_code = data_code.format(path=str(data.data_path))
         else:
             assert not data.has_data_path()
@@ -374,7 +389,10 @@ def generate_statsmodels_code(statistical_model: StatisticalModel):
     else:
         data = statistical_model.get_data()
         if data.data_path is not None:
-            data_code = statsmodels_code_templates["load_data_from_csv_template"]
+            # Load the data from the same file and in the same format as Tisane did
+            data_code = statsmodels_code_templates[
+                f"load_data_from_{data.get_data_format()}_template"
+            ]
             data_code = data_code.format(path=str(data.data_path))
         else:
             assert data.data_path is None
@@ -1,6 +1,11 @@
 import os
 import pandas as pd
-from typing import Union
+import numpy as np
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from tisane.data_cache import StatisticsCache, get_file_fingerprint
 
 from pandas.core.frame import DataFrame
 
@@ -9,12 +14,319 @@ def absolute_path(p: str) -> str:
     return os.path.join(os.path.dirname(os.path.abspath(__file__)), p)
 
 
+# File extension -> format of the data in the file, for files that are not CSVs
+columnar_file_formats = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+
+
+# @returns "parquet", "feather" (Arrow IPC), or "csv" depending on the extension of @param path
+def get_file_format(path: Union[str, os.PathLike]) -> str:
+    extension = os.path.splitext(str(path))[1].lower()
+    return columnar_file_formats.get(extension, "csv")
+
+
+def _import_pyarrow(path: Union[str, os.PathLike]):
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.feather
+    except ImportError:
+        raise ImportError(
+            f"Reading {path} requires pyarrow. Install it with `pip install pyarrow`."
+        )
+
+    return pyarrow
+
+
+# @returns names of the columns in the Parquet or Feather file at @param path that are in @param columns (all if None)
+def _get_columnar_file_columns(
+    path: Union[str, os.PathLike], columns: List[str] = None
+):
+    pa = _import_pyarrow(path)
+    if get_file_format(path) == "parquet":
+        names = pa.parquet.read_schema(path, memory_map=True).names
+    else:
+        with pa.memory_map(str(path)) as source:
+            names = pa.ipc.open_file(source).schema.names
+    if columns is None:
+        return names
+    return [n for n in names if n in set(columns)]
+
+
+# @returns DataFrame with @param columns (all if None) of the Parquet or Feather file at @param path
+# The file is memory mapped and only the requested columns are read
+def read_columnar_file(
+    path: Union[str, os.PathLike], columns: List[str] = None
+) -> pd.DataFrame:
+    pa = _import_pyarrow(path)
+    columns = _get_columnar_file_columns(path, columns)
+    if get_file_format(path) == "parquet":
+        table = pa.parquet.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = pa.feather.read_table(path, columns=columns, memory_map=True)
+
+    return table.to_pandas()
+
+
+# @returns names of the columns of the file at @param path, in the order they appear in the file
+def read_column_names(path: Union[str, os.PathLike]) -> List[str]:
+    if get_file_format(path) == "csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    return _get_columnar_file_columns(path)
+
+
+# @returns iterator over DataFrames of at most @param batch_size rows with @param columns (all if None) of the Parquet or Feather file at @param path
+def read_columnar_file_in_batches(
+    path: Union[str, os.PathLike], batch_size: int, columns: List[str] = None
+):
+    pa = _import_pyarrow(path)
+    columns = _get_columnar_file_columns(path, columns)
+    if get_file_format(path) == "parquet":
+        parquet_file = pa.parquet.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i).select(columns)
+                for offset in range(0, batch.num_rows, batch_size):
+                    yield batch.slice(offset, batch_size).to_pandas()
+
+
+# Maximum number of bins in the histograms of the data summaries
+MAX_HISTOGRAM_BINS = 100
+
+# Number of rows read from a database at a time when not every row is kept
+SQL_CHUNKSIZE = 100000
+
+
+# @returns a JSON-serializable dict summarizing @param column (see DataVector.get_summary)
+def summarize_column(column: pd.Series) -> Dict:
+    return DataVector(column.name, column).get_summary()
+
+
+# @returns dict of column name -> summary of the column for every column in @param data
+def summarize_data(data: pd.DataFrame) -> Dict:
+    return {str(name): summarize_column(data[name]) for name in data.columns}
+
+
+# @returns @param df with the @param categorical_columns stored as pandas categoricals and the
+# @param identifier_columns stored as the smallest integer type that fits, or as categoricals if they are not integers
+def compact_columns(
+    df: pd.DataFrame,
+    categorical_columns: List[str] = None,
+    identifier_columns: List[str] = None,
+) -> pd.DataFrame:
+    for name in categorical_columns or list():
+        if name in df.columns:
+            df[name] = df[name].astype("category")
+    for name in identifier_columns or list():
+        if name in df.columns:
+            if pd.api.types.is_integer_dtype(df[name]):
+                df[name] = pd.to_numeric(df[name], downcast="integer")
+            else:
+                df[name] = df[name].astype("category")
+
+    return df
+
+
+# @returns @param frames concatenated, keeping columns that are categorical in every frame categorical
+# even if their categories differ
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    data = pd.concat(frames, ignore_index=True)
+    for name in data.columns:
+        columns = [f[name] for f in frames]
+        if all(isinstance(c.dtype, pd.CategoricalDtype) for c in columns):
+            data[name] = pd.api.types.union_categoricals(columns, ignore_order=True)
+
+    return data
+
+
+# @returns 64-bit hash of the values in each row of @param data, a Series or DataFrame
+def hash_rows(data: Union[pd.Series, pd.DataFrame]) -> np.ndarray:
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    data = data.copy(deep=False)
+    for name in data.columns:
+        if pd.api.types.is_integer_dtype(data[name]):
+            # Hash the same value the same way regardless of how it was downcast
+            data[name] = data[name].astype(np.int64)
+    if len(data.columns) == 1:
+        data = data[data.columns[0]]
+
+    return pd.util.hash_pandas_object(data, index=False).to_numpy()
+
+
+# @returns @param counts, a Series of counts indexed by value, plus the counts in @param other
+# Values in both keep their position in @param counts, and values only in @param other are added after them
+def add_counts(counts: pd.Series, other: pd.Series) -> pd.Series:
+    other = other[other > 0]
+    # Looks values up in the index of @param counts, which is hashed once and reused while it does not change
+    positions = counts.index.get_indexer(other.index)
+    found = positions >= 0
+    values = counts.to_numpy(dtype=np.int64, copy=True)
+    np.add.at(values, positions[found], other.to_numpy(dtype=np.int64)[found])
+    counts = pd.Series(values, index=counts.index, name=counts.name)
+    if found.all():
+        return counts
+    added = pd.Series(
+        other.to_numpy(dtype=np.int64)[~found],
+        index=np.asarray(other.index[~found]),
+        name=counts.name,
+    )
+
+    return pd.concat([counts, added])
+
+
+# @returns @param name quoted as an SQL identifier, e.g., a table or column name
+def quote_identifier(name: str) -> str:
+    escaped = str(name).replace('"', '""')
+    return f'"{escaped}"'
+
+
+# @returns array of @param values, e.g., read from a database, with None as NaN for missing values
+def to_array(values: List) -> np.ndarray:
+    values = pd.Series(values, dtype=object if len(values) == 0 else None)
+    values[values.isna()] = np.nan
+    return values.to_numpy()
+
+
+# @returns list of @param function applied to each of @param columns, in the order of @param columns
+# Uses a pool of @param n_workers threads if more than one: pandas releases the GIL while hashing numeric and categorical columns
+def map_columns(function, columns: List[str], n_workers: int = None) -> List:
+    if n_workers is None or n_workers <= 1 or len(columns) <= 1:
+        return [function(c) for c in columns]
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        # Results come back in order, whichever worker finished first
+        return list(executor.map(function, columns))
+
+
+"""
+HyperLogLog sketch for estimating the number of unique values in a column
+without keeping the values themselves. Sketches of different chunks of a
+column (or of different processes reading the same file) can be merged.
+"""
+
+
+class CardinalitySketch(object):
+    # Number of bits of the hash used to pick a register
+    precision: int
+    # register -> largest rank seen among the values hashed to the register
+    registers: np.ndarray
+
+    # @param error is the target relative standard error of the estimates
+    def __init__(self, error: float = 0.01):
+        if error <= 0:
+            raise ValueError(f"The error of a sketch must be positive, not {error}.")
+        precision = int(np.ceil(np.log2((1.04 / error) ** 2)))
+        self.precision = min(max(precision, 4), 18)
+        self.registers = np.zeros(2**self.precision, dtype=np.uint8)
+
+    # Update the sketch with the values in @param column
+    def add(self, column: pd.Series):
+        hashes = hash_rows(pd.Series(column))
+        if len(hashes) == 0:
+            return self
+
+        shift = np.uint64(64 - self.precision)
+        indices = (hashes >> shift).astype(np.intp)
+        remaining = hashes << np.uint64(self.precision)
+        # Number of leading zeros in the remaining bits (+ 1), from their bit length
+        high = (remaining >> np.uint64(32)).astype(np.float64)
+        low = (remaining & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        bit_length = np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+        ranks = np.minimum(64 - bit_length, 64 - self.precision) + 1
+        np.maximum.at(self.registers, indices, ranks.astype(np.uint8))
+
+        return self
+
+    # Combine @param other, a sketch of other values, into this sketch
+    def merge(self, other: "CardinalitySketch"):
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Cannot merge sketches with different precisions: {self.precision} and {other.precision}."
+            )
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+        return self
+
+    # @returns the estimated number of unique values added to the sketch
+    def estimate(self) -> int:
+        m = len(self.registers)
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        estimate = alpha * m**2 / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Few unique values: linear counting is more accurate
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * np.log(m / zeros)
+
+        return int(round(estimate))
+
+    # @returns relative standard error of the estimates
+    def get_error(self) -> float:
+        return 1.04 / np.sqrt(len(self.registers))
+
+    # @returns True if @param cardinality is within three standard errors of the estimate
+    # (i.e., a difference between them may be due to the sketch alone)
+    def is_within_error(self, cardinality: int) -> bool:
+        estimate = self.estimate()
+        return abs(cardinality - estimate) <= 3 * self.get_error() * estimate
+
+
 class Dataset(object):
-    dataset: pd.DataFrame
     data_path: os.path
+    # columns read from files (all if None), and columns stored compactly (see compact_columns)
+    columns: List[str]
+    categorical_columns: List[str]
+    identifier_columns: List[str]
+    # the data, without the batches appended since it was last needed (see append)
+    _data: pd.DataFrame
+    # batches appended since the data was last needed
+    _batches: List[pd.DataFrame]
+    # column name -> number of rows with each value in the column
+    _row_counts: Dict[str, pd.Series]
+    # column name -> unique values in the column, computed at most once per column
+    _unique_values: Dict[str, np.ndarray]
+    # column names -> combinations of values observed in those columns
+    _observed_combinations: Dict[Tuple[str, ...], pd.DataFrame]
+    # (column name, error) -> sketch of the unique values in the column
+    _cardinality_sketches: Dict[Tuple[str, float], CardinalitySketch]
+    # Persistent cache of the statistics of the file's columns, if any
+    _cache: StatisticsCache
+    # Fingerprint of the file's contents, identifying its entries in the cache
+    _fingerprint: str
+    # column name -> encoded column, created at most once per column
+    _columns: Dict[str, "DataVector"]
+    # (column name, other column name) -> sorted hashes of the pairs of non-missing values of the columns in the
+    # data (see hash_rows), and the number of those pairs for each value of the first column (see keep_unique_counts_per)
+    _unique_counts: Dict[Tuple[str, str], Tuple[np.ndarray, pd.Series]]
 
-    # Takes input in either a CSV or a Pandas DataFrame
-    def __init__(self, source: Union[str, pd.DataFrame]):
+    # Takes input in either a CSV, Parquet or Feather (Arrow IPC) file, or a Pandas DataFrame
+    # When reading a file, only @param columns are loaded (all columns if None), and
+    # @param categorical_columns and @param identifier_columns are stored compactly (see compact_columns)
+    # Parquet and Feather files are memory mapped and require pyarrow
+    # Unique values of the columns of a file are kept in @param cache, if any, and reused while the file is unchanged
+    def __init__(
+        self,
+        source: Union[str, pd.DataFrame],
+        columns: List[str] = None,
+        categorical_columns: List[str] = None,
+        identifier_columns: List[str] = None,
+        cache: StatisticsCache = None,
+    ):
+        self.columns = columns
+        self.categorical_columns = list(categorical_columns or list())
+        self.identifier_columns = list(identifier_columns or list())
         df = None
         # Read in data
         # if isinstance(source, str):
@@ -23,7 +335,7 @@ class Dataset(object):
         #     df = pd.read_csv(abs_path)
         if isinstance(source, str) or isinstance(source, os.PathLike):
             self.data_path = source  # store
-            df = pd.read_csv(source)
+            df = self._read_file(source)
         elif isinstance(source, pd.DataFrame):
             df = source
             self.data_path = None
@@ -34,6 +346,108 @@ class Dataset(object):
 
         # TODO: post-processing? E.g., break up into DataVectors?
         self.dataset = df
+        self._columns = dict()
+        self._row_counts = dict()
+        self._unique_values = dict()
+        self._unique_counts = dict()
+        self._observed_combinations = dict()
+        self._cardinality_sketches = dict()
+        self._cache = cache if self.data_path is not None else None
+        self._fingerprint = (
+            get_file_fingerprint(self.data_path) if self._cache is not None else None
+        )
+
+    # The data, including any batches appended since it was last needed
+    # Batches are only concatenated to the data when it is needed, so appending a batch does not copy the data
+    @property
+    def dataset(self) -> pd.DataFrame:
+        if len(self._batches) > 0:
+            self._data = concat_frames([self._data] + self._batches)
+            self._batches = list()
+        return self._data
+
+    @dataset.setter
+    def dataset(self, df: pd.DataFrame):
+        self._data = df
+        self._batches = list()
+
+    # @returns DataFrame with the @attr columns of the file at @param path, stored compactly
+    def _read_file(self, path: Union[str, os.PathLike]) -> pd.DataFrame:
+        if get_file_format(path) == "csv":
+            usecols = None
+            if self.columns is not None:
+                columns = set(self.columns)
+                usecols = lambda c: c in columns
+            df = pd.read_csv(path, usecols=usecols)
+        else:
+            df = read_columnar_file(path, columns=self.columns)
+        return compact_columns(df, self.categorical_columns, self.identifier_columns)
+
+    # Add the rows in @param source, a file or DataFrame with the same columns as the dataset, e.g., newly collected data
+    # The statistics computed so far are updated from the new rows only, so the cost grows with the size of
+    # the batch and the number of unique values or combinations, not with the number of rows already in the dataset
+    # @returns dict of column name -> values that were not in the column before, for columns whose unique values were computed
+    def append(self, source: Union[str, os.PathLike, pd.DataFrame]) -> Dict:
+        if isinstance(source, pd.DataFrame):
+            batch = source[self.get_column_names()]
+            if self.data_path is not None:
+                batch = compact_columns(
+                    batch.copy(), self.categorical_columns, self.identifier_columns
+                )
+        else:
+            batch = self._read_file(source)[self.get_column_names()]
+
+        new_values = dict()
+        for name in list(self._unique_values.keys()):
+            if name not in self.categorical_columns + self.identifier_columns:
+                # Other columns, e.g., numeric measures, may have as many unique values as rows,
+                # so they are computed again from all the rows only if they are needed
+                del self._unique_values[name]
+        for (name, unique_values) in self._unique_values.items():
+            batch_values = DataVector(name, batch[name]).get_categories()
+            # pd.unique keeps the order of first appearance, so the new values come last
+            merged = pd.unique(
+                np.concatenate([np.asarray(unique_values), np.asarray(batch_values)])
+            )
+            self._unique_values[name] = merged
+            new_values[name] = merged[len(unique_values) :]
+        for (name, row_counts) in self._row_counts.items():
+            self._row_counts[name] = add_counts(
+                row_counts, batch[name].value_counts(sort=False)
+            )
+        for ((name, c), (hashes, counts)) in self._unique_counts.items():
+            pairs = batch[[name, c]].dropna()
+            (batch_hashes, first) = np.unique(hash_rows(pairs), return_index=True)
+            positions = np.searchsorted(hashes, batch_hashes)
+            new = positions == len(hashes)
+            new[~new] = hashes[positions[~new]] != batch_hashes[~new]
+            # Insert the new pairs' hashes where they belong, keeping the hashes sorted
+            hashes = np.insert(hashes, positions[new], batch_hashes[new])
+            # In order of appearance, so units are added to every column's counts in the same order
+            new_counts = pd.Series(
+                pairs[name].to_numpy()[np.sort(first[new])]
+            ).value_counts(sort=False)
+            self._unique_counts[(name, c)] = (hashes, add_counts(counts, new_counts))
+        self._append_to_statistics(batch)
+
+        self._batches.append(batch)
+        # Codes of the columns are computed again for all the rows, if needed
+        self._columns = dict()
+        # The statistics no longer describe the file alone
+        self._cache = None
+
+        return new_values
+
+    # Update the observed combinations and sketches with the rows in @param batch
+    def _append_to_statistics(self, batch: pd.DataFrame):
+        for (names, combinations) in self._observed_combinations.items():
+            batch_combinations = batch[list(names)].drop_duplicates()
+            combinations = pd.concat([combinations, batch_combinations])
+            self._observed_combinations[names] = combinations.drop_duplicates(
+                ignore_index=True
+            )
+        for ((name, error), sketch) in self._cardinality_sketches.items():
+            sketch.add(batch[name])
 
     def get_data(self) -> pd.DataFrame:
         return self.dataset
@@ -41,36 +455,893 @@ class Dataset(object):
     def get_data_path(self) -> os.path:
         return self.data_path
 
-    def get_column(self, name: str):
-        cols = self.dataset.columns
-        if name in cols:
-            return self.dataset[name]
-        else:
-            raise ValueError(
-                f"Variable with name {name} is not part of the dataset. Columns: {cols}"
+    # @returns "csv", "parquet" or "feather" for data read from a file, None otherwise
+    def get_data_format(self) -> str:
+        if self.data_path is None:
+            return None
+        return get_file_format(self.data_path)
+
+    # @returns the column @param name
+    def get_column(self, name: str) -> pd.Series:
+        return self.get_vector(name).column
+
+    # @returns DataVector for the column @param name, shared by everything that needs the column's values or encoding
+    def get_vector(self, name: str) -> "DataVector":
+        if name not in self._columns:
+            cols = self.dataset.columns
+            if name in cols:
+                self._columns[name] = DataVector(name, self.dataset[name])
+            else:
+                raise ValueError(
+                    f"Variable with name {name} is not part of the dataset. Columns: {cols}"
+                )
+        return self._columns[name]
+
+    # @returns the unique values in the column @param name, in order of appearance
+    # The values are computed once and shared by every check that needs them
+    def get_unique_values(self, name: str) -> np.ndarray:
+        if name not in self._unique_values:
+            self._unique_values[name] = self._compute_unique_values(name)
+        return self._unique_values[name]
+
+    # @returns the unique values in the column @param name, from the cache if they are there
+    def _compute_unique_values(self, name: str) -> np.ndarray:
+        vector = self.get_vector(name)
+        categories = self._load_statistic(
+            (name, str(vector.column.dtype), "unique values"), vector.get_categories
+        )
+        vector.set_categories(categories)
+        return categories
+
+    # @returns the statistic identified by @param key (which includes a column name) from the cache, or computes
+    # it with @param compute and stores it in the cache
+    def _load_statistic(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        if self._cache is None:
+            return compute()
+        key = (self._fingerprint,) + key
+        value = self._cache.load(key)
+        if value is None:
+            value = compute()
+            self._cache.store(key, value)
+        return value
+
+    # Computes the unique values of the columns @param names that are not cached yet, using @param n_workers threads (see map_columns)
+    def compute_unique_values(self, names: List[str], n_workers: int = None):
+        names = [
+            n
+            for n in dict.fromkeys(names)
+            if n not in self._unique_values and n in self.dataset.columns
+        ]
+        # Create the columns' data vectors before the workers encode them
+        for n in names:
+            self.get_vector(n)
+        unique_values = map_columns(
+            self._compute_unique_values, names, n_workers=n_workers
+        )
+        for (name, values) in zip(names, unique_values):
+            self._unique_values[name] = values
+
+    # @returns number of unique values in the column @param name, counting missing values as one value
+    def get_cardinality(self, name: str) -> int:
+        return len(self.get_unique_values(name))
+
+    # @returns sketch of the unique values in the column @param name with relative standard error about @param error
+    # Cheaper in memory than get_unique_values for columns with very many unique values, e.g., participant ids
+    def get_cardinality_sketch(self, name: str, error: float) -> CardinalitySketch:
+        key = (name, error)
+        if key not in self._cardinality_sketches:
+            self._cardinality_sketches[key] = CardinalitySketch(error).add(
+                self.dataset[name]
+            )
+        return self._cardinality_sketches[key]
+
+    # @returns the position of each row's value in get_unique_values(@param name)
+    def get_codes(self, name: str) -> np.ndarray:
+        # Use the cached unique values, if any
+        self.get_unique_values(name)
+        return self.get_vector(name).get_codes()
+
+    # @returns DataFrame with one row for each combination of values of the columns @param names that occurs in the data
+    # Rows are in order of first appearance. Memory grows with the number of observed combinations, not with the product of the columns' cardinalities
+    def get_observed_combinations(self, names: List[str]) -> pd.DataFrame:
+        key = tuple(names)
+        if key not in self._observed_combinations:
+            # Encode each row's combination of codes as a single integer (mixed radix)
+            sizes = [len(self.get_unique_values(n)) for n in names]
+            if np.prod([float(size) for size in sizes]) < np.iinfo(np.int64).max:
+                combined = np.zeros(self.get_length(), dtype=np.int64)
+                for (n, size) in zip(names, sizes):
+                    combined = combined * size + self.get_codes(n)
+                observed = pd.unique(combined)
+                columns = dict()
+                for (n, size) in reversed(list(zip(names, sizes))):
+                    (observed, codes) = np.divmod(observed, size)
+                    columns[n] = self.get_unique_values(n)[codes]
+                combinations = pd.DataFrame({n: columns[n] for n in names})
+            else:
+                # Too many possible combinations to encode, so compare rows of codes instead
+                codes = pd.DataFrame({n: self.get_codes(n) for n in names})
+                codes = codes.drop_duplicates()
+                combinations = pd.DataFrame(
+                    {n: self.get_unique_values(n)[codes[n].values] for n in names}
+                )
+            self._observed_combinations[key] = combinations
+        return self._observed_combinations[key]
+
+    # @returns the number of rows for each value in the column @param name, e.g., the number of observations of each unit
+    def get_row_counts(self, name: str) -> pd.Series:
+        if name not in self._row_counts:
+            self._row_counts[name] = self.dataset[name].value_counts(sort=False)
+        return self._row_counts[name]
+
+    # @returns DataFrame indexed by the values in the column @param name, with the number of unique non-missing values of each of @param columns for each value, e.g., the number of groups each unit belongs to
+    # Each column is counted in one vectorized pass, in @param n_workers threads if more than one
+    def get_unique_counts_per(
+        self, name: str, columns: List[str], n_workers: int = None
+    ) -> pd.DataFrame:
+        # Use the counts kept up to date as rows are appended, if any (see keep_unique_counts_per)
+        kept = [c for c in columns if (name, c) in self._unique_counts]
+        if len(kept) > 0:
+            counts = pd.DataFrame({c: self._unique_counts[(name, c)][1] for c in kept})
+            rest = [c for c in columns if c not in kept]
+            if len(rest) > 0:
+                rest = self.get_unique_counts_per(name, rest, n_workers=n_workers)
+                counts = pd.concat([counts, rest], axis=1)
+            return counts.reindex(columns=columns).fillna(0).astype(np.int64)
+
+        group_values = self.get_unique_values(name)
+        group_codes = None
+        if len(group_values) < self.get_length():
+            group_codes = self.get_codes(name).astype(np.int64)
+        for c in columns:
+            self.get_vector(c)
+
+        def count(column: str) -> np.ndarray:
+            vector = self.get_vector(column)
+            if group_codes is None:
+                # One row per group, in order of appearance
+                return (~vector.get_missing()).astype(np.int64)
+            # Encode each (group, value) pair as a single integer
+            size = vector.get_cardinality()
+            pairs = pd.unique(group_codes * size + vector.get_codes())
+            missing_code = vector.get_missing_code()
+            if missing_code is not None:
+                pairs = pairs[pairs % size != missing_code]
+            return np.bincount(pairs // size, minlength=len(group_values))
+
+        counts = map_columns(count, columns, n_workers=n_workers)
+        counts = pd.DataFrame(dict(zip(columns, counts)), index=group_values)
+        return counts[counts.index.notna()]
+
+    # Keep the pairs of values of the column @param name and each of @param columns that occur in the data, so that
+    # get_unique_counts_per is updated with the rows appended later instead of counting every row again (see append)
+    # Only a hash of each pair is kept, in a sorted array, so looking up the pairs of a batch does not rehash the data
+    def keep_unique_counts_per(self, name: str, columns: List[str]):
+        columns = [c for c in columns if (name, c) not in self._unique_counts]
+        if len(columns) == 0:
+            return
+        counts = self.get_unique_counts_per(name, columns)
+        for c in columns:
+            hashes = np.unique(hash_rows(self.dataset[[name, c]].dropna()))
+            column_counts = counts[c][counts[c] > 0]
+            column_counts = pd.Series(
+                column_counts.to_numpy(), index=np.asarray(column_counts.index)
             )
+            self._unique_counts[(name, c)] = (hashes, column_counts)
+
+    # @returns names of the columns in the data
+    def get_column_names(self) -> List[str]:
+        return list(self._data.columns)
+
+    # @returns dict of column name -> summary of the column (see summarize_column)
+    def get_summary(self) -> Dict:
+        return {
+            str(name): self.get_vector(name).get_summary()
+            for name in self.get_column_names()
+        }
 
     def get_length(self):
-        if self.dataset is not None:
-            return len(self.dataset.index)
+        if self._data is not None:
+            return len(self._data.index) + sum(len(b.index) for b in self._batches)
             # else:
             return 0
 
     def has_data(self) -> bool:
-        return self.dataset is not None
+        return self._data is not None
 
     def has_data_path(self) -> bool:
 
         return self.data_path is not None
 
 
+"""
+Dataset for CSV, Parquet or Feather files that are too large to fit in memory.
+Reads the file in chunks and keeps only the statistics Tisane checks:
+the unique values of categorical and identifier columns, the number of rows
+for each identifier (or only a sketch of each identifier's unique values, if
+exact counts are not needed), and the count, mean, variance, min and max of every other
+numeric column.
+"""
+
+
+class StreamingDataset(Dataset):
+    chunksize: int
+    columns: List[str]
+    # columns whose unique values are kept
+    categorical_columns: List[str]
+    # columns whose unique values and row counts per value are kept
+    identifier_columns: List[str]
+    # relative standard error of the identifier columns' sketches, or None to keep their unique values and row counts
+    sketch_error: float
+    length: int
+    # column name -> number of rows missing a value in the column
+    _missing: Dict[str, int]
+    # column name -> {"count", "mean", "m2", "min", "max", "non-negative integers"}
+    _numeric_statistics: Dict[str, Dict]
+    # batches of rows appended after reading the file (see append)
+    _appended_batches: List[pd.DataFrame]
+
+    def __init__(
+        self,
+        source: Union[str, os.PathLike],
+        chunksize: int,
+        columns: List[str] = None,
+        categorical_columns: List[str] = None,
+        identifier_columns: List[str] = None,
+        sketch_error: float = None,
+        cache: StatisticsCache = None,
+    ):
+        assert isinstance(source, str) or isinstance(source, os.PathLike)
+        self.data_path = source
+        self.dataset = None
+        self.chunksize = chunksize
+        self.columns = columns
+        self.categorical_columns = list(categorical_columns or list())
+        self.identifier_columns = list(identifier_columns or list())
+        self.sketch_error = sketch_error
+        self.length = 0
+        self._unique_values = dict()
+        self._observed_combinations = dict()
+        self._cardinality_sketches = dict()
+        self._row_counts = dict()
+        self._missing = dict()
+        self._numeric_statistics = dict()
+        self._appended_batches = list()
+        self._cache = cache
+        self._fingerprint = get_file_fingerprint(source) if cache is not None else None
+
+        if cache is None:
+            for chunk in self._read_chunks():
+                self._add_chunk(chunk)
+            return
+
+        # Only read the columns whose statistics are not in the cache
+        columns = read_column_names(source)
+        if self.columns is not None:
+            columns = [c for c in columns if c in set(self.columns)]
+        uncached_columns = list()
+        for name in columns:
+            statistics = cache.load(self._get_column_cache_key(name))
+            if statistics is None:
+                uncached_columns.append(name)
+            else:
+                self._set_column_statistics(name, statistics)
+        if len(uncached_columns) > 0:
+            self.length = 0
+            for chunk in self._read_chunks(columns=uncached_columns):
+                self._add_chunk(chunk)
+            for name in uncached_columns:
+                cache.store(
+                    self._get_column_cache_key(name),
+                    self._get_column_statistics(name),
+                )
+
+    # @returns key of the statistics of the column @param name in the cache, which depend on how the column is tracked
+    def _get_column_cache_key(self, name: str) -> Tuple:
+        if name in self.identifier_columns:
+            role = ("identifier", self.sketch_error)
+        elif name in self.categorical_columns:
+            role = ("categorical",)
+        else:
+            role = ("other",)
+        return (self._fingerprint, name, "column statistics") + role
+
+    # @returns dict of every statistic kept for the column @param name
+    def _get_column_statistics(self, name: str) -> Dict:
+        statistics = {"length": self.length, "missing": self._missing[name]}
+        if name in self._unique_values:
+            statistics["unique values"] = self._unique_values[name]
+        if name in self._row_counts:
+            statistics["row counts"] = self._row_counts[name]
+        if name in self._numeric_statistics:
+            statistics["numeric statistics"] = self._numeric_statistics[name]
+        if (name, self.sketch_error) in self._cardinality_sketches:
+            sketch = self._cardinality_sketches[(name, self.sketch_error)]
+            statistics["sketch"] = sketch
+        return statistics
+
+    # Restore the @param statistics of the column @param name (see _get_column_statistics)
+    def _set_column_statistics(self, name: str, statistics: Dict):
+        self.length = statistics["length"]
+        self._missing[name] = statistics["missing"]
+        if "unique values" in statistics:
+            self._unique_values[name] = statistics["unique values"]
+        if "row counts" in statistics:
+            self._row_counts[name] = statistics["row counts"]
+        if "numeric statistics" in statistics:
+            self._numeric_statistics[name] = statistics["numeric statistics"]
+        if "sketch" in statistics:
+            self._cardinality_sketches[(name, self.sketch_error)] = statistics["sketch"]
+
+    # @returns iterator over DataFrames of at most @attr chunksize rows of the file, followed by the appended batches
+    def _read_chunks(self, columns: List[str] = None):
+        columns = columns if columns is not None else self.columns
+        if self.get_data_format() != "csv":
+            chunks = read_columnar_file_in_batches(
+                self.data_path, batch_size=self.chunksize, columns=columns
+            )
+        else:
+            usecols = None
+            if columns is not None:
+                names = set(columns)
+                usecols = lambda c: c in names
+            chunks = pd.read_csv(
+                self.data_path, usecols=usecols, chunksize=self.chunksize
+            )
+        batches = [
+            batch if columns is None else batch[list(columns)]
+            for batch in self._appended_batches
+        ]
+        return itertools.chain(chunks, batches)
+
+    # Update the statistics with the rows in @param source (see Dataset.append)
+    # The rows are kept in memory and read after the file whenever the file is read again
+    def append(self, source: Union[str, os.PathLike, pd.DataFrame]) -> Dict:
+        if isinstance(source, pd.DataFrame):
+            batch = source[self.get_column_names()]
+        elif get_file_format(source) == "csv":
+            batch = pd.read_csv(source, usecols=self.get_column_names())
+        else:
+            batch = read_columnar_file(source, columns=self.get_column_names())
+
+        lengths = {name: len(values) for (name, values) in self._unique_values.items()}
+        self._add_chunk(batch)
+        new_values = {
+            name: self._unique_values[name][length:]
+            for (name, length) in lengths.items()
+        }
+        # Sketches of identifier columns were updated with the other statistics
+        identifier_sketches = {
+            key: self._cardinality_sketches.pop(key)
+            for key in list(self._cardinality_sketches)
+            if key[0] in self.identifier_columns and key[1] == self.sketch_error
+        }
+        self._append_to_statistics(batch)
+        self._cardinality_sketches.update(identifier_sketches)
+
+        self._appended_batches.append(batch)
+        self._cache = None
+
+        return new_values
+
+    # Update the statistics with the rows in @param chunk
+    def _add_chunk(self, chunk: pd.DataFrame):
+        self.length += len(chunk.index)
+        tracked_columns = set(self.categorical_columns + self.identifier_columns)
+        for name in chunk.columns:
+            column = chunk[name]
+            self._missing[name] = self._missing.get(name, 0) + int(column.isna().sum())
+            if name in self.identifier_columns and self.sketch_error is not None:
+                key = (name, self.sketch_error)
+                if key not in self._cardinality_sketches:
+                    self._cardinality_sketches[key] = CardinalitySketch(
+                        self.sketch_error
+                    )
+                self._cardinality_sketches[key].add(column)
+            elif name in tracked_columns:
+                unique_values = column.unique()
+                if name in self._unique_values:
+                    unique_values = pd.unique(
+                        np.concatenate([self._unique_values[name], unique_values])
+                    )
+                self._unique_values[name] = unique_values
+                if name in self.identifier_columns:
+                    row_counts = column.value_counts(sort=False)
+                    if name in self._row_counts:
+                        row_counts = add_counts(self._row_counts[name], row_counts)
+                    self._row_counts[name] = row_counts.astype(np.int64)
+            elif pd.api.types.is_numeric_dtype(
+                column
+            ) and not pd.api.types.is_bool_dtype(column):
+                self._add_numeric_chunk(name, column)
+
+    # Combine the count, mean and sum of squared differences from the mean (m2) of @param column with those of the earlier chunks
+    # Uses the pairwise update of Chan et al. so the variance is accurate without a second pass
+    def _add_numeric_chunk(self, name: str, column: pd.Series):
+        values = column.dropna().to_numpy(dtype=float)
+        statistics = self._numeric_statistics.setdefault(
+            name,
+            {
+                "count": 0,
+                "mean": 0.0,
+                "m2": 0.0,
+                "min": None,
+                "max": None,
+                "non-negative integers": True,
+            },
+        )
+        if len(values) == 0:
+            return
+
+        count = len(values)
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = statistics["count"] + count
+        delta = mean - statistics["mean"]
+        statistics["mean"] += delta * count / total
+        statistics["m2"] += m2 + delta**2 * statistics["count"] * count / total
+        statistics["count"] = total
+
+        chunk_min = float(values.min())
+        chunk_max = float(values.max())
+        if statistics["min"] is None or chunk_min < statistics["min"]:
+            statistics["min"] = chunk_min
+        if statistics["max"] is None or chunk_max > statistics["max"]:
+            statistics["max"] = chunk_max
+        statistics["non-negative integers"] = bool(
+            statistics["non-negative integers"]
+            and chunk_min >= 0
+            and np.all(np.mod(values, 1) == 0)
+        )
+
+    def get_data(self) -> pd.DataFrame:
+        # The data is never held in memory
+        return None
+
+    def get_vector(self, name: str) -> "DataVector":
+        raise ValueError(
+            f"Cannot get the column {name} of a dataset that is read in chunks from {self.data_path}."
+        )
+
+    def compute_unique_values(self, names: List[str], n_workers: int = None):
+        # The unique values were computed while reading the file
+        pass
+
+    def get_unique_values(self, name: str) -> np.ndarray:
+        if name not in self._unique_values:
+            raise ValueError(
+                f"The unique values of {name} were not kept while reading {self.data_path} in chunks. Only categorical and identifier columns are kept: {self.categorical_columns + self.identifier_columns}"
+            )
+        return self._unique_values[name]
+
+    # Sketches of identifier columns are kept while reading the file, others are made by reading the file again
+    def get_cardinality_sketch(self, name: str, error: float) -> CardinalitySketch:
+        key = (name, error)
+        if key not in self._cardinality_sketches:
+
+            def compute() -> CardinalitySketch:
+                sketch = CardinalitySketch(error)
+                for chunk in self._read_chunks(columns=[name]):
+                    sketch.add(chunk[name])
+                return sketch
+
+            self._cardinality_sketches[key] = self._load_statistic(
+                (name, error, "sketch"), compute
+            )
+        return self._cardinality_sketches[key]
+
+    def get_codes(self, name: str) -> np.ndarray:
+        raise ValueError(
+            f"Cannot get the codes of the column {name} of a dataset that is read in chunks from {self.data_path}."
+        )
+
+    # Reads the file again, keeping only the combinations in each chunk
+    def get_observed_combinations(self, names: List[str]) -> pd.DataFrame:
+        key = tuple(names)
+        if key not in self._observed_combinations:
+
+            def compute() -> pd.DataFrame:
+                # Deduplicate each chunk, then all of them together once
+                combinations = [
+                    chunk[names].drop_duplicates()
+                    for chunk in self._read_chunks(columns=names)
+                ]
+                combinations = pd.concat(combinations).drop_duplicates()
+                return combinations.reset_index(drop=True)
+
+            self._observed_combinations[key] = self._load_statistic(
+                (key, "observed combinations"), compute
+            )
+        return self._observed_combinations[key]
+
+    # The observed combinations are kept in memory and updated as rows are appended
+    def keep_unique_counts_per(self, name: str, columns: List[str]):
+        for c in columns:
+            self.get_observed_combinations([name, c])
+
+    # Counts the combinations of values observed in the file (see get_observed_combinations)
+    def get_unique_counts_per(
+        self, name: str, columns: List[str], n_workers: int = None
+    ) -> pd.DataFrame:
+        counts = dict()
+        for c in columns:
+            combinations = self.get_observed_combinations([name, c]).dropna()
+            counts[c] = combinations.groupby(name, sort=False, observed=True)[c].size()
+        return pd.DataFrame(counts).fillna(0).astype(np.int64)
+
+    def get_column_names(self) -> List[str]:
+        # Every column read has a count of missing values
+        return list(self._missing.keys())
+
+    def get_row_counts(self, name: str) -> pd.Series:
+        if name not in self._row_counts:
+            raise ValueError(
+                f"The row counts of {name} were not kept while reading {self.data_path} in chunks. Only identifier columns are kept: {self.identifier_columns}"
+            )
+        return self._row_counts[name]
+
+    def get_summary(self) -> Dict:
+        summary = dict()
+        for (name, missing) in self._missing.items():
+            summary[str(name)] = {"count": self.length - missing, "missing": missing}
+            if name in self._unique_values:
+                summary[str(name)]["unique"] = len(self._unique_values[name])
+            elif (name, self.sketch_error) in self._cardinality_sketches:
+                sketch = self._cardinality_sketches[(name, self.sketch_error)]
+                summary[str(name)]["unique"] = sketch.estimate()
+        for (name, statistics) in self._numeric_statistics.items():
+            count = statistics["count"]
+            column_summary = summary[str(name)]
+            if count > 0:
+                column_summary["mean"] = statistics["mean"]
+                column_summary["std"] = (
+                    float(np.sqrt(statistics["m2"] / (count - 1)))
+                    if count > 1
+                    else None
+                )
+                column_summary["min"] = statistics["min"]
+                column_summary["max"] = statistics["max"]
+                column_summary["non-negative integers"] = statistics[
+                    "non-negative integers"
+                ]
+        return summary
+
+    def get_length(self):
+        return self.length
+
+    def has_data(self) -> bool:
+        return True
+
+
+"""
+Dataset for a table in a database, read through a DB-API connection (e.g.,
+from sqlite3). The counts Tisane checks, such as the number of unique
+values of a column and the number of instances of a measure per unit, are
+computed by the database. Columns are only read when their values are
+needed, e.g., to summarize the data for the GUI or to fit a model.
+"""
+
+
+class SQLDataset(Dataset):
+    connection: Any
+    table: str
+    # names of the columns read from the table
+    _column_names: List[str]
+    # number of rows in the table, counted when first needed
+    _length: int
+
+    # Reads the table @param table through @param connection, a DB-API connection, which is not closed
+    # Only @param columns are read (all columns if None), and @param categorical_columns and
+    # @param identifier_columns are stored compactly when read (see compact_columns)
+    def __init__(
+        self,
+        connection: Any,
+        table: str,
+        columns: List[str] = None,
+        categorical_columns: List[str] = None,
+        identifier_columns: List[str] = None,
+    ):
+        self.connection = connection
+        self.table = table
+        self.data_path = None
+        self.dataset = None
+        self.columns = columns
+        self.categorical_columns = list(categorical_columns or list())
+        self.identifier_columns = list(identifier_columns or list())
+        self._column_names = None
+        self._length = None
+        self._columns = dict()
+        self._row_counts = dict()
+        self._unique_values = dict()
+        self._unique_counts = dict()
+        self._observed_combinations = dict()
+        self._cardinality_sketches = dict()
+        self._cache = None
+        self._fingerprint = None
+
+    # @returns rows of the result of the query @param sql
+    def _execute(self, sql: str) -> List[Tuple]:
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    # @returns DataFrame with the result of the query @param sql, or iterator over DataFrames of @param chunksize rows
+    def _read_sql(self, sql: str, chunksize: int = None):
+        return pd.read_sql_query(sql, self.connection, chunksize=chunksize)
+
+    # @returns SELECT query for the columns @param names of the table
+    def _select(self, names: List[str], distinct: bool = False) -> str:
+        columns = ", ".join([quote_identifier(n) for n in names])
+        distinct = "DISTINCT " if distinct else ""
+        return f"SELECT {distinct}{columns} FROM {quote_identifier(self.table)}"
+
+    def get_data(self) -> pd.DataFrame:
+        # Read every column at once the first time the whole table is needed
+        if self._data is None:
+            df = self._read_sql(self._select(self.get_column_names()))
+            self.dataset = compact_columns(
+                df, self.categorical_columns, self.identifier_columns
+            )
+        return self.dataset
+
+    def get_vector(self, name: str) -> "DataVector":
+        if name not in self._columns:
+            if name not in self.get_column_names():
+                raise ValueError(
+                    f"Variable with name {name} is not part of the table {self.table}. Columns: {self.get_column_names()}"
+                )
+            if self._data is not None:
+                column = self._data[name]
+            else:
+                column = compact_columns(
+                    self._read_sql(self._select([name])),
+                    self.categorical_columns,
+                    self.identifier_columns,
+                )[name]
+            vector = DataVector(name, column)
+            if name in self._unique_values:
+                # Encode the column with the unique values in the order the database listed them
+                vector.set_categories(self._unique_values[name])
+            self._columns[name] = vector
+        return self._columns[name]
+
+    # Lists the unique values in the order the database returns them, which need not be the order of first appearance
+    def _compute_unique_values(self, name: str) -> np.ndarray:
+        rows = self._execute(self._select([name], distinct=True))
+        return to_array([r[0] for r in rows])
+
+    # The connection may not be shared between threads, so the database computes the columns one after another
+    def compute_unique_values(self, names: List[str], n_workers: int = None):
+        for name in dict.fromkeys(names):
+            if name in self.get_column_names():
+                self.get_unique_values(name)
+
+    def get_cardinality(self, name: str) -> int:
+        if name in self._unique_values:
+            return len(self._unique_values[name])
+        column = quote_identifier(name)
+        # COUNT(DISTINCT ...) ignores missing values, which count as one value
+        rows = self._execute(
+            f"SELECT COUNT(DISTINCT {column}), CASE WHEN COUNT(*) > COUNT({column}) THEN 1 ELSE 0 END FROM {quote_identifier(self.table)}"
+        )
+        return int(rows[0][0]) + int(rows[0][1])
+
+    # Reads only the column's unique values, a chunk at a time
+    def get_cardinality_sketch(self, name: str, error: float) -> CardinalitySketch:
+        key = (name, error)
+        if key not in self._cardinality_sketches:
+            sketch = CardinalitySketch(error)
+            for chunk in self._read_sql(
+                self._select([name], distinct=True), chunksize=SQL_CHUNKSIZE
+            ):
+                sketch.add(chunk[name])
+            self._cardinality_sketches[key] = sketch
+        return self._cardinality_sketches[key]
+
+    def get_observed_combinations(self, names: List[str]) -> pd.DataFrame:
+        key = tuple(names)
+        if key not in self._observed_combinations:
+            rows = self._execute(self._select(names, distinct=True))
+            columns = zip(*rows) if len(rows) > 0 else [list() for n in names]
+            self._observed_combinations[key] = pd.DataFrame(
+                {n: to_array(list(c)) for (n, c) in zip(names, columns)}
+            )
+        return self._observed_combinations[key]
+
+    def get_row_counts(self, name: str) -> pd.Series:
+        if name not in self._row_counts:
+            column = quote_identifier(name)
+            rows = self._execute(
+                f"SELECT {column}, COUNT(*) FROM {quote_identifier(self.table)} WHERE {column} IS NOT NULL GROUP BY {column}"
+            )
+            self._row_counts[name] = pd.Series(
+                [r[1] for r in rows],
+                index=to_array([r[0] for r in rows]),
+                name=name,
+                dtype=np.int64,
+            )
+        return self._row_counts[name]
+
+    # Counts each unit's unique values of every column in one GROUP BY query
+    def get_unique_counts_per(
+        self, name: str, columns: List[str], n_workers: int = None
+    ) -> pd.DataFrame:
+        group = quote_identifier(name)
+        counts = ", ".join([f"COUNT(DISTINCT {quote_identifier(c)})" for c in columns])
+        rows = self._execute(
+            f"SELECT {group}, {counts} FROM {quote_identifier(self.table)} WHERE {group} IS NOT NULL GROUP BY {group}"
+        )
+        counts = pd.DataFrame(
+            [r[1:] for r in rows],
+            index=to_array([r[0] for r in rows]),
+            columns=columns,
+        )
+        return counts.fillna(0).astype(np.int64)
+
+    # The database counts the unique values again whenever they are checked
+    def keep_unique_counts_per(self, name: str, columns: List[str]):
+        pass
+
+    def append(self, source: Union[str, os.PathLike, pd.DataFrame]) -> Dict:
+        raise ValueError(
+            f"Cannot append data to the table {self.table} from Tisane. Insert the rows into the table, then assign the data again."
+        )
+
+    def get_column_names(self) -> List[str]:
+        if self._column_names is None:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(
+                    f"SELECT * FROM {quote_identifier(self.table)} WHERE 1 = 0"
+                )
+                names = [d[0] for d in cursor.description]
+            finally:
+                cursor.close()
+            if self.columns is not None:
+                names = [n for n in names if n in set(self.columns)]
+            self._column_names = names
+        return self._column_names
+
+    def get_length(self):
+        if self._length is None:
+            rows = self._execute(f"SELECT COUNT(*) FROM {quote_identifier(self.table)}")
+            self._length = int(rows[0][0])
+        return self._length
+
+    def has_data(self) -> bool:
+        return True
+
+
+"""
+A column of data, encoded once for every check and summary that needs it.
+Categorical columns (e.g., Nominal, Ordinal, Unit and SetUp variables) are
+factorized into integer codes and a table of categories; numeric columns are
+also available as float arrays, which share memory with the data when the
+column is already stored as floats.
+"""
+
+
 class DataVector(object):
     name: str
-    values: pd.DataFrame
+    # the column's values, as stored in the dataset
+    column: pd.Series
+    # position of each row's value in _categories, computed when first needed
+    _codes: np.ndarray
+    # unique values in the column (including a missing value, if any), in order of first appearance
+    _categories: np.ndarray
 
-    # def __init__(self, name: str, values: pd.DataFrame):
-    #     self.name = name
-    #     self.values = values
+    def __init__(self, name: str, column: pd.Series):
+        self.name = name
+        self.column = column
+        self._codes = None
+        self._categories = None
 
-    def get_cardinality(self):
-        pass
+    def _factorize(self):
+        # Factorizing with missing values as a category checks every value for
+        # missingness first (and is not available before pandas 1.5), so place
+        # the missing value from the codes instead
+        # Categorical columns are factorized from their codes
+        (codes, categories) = pd.factorize(self.column.values)
+        categories = np.asarray(categories)
+        missing = codes < 0
+        if missing.any():
+            if categories.dtype.kind not in "fcO":
+                # e.g., integer categories of a Categorical, which cannot hold a missing value
+                categories = categories.astype(object)
+            # Where the first missing value appears among the categories, as unique() does
+            position = int(codes[: np.argmax(missing)].max(initial=-1)) + 1
+            codes[codes >= position] += 1
+            codes[missing] = position
+            categories = np.insert(categories, position, np.nan)
+        (self._codes, self._categories) = (codes, categories)
+
+    # @returns position of each row's value in get_categories()
+    def get_codes(self) -> np.ndarray:
+        if self._codes is None:
+            if self._categories is None:
+                self._factorize()
+            else:
+                codes = pd.Index(self._categories).get_indexer(self.column)
+                missing_code = self.get_missing_code()
+                if missing_code is not None:
+                    # None and pd.NA in the column do not match the NaN in the categories
+                    codes[self.get_missing()] = missing_code
+                self._codes = codes
+        return self._codes
+
+    # @returns unique values in the column, in order of first appearance
+    def get_categories(self) -> np.ndarray:
+        if self._categories is None:
+            # Most checks only need the categories, which pd.unique finds in about half the time
+            # factorizing takes; get_codes looks the values up in them if the codes are needed later
+            categories = np.asarray(pd.unique(self.column.values))
+            if categories.dtype == object:
+                # Missing values are NaN, as when factorizing, rather than None or pd.NA
+                categories[pd.isna(categories)] = np.nan
+            self._categories = categories
+        return self._categories
+
+    # Use @param categories, the column's unique values in order of first appearance (e.g., from a cache), instead of factorizing the column
+    def set_categories(self, categories: np.ndarray):
+        if self._categories is None:
+            self._categories = categories
+
+    # @returns number of unique values in the column, counting missing values as one value
+    def get_cardinality(self) -> int:
+        return len(self.get_categories())
+
+    # @returns code of missing values in get_codes(), or None if no values are missing
+    def get_missing_code(self) -> int:
+        missing = np.flatnonzero(pd.isna(self.get_categories()))
+        return int(missing[0]) if len(missing) > 0 else None
+
+    # @returns boolean array that is True for each row missing a value
+    def get_missing(self) -> np.ndarray:
+        return self.column.isna().to_numpy()
+
+    def is_numeric(self) -> bool:
+        return pd.api.types.is_numeric_dtype(
+            self.column
+        ) and not pd.api.types.is_bool_dtype(self.column)
+
+    # @returns the column's values as floats, without copying them if they are already floats
+    def get_values(self) -> np.ndarray:
+        return self.column.to_numpy(dtype=float, copy=False)
+
+    # @returns a JSON-serializable dict summarizing the column: counts for all columns, and
+    # mean, standard deviation, range and histogram for numeric columns
+    def get_summary(self) -> Dict:
+        summary = dict()
+        missing = self.get_missing()
+        summary["missing"] = int(missing.sum())
+        summary["count"] = int(len(missing) - summary["missing"])
+        summary["unique"] = self.get_cardinality() - int(
+            self.get_missing_code() is not None
+        )
+
+        if self.is_numeric():
+            values = self.get_values()
+            if summary["missing"] > 0:
+                values = values[~missing]
+            if len(values) > 0:
+                summary["mean"] = float(values.mean())
+                summary["std"] = float(values.std(ddof=1)) if len(values) > 1 else None
+                summary["min"] = float(values.min())
+                summary["max"] = float(values.max())
+                summary["non-negative integers"] = bool(
+                    summary["min"] >= 0 and np.all(np.mod(values, 1) == 0)
+                )
+
+                bin_edges = np.histogram_bin_edges(values, bins="auto")
+                if len(bin_edges) - 1 > MAX_HISTOGRAM_BINS:
+                    bin_edges = np.histogram_bin_edges(values, bins=MAX_HISTOGRAM_BINS)
+                (counts, bin_edges) = np.histogram(values, bins=bin_edges)
+                summary["histogram"] = {
+                    "counts": counts.tolist(),
+                    "bin edges": bin_edges.tolist(),
+                }
+
+        return summary
@@ -0,0 +1,116 @@
+"""
+Cache of column statistics for data files, so that checking a design again
+against an unchanged file does not scan the file again.
+Each entry is a pickle file in the cache directory, named by the hash of the
+file's fingerprint and the statistic. When the directory grows beyond its
+maximum size, the least recently used entries are removed.
+"""
+
+import os
+import hashlib
+import pickle
+import tempfile
+from typing import Any, Union
+
+# Default maximum size of a cache directory, in bytes (1 GiB)
+DEFAULT_CACHE_SIZE = 2**30
+
+# Number of evenly spaced blocks of a file hashed in its fingerprint, and their size in bytes
+FINGERPRINT_BLOCKS = 16
+FINGERPRINT_BLOCK_SIZE = 2**16
+
+
+# @returns cheap fingerprint of the contents of the file at @param path: its size, modification time, and
+# a hash of FINGERPRINT_BLOCKS blocks spread evenly over the file (including the first and last)
+def get_file_fingerprint(path: Union[str, os.PathLike]) -> str:
+    status = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{status.st_size}:{status.st_mtime_ns}".encode())
+    with open(path, "rb") as f:
+        last_offset = max(status.st_size - FINGERPRINT_BLOCK_SIZE, 0)
+        offsets = {
+            last_offset * i // (FINGERPRINT_BLOCKS - 1)
+            for i in range(FINGERPRINT_BLOCKS)
+        }
+        for offset in sorted(offsets):
+            f.seek(offset)
+            digest.update(f.read(FINGERPRINT_BLOCK_SIZE))
+
+    return digest.hexdigest()
+
+
+class StatisticsCache(object):
+    directory: os.PathLike
+    # Maximum total size of the entries in bytes
+    max_size: int
+
+    def __init__(
+        self, directory: Union[str, os.PathLike], max_size: int = DEFAULT_CACHE_SIZE
+    ):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    # @returns path of the entry for @param key, any picklable value that identifies a statistic
+    def _get_entry_path(self, key: Any) -> str:
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{name}.pkl")
+
+    # @returns the value stored for @param key, or None if there is none
+    def load(self, key: Any) -> Any:
+        path = self._get_entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Unpickling can fail in many ways (truncated file, class moved or renamed between versions);
+            # the entry is of no use then, so remove it and compute the statistic again
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return value
+
+    # Store @param value for @param key, then evict the least recently used entries if the cache is too large
+    def store(self, key: Any, value: Any):
+        path = self._get_entry_path(key)
+        # Write to a temporary file first so other processes never read part of an entry
+        (fd, temporary_path) = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+        self._evict()
+
+    def _evict(self):
+        entries = list()
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                try:
+                    status = entry.stat()
+                except FileNotFoundError:
+                    # Evicted by another thread or process
+                    continue
+                entries.append((status.st_mtime_ns, status.st_size, entry.path))
+        total_size = sum(size for (mtime, size, path) in entries)
+        for (mtime, size, path) in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
@@ -7,12 +7,18 @@ from tisane.variable import (
     Ordinal,
     Has,
     Nests,
+    Numeric,
     Repeats,
+    NumberValue,
+    Exactly,
+    Per,
 )
 from tisane.graph import Graph
-from tisane.data import Dataset
+from tisane.data import Dataset, SQLDataset, StreamingDataset
+from tisane.data_cache import StatisticsCache
 
 import os
+import warnings
 from typing import List
 import typing  # to use typing.Union; Union is overloaded in z3
 import pandas as pd
@@ -25,6 +31,18 @@ Relies on Class Treatment, Nests, Repeats
 
 interaction_effects = list()
 
+# Types of the variables in a schema (see Design.from_schema)
+VARIABLE_TYPES = ["unit", "setup", "numeric", "nominal", "ordinal"]
+
+
+# @returns the type of measure (see VARIABLE_TYPES) for @param column, from its dtype
+def _get_variable_type(column: pd.Series) -> str:
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return "ordinal" if column.cat.ordered else "nominal"
+    if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+        return "numeric"
+    return "nominal"
+
 
 class Design(object):
     """Represents your study design
@@ -37,6 +55,19 @@ class Design(object):
         A list of the **i**\ ndependent **v**\ ariable(s).
     source : os.PathLike or pd.DataFrame, optional
         For internal use only.
+    observed_interactions : bool, default=False
+        Whether to count only the combinations of categories that
+        occur in the data when calculating the cardinality and
+        categories of interaction effects. By default, every possible
+        combination of the moderators' categories is counted.
+    approximate_cardinality : float, optional
+        If given, estimate the cardinality of `Unit` and `SetUp`
+        variables from the data with a sketch whose relative standard
+        error is about `approximate_cardinality` (e.g., 0.01), instead of
+        counting every unique value exactly. This uses much less memory
+        for columns with many millions of ids. A cardinality that differs
+        from the estimate by no more than the sketch's error only issues
+        a warning.
 
     Attributes
     ----------
@@ -48,6 +79,12 @@ class Design(object):
         The dependent variable in the study design
     ivs : List[AbstractVariable]
         The independent variable(s), if any, in your study design
+    observed_interactions : bool
+        Whether interaction effects only have the combinations of
+        categories that occur in the data
+    approximate_cardinality : float
+        The relative error of the sketches used to estimate the
+        cardinality of units and set ups, or None to count exactly
 
     """
 
@@ -55,25 +92,34 @@ class Design(object):
     ivs: List[AbstractVariable]
     graph: Graph  # IR
     dataset: Dataset
+    observed_interactions: bool
+    approximate_cardinality: float
+    # variables whose cardinality or categories were calculated from the data rather than specified
+    _calculated_cardinalities: List[AbstractVariable]
+    _calculated_categories: List[AbstractVariable]
 
     def __init__(
         self,
         dv: AbstractVariable,
         ivs: List[AbstractVariable],
         source: typing.Union[os.PathLike, pd.DataFrame] = None,
+        observed_interactions: bool = False,
+        approximate_cardinality: float = None,
     ):
         self.dv = dv
+        self.observed_interactions = observed_interactions
+        self.approximate_cardinality = approximate_cardinality
+        self._calculated_cardinalities = list()
+        self._calculated_categories = list()
 
         self.ivs = ivs  # TODO: May want to replace this if move away from Design as Query object
 
         self.graph = Graph()  # empty graph
 
-        # Add all variables to the graph
-        # Add dv
-        self._add_variable_to_graph(self.dv)
-        # Add all ivs
-        for v in ivs:
-            self._add_variable_to_graph(v)
+        # Add all variables to the graph, dv first
+        self.graph.add_relationships(
+            [r for v in [self.dv] + ivs for r in v.relationships]
+        )
 
         # Add any nesting relationships involving IVs that may be implicit
         self._add_nesting_relationships_to_graph()
@@ -82,12 +128,191 @@ class Design(object):
         self._add_identifiers_has_relationships_to_graph()
 
         if source is not None:
-            self.dataset = Dataset(source)
+            self.dataset = self._load_data(source)
             # Check and update cardinality for variables in this design
             self.check_variable_cardinality()
+            self.check_data_structure()
         else:
             self.dataset = None
 
+    @classmethod
+    def from_schema(
+        cls,
+        data: pd.DataFrame,
+        schema: typing.Dict[str, typing.Union[str, typing.Dict]],
+        dv: str,
+        ivs: List[str] = None,
+        n_workers: int = None,
+        **kwargs,
+    ):
+        """Create a study design and its variables from a DataFrame and a schema
+
+        A faster alternative to declaring each variable with
+        :py:meth:`tisane.Unit.numeric`, :py:meth:`tisane.Unit.nominal` and
+        :py:meth:`tisane.Unit.ordinal` when there are many variables. Every
+        variable is created from one entry of `schema`, and the data is
+        assigned to the design as in `assign_data`.
+
+        Columns stored as pandas categoricals are already factorized, so
+        their categories (and the order of ordered categoricals) are used
+        as the variables' categories without looking at the values.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            The data, with a column for each variable in `schema`.
+        schema : dict
+            Maps column names to variables. Each value is either
+            ``"unit"`` or ``"setup"``, or a dict with the keys:
+
+            - ``"type"``: one of ``"unit"``, ``"setup"``, ``"numeric"``,
+              ``"nominal"`` or ``"ordinal"``. By default, measures are
+              ordinal if the column is an ordered categorical, nominal
+              if it is another categorical, a string or a boolean, and
+              numeric otherwise.
+            - ``"unit"``: for measures, the name of the unit the measure
+              is an attribute of. Required.
+            - ``"number_of_instances"``: for measures, as in
+              :py:meth:`tisane.Unit.numeric`. A string is the name of
+              another variable in `schema`. Defaults to 1.
+            - ``"nests_within"``: for units, the name (or a list of
+              names) of the units it is nested within.
+            - ``"cardinality"``, ``"categories"`` and ``"order"``: as in
+              the constructors of the variables.
+        dv : str
+            The name of the dependent variable.
+        ivs : List[str], optional
+            The names of the independent variables. By default, every
+            measure in `schema` except `dv`.
+        n_workers : int, optional
+            The number of threads to check the data with (see `assign_data`).
+        **kwargs : optional
+            Passed on to `Design`, e.g., `observed_interactions`.
+
+        Returns
+        -------
+        Design
+            The study design, with the data assigned
+
+        Raises
+        ------
+        ValueError
+            If an entry of `schema` has an unknown type, a measure does
+            not name its unit, or ``"nests_within"`` or
+            ``"number_of_instances"`` names a variable that is not a unit
+            or set up in `schema`. Also if `dv` or one of `ivs` is not in
+            `schema`, or an ordinal variable has no ``"order"`` and no
+            column in `data` to infer it from.
+
+        Examples
+        --------
+
+        >>> schema = {
+        ...     "participant": {"type": "unit", "nests_within": "school"},
+        ...     "school": "unit",
+        ...     "week": "setup",
+        ...     "condition": {"unit": "participant"},
+        ...     "score": {"unit": "participant", "number_of_instances": "week"},
+        ... }
+        >>> design = ts.Design.from_schema(df, schema, dv="score")
+        >>> condition = design.graph.get_variable("condition")
+
+        """
+        entries = dict()
+        for (name, entry) in schema.items():
+            if isinstance(entry, str):
+                entry = {"type": entry}
+            entry = dict(entry)
+            if "type" not in entry:
+                entry["type"] = _get_variable_type(data[name])
+            if entry["type"] not in VARIABLE_TYPES:
+                raise ValueError(
+                    f"Variable {name} has the type {entry['type']}. The type must be one of {VARIABLE_TYPES}."
+                )
+            entries[name] = entry
+        for name in [dv] + ([] if ivs is None else list(ivs)):
+            if name not in entries:
+                raise ValueError(f"Variable {name} is not in the schema.")
+
+        # Create the units and set ups first, since measures refer to them
+        variables = dict()
+        for (name, entry) in entries.items():
+            if entry["type"] == "unit":
+                variables[name] = Unit(name, cardinality=entry.get("cardinality"))
+            elif entry["type"] == "setup":
+                variables[name] = SetUp(
+                    name, order=entry.get("order"), cardinality=entry.get("cardinality")
+                )
+        for (name, entry) in entries.items():
+            if entry["type"] != "unit":
+                continue
+            groups = entry.get("nests_within", list())
+            for group in [groups] if isinstance(groups, str) else groups:
+                if not isinstance(variables.get(group), Unit):
+                    raise ValueError(
+                        f"Unit {name} nests within {group}, which is not a unit in the schema."
+                    )
+                variables[name].nests_within(variables[group])
+
+        for (name, entry) in entries.items():
+            if entry["type"] in ("unit", "setup"):
+                continue
+            unit = variables.get(entry.get("unit"))
+            if not isinstance(unit, Unit):
+                raise ValueError(
+                    f"Measure {name} must be an attribute of a unit. Specify the name of a unit in the schema with 'unit'."
+                )
+            number_of_instances = entry.get("number_of_instances", 1)
+            if isinstance(number_of_instances, str):
+                if not isinstance(variables.get(number_of_instances), (Unit, SetUp)):
+                    raise ValueError(
+                        f"Measure {name} has number_of_instances {number_of_instances}, which is not a unit or set up in the schema."
+                    )
+                number_of_instances = variables[number_of_instances]
+            column = data[name] if name in data.columns else None
+            categories = None
+            if column is not None and isinstance(column.dtype, pd.CategoricalDtype):
+                categories = list(column.cat.categories)
+            if entry["type"] == "numeric":
+                variables[name] = unit.numeric(
+                    name, number_of_instances=number_of_instances
+                )
+            elif entry["type"] == "nominal":
+                categories = entry.get("categories", categories)
+                cardinality = entry.get("cardinality")
+                if cardinality is None and categories is not None:
+                    cardinality = len(categories)
+                variables[name] = unit.nominal(
+                    name,
+                    cardinality=cardinality,
+                    categories=categories,
+                    number_of_instances=number_of_instances,
+                )
+            else:
+                order = entry.get("order", categories)
+                if order is None and column is None:
+                    raise ValueError(
+                        f"Ordinal variable {name} has no 'order' in the schema and no column in the data to infer it from."
+                    )
+                if order is None:
+                    order = sorted(column.dropna().unique().tolist())
+                variables[name] = unit.ordinal(
+                    name,
+                    order=order,
+                    cardinality=entry.get("cardinality"),
+                    number_of_instances=number_of_instances,
+                )
+
+        if ivs is None:
+            ivs = [
+                n
+                for (n, entry) in entries.items()
+                if entry["type"] not in ("unit", "setup") and n != dv
+            ]
+        design = cls(dv=variables[dv], ivs=[variables[n] for n in ivs], **kwargs)
+
+        return design.assign_data(data, n_workers=n_workers)
+
     def __str__(self):
         ivs_descriptions = list()
         for v in self.ivs:
@@ -107,34 +332,60 @@ class Design(object):
 
     # Calculates and assigns cardinality to variables if cardinality is not already specified
     # If calculated cardinality differs from cardinality estimated from the data, raises a ValueError
-    def check_variable_cardinality(self):
+    # The ValueError lists every variable whose cardinality or categories do not match the data
+    # Mismatches for units and set ups within the error of approximate counts (see approximate_cardinality) only issue warnings
+    # The columns' unique values are computed by @param n_workers threads, if more than one; errors are still listed in the order of the variables
+    def check_variable_cardinality(self, n_workers: int = None):
         assert self.dataset is not None
         assert isinstance(self.dataset, Dataset)
 
         variables = self.graph.get_variables()
+        errors = list()
 
+        # Compute the unique values of every column checked below up front, one column per task
+        columns = list()
+        for v in variables:
+            if isinstance(v, Nominal) and v.isInteraction and v.moderators:
+                columns.extend(
+                    [m.name for m in v.moderators if not isinstance(m, Numeric)]
+                )
+            elif isinstance(v, Nominal) or isinstance(v, Ordinal):
+                columns.append(v.name)
+            elif (isinstance(v, Unit) or isinstance(v, SetUp)) and (
+                self.approximate_cardinality is None
+            ):
+                columns.append(v.name)
+        self.dataset.compute_unique_values(columns, n_workers=n_workers)
+
+        # Each column's unique values are computed once by the dataset and
+        # reused for the cardinality and categories of every variable below
         for v in variables:
             if isinstance(v, Nominal):
-                # If cardinality was not specified previously, calculate it
-                if v.cardinality is None:
-                    v.assign_cardinality_from_data(self.dataset)
-
-                # If categories were not specified previously, calculate it
-                if v.categories is None:
-                    v.assign_categories_from_data(self.dataset)
-
-                # Check now
                 calculated_cardinality = v.calculate_cardinality_from_data(
-                    data=self.dataset
+                    data=self.dataset, observed=self.observed_interactions
                 )
                 calculated_categories = v.calculate_categories_from_data(
-                    data=self.dataset
+                    data=self.dataset, observed=self.observed_interactions
                 )
+                # If cardinality was not specified previously, use the calculated one
+                # Interactions limited to the observed combinations always use the calculated one
+                if v.cardinality is None or (
+                    v.isInteraction and self.observed_interactions
+                ):
+                    v.cardinality = calculated_cardinality
+                    self._add_calculated(self._calculated_cardinalities, v)
+
+                # If categories were not specified previously, use the calculated ones
+                if v.categories is None:
+                    v.categories = calculated_categories
+                    self._add_calculated(self._calculated_categories, v)
+
+                # Check now
                 assert calculated_cardinality == len(calculated_categories)
 
                 if calculated_cardinality > v.cardinality:
                     diff = calculated_cardinality - v.cardinality
-                    raise ValueError(
+                    errors.append(
                         f"Variable {v.name} is specified to have cardinality = {v.cardinality}. However, in the data provided, {v.name} has {calculated_cardinality} unique values. There appear to be {diff} more categories in the data than you expect."
                     )
                 # It is ok for there to be fewer categories (not all categories may be represented in the data) than the user expected
@@ -143,8 +394,7 @@ class Design(object):
                 if not v.isInteraction:
                     diff = set(calculated_categories) - set(v.categories)
                     if len(diff) > 0:
-
-                        raise ValueError(
+                        errors.append(
                             f"Variable {v.name} is specified to have the following categories: {v.categories}. However, in the data provided, {v.name} has {calculated_categories} unique values. These are the categories that exist in the data but you may not have expected: {diff}"
                         )
                 # It is ok for there to be fewer categories (not all categories may be represented in the data) than the user expected
@@ -156,51 +406,203 @@ class Design(object):
 
                 if calculated_cardinality > v.cardinality:
                     diff = calculated_cardinality - v.cardinality
-                    raise ValueError(
+                    errors.append(
                         f"Variable {v.name} is specified to have cardinality = {v.cardinality}. However, in the data provided, {v.name} has {calculated_cardinality} unique values. There appear to be {diff} more categories in the data than you expect."
                     )
                 # It is ok for there to be fewer categories (not all categories may be represented in the data) than the user expected
 
             elif isinstance(v, Unit):
-                # If cardinality was not specified previously, calculate it
-                if v.cardinality is None:
-                    v.assign_cardinality_from_data(self.dataset)
-
                 calculated_cardinality = v.calculate_cardinality_from_data(
-                    data=self.dataset
+                    data=self.dataset, error=self.approximate_cardinality
                 )
+                # If cardinality was not specified previously, use the calculated one
+                if v.cardinality is None:
+                    v.cardinality = calculated_cardinality
+                    self._add_calculated(self._calculated_cardinalities, v)
 
                 if calculated_cardinality != v.cardinality:
                     diff = calculated_cardinality - v.cardinality
-                    raise ValueError(
-                        f"Unit {v.name} is specified to have cardinality = {v.cardinality}. However, in the data provided, {v.name} has {calculated_cardinality} unique values. There appear to be {diff} more instances of the unit in the data than you expect."
-                    )
+                    message = f"Unit {v.name} is specified to have cardinality = {v.cardinality}. However, in the data provided, {v.name} has {calculated_cardinality} unique values. There appear to be {diff} more instances of the unit in the data than you expect."
+                    if self._is_within_approximation_error(v, v.cardinality):
+                        warnings.warn(
+                            f"{message} This is within the error of the approximate count, so it may not be a real mismatch."
+                        )
+                    else:
+                        errors.append(message)
             elif isinstance(v, SetUp):
                 v_cardinality = v.get_cardinality()
                 # If cardinality was not specified previously, calculate it
                 if v_cardinality is None:
-                    v.assign_cardinality_from_data(self.dataset)
+                    v.assign_cardinality_from_data(
+                        self.dataset, error=self.approximate_cardinality
+                    )
 
                 calculated_cardinality = v.calculate_cardinality_from_data(
-                    data=self.dataset
+                    data=self.dataset, error=self.approximate_cardinality
                 )
 
                 if calculated_cardinality != v_cardinality:
                     diff = calculated_cardinality - v_cardinality
                     if diff > 0:
-                        raise ValueError(
-                            f"SetUp {v.name} is specified to have cardinality = {v_cardinality}. However, in the data provided, {v.name} has {calculated_cardinality} unique values. There appear to be {diff} more instances of the setting in the data than you expect."
-                        )
+                        message = f"SetUp {v.name} is specified to have cardinality = {v_cardinality}. However, in the data provided, {v.name} has {calculated_cardinality} unique values. There appear to be {diff} more instances of the setting in the data than you expect."
                     else:
                         assert diff < 0
-                        raise ValueError(
-                            f"SetUp {v.name} is specified to have cardinality = {v_cardinality}. However, in the data provided, {v.name} has {calculated_cardinality} unique values. There appear to be {diff} fewer instances of the setting in the data than you expect."
+                        message = f"SetUp {v.name} is specified to have cardinality = {v_cardinality}. However, in the data provided, {v.name} has {calculated_cardinality} unique values. There appear to be {diff} fewer instances of the setting in the data than you expect."
+                    if self._is_within_approximation_error(v, v_cardinality):
+                        warnings.warn(
+                            f"{message} This is within the error of the approximate count, so it may not be a real mismatch."
                         )
+                    else:
+                        errors.append(message)
             # else:
             # import pdb; pdb.set_trace()
 
+        if len(errors) > 0:
+            raise ValueError("\n".join(errors))
+
+    # Add @param variable to @param calculated, a list of variables whose cardinality or categories were calculated from the data
+    def _add_calculated(
+        self, calculated: List[AbstractVariable], variable: AbstractVariable
+    ):
+        if not any(v is variable for v in calculated):
+            calculated.append(variable)
+
+    # Checks that the data respects the nesting relationships and numbers of instances declared in this design
+    # The data is grouped once for each unit to count the groups it belongs to and the instances of its measures
+    # Measures declared to have at least as many instances as any unit has rows are not counted, since they cannot have more
+    # Raises a ValueError listing every unit that belongs to more than one group it nests within or
+    # has more instances of a measure than declared. Warns if units have fewer rows than an exact number of instances
+    # The columns are counted by @param n_workers threads, if more than one
+    def check_data_structure(self, n_workers: int = None):
+        assert self.dataset is not None
+        assert isinstance(self.dataset, Dataset)
+
+        if (
+            isinstance(self.dataset, StreamingDataset)
+            and self.dataset.sketch_error is not None
+        ):
+            # Only sketches of the units were kept, so there is nothing to group by
+            return
+
+        checks = self._get_data_structure_checks()
+        errors = list()
+        for (unit, unit_checks) in checks.items():
+            row_counts = None
+            (min_rows, max_rows) = (None, None)
+            if any(isinstance(r, Has) for (c, r) in unit_checks):
+                row_counts = self.dataset.get_row_counts(unit.name)
+                if len(row_counts) > 0:
+                    (min_rows, max_rows) = (row_counts.min(), row_counts.max())
+                else:
+                    (min_rows, max_rows) = (0, 0)
+            # A unit cannot have more instances of a measure than it has rows, so
+            # only count the measures declared to have fewer instances than that
+            columns = list()
+            for (column, relationship) in unit_checks:
+                if isinstance(relationship, Has):
+                    number_of_instances = self._get_number_of_instances(
+                        relationship.repetitions
+                    )
+                    if number_of_instances is None or number_of_instances >= max_rows:
+                        continue
+                columns.append(column.name)
+            columns = list(dict.fromkeys(columns))
+            unique_counts = pd.DataFrame()
+            if len(columns) > 0:
+                unique_counts = self.dataset.get_unique_counts_per(
+                    unit.name, columns, n_workers=n_workers
+                )
+            for (column, relationship) in unit_checks:
+                if isinstance(relationship, Nests):
+                    counts = unique_counts[column.name]
+                    too_many = counts[counts > 1]
+                    if len(too_many) > 0:
+                        errors.append(
+                            f"Unit {unit.name} is specified to be nested within {column.name}, so each {unit.name} should belong to exactly one {column.name}. However, in the data provided, {len(too_many)} of the {len(counts)} values of {unit.name} belong to more than one {column.name}. For example, {unit.name} = {too_many.index[0]} belongs to {too_many.iloc[0]}."
+                        )
+                    continue
+
+                measure = relationship.measure
+                number_of_instances = self._get_number_of_instances(
+                    relationship.repetitions
+                )
+                if number_of_instances is None:
+                    continue
+                if column.name in unique_counts:
+                    counts = unique_counts[column.name]
+                    too_many = counts[counts > number_of_instances]
+                    if len(too_many) > 0:
+                        errors.append(
+                            f"Unit {unit.name} is specified to have at most {number_of_instances} instance(s) of {measure.name}. However, in the data provided, {len(too_many)} of the {len(counts)} values of {unit.name} have more. For example, {unit.name} = {too_many.index[0]} has {too_many.iloc[0]} different values of {column.name}."
+                        )
+                if (
+                    isinstance(relationship.repetitions, Exactly)
+                    and number_of_instances > min_rows
+                ):
+                    too_few = row_counts[row_counts < number_of_instances]
+                    if len(too_few) > 0:
+                        warnings.warn(
+                            f"Unit {unit.name} is specified to have exactly {number_of_instances} instance(s) of {measure.name}. However, in the data provided, {len(too_few)} of the {len(row_counts)} values of {unit.name} have fewer rows than that. For example, {unit.name} = {too_few.index[0]} has {too_few.iloc[0]}. The data may be missing some instances."
+                        )
+
+        if len(errors) > 0:
+            raise ValueError("\n".join(errors))
+
+    # @returns dict of unit -> list of (column to count per unit, relationship) for every relationship
+    # whose variables are both in the data (see check_data_structure)
+    def _get_data_structure_checks(self) -> typing.Dict:
+        column_names = set(self.dataset.get_column_names())
+        checks = dict()
+        for (n0, n1, edge_data) in self.graph.get_edges():
+            edge_obj = edge_data["edge_obj"]
+            if isinstance(edge_obj, Nests):
+                (unit, column) = (edge_obj.base, edge_obj.group)
+            elif isinstance(edge_obj, Has):
+                unit = edge_obj.variable
+                # Instances are told apart by the values of according_to, if any, and otherwise by the measure's values
+                column = edge_obj.according_to or edge_obj.measure
+            else:
+                continue
+            if unit.name in column_names and column.name in column_names:
+                checks.setdefault(unit, list()).append((column, edge_obj))
+
+        return checks
+
+    # @returns the number of instances declared by @param repetitions, or None if it is not known before looking at the data
+    def _get_number_of_instances(self, repetitions: NumberValue) -> int:
+        if isinstance(repetitions, Per) and repetitions.cardinality:
+            variable = repetitions.variable
+            if isinstance(variable, SetUp) and isinstance(variable.variable, Numeric):
+                # The set up's cardinality was not specified, so the only bound is the data itself
+                return None
+            # Use the cardinality now, in case it was calculated from the data
+            cardinality = variable.get_cardinality()
+            if cardinality is None:
+                return None
+            return repetitions.number.get_value() * cardinality
+
+        return repetitions.get_value()
+
+    # @returns True if this design approximates cardinality and @param cardinality is within the error of the estimate for @param variable
+    def _is_within_approximation_error(
+        self, variable: AbstractVariable, cardinality: int
+    ) -> bool:
+        if self.approximate_cardinality is None:
+            return False
+        sketch = self.dataset.get_cardinality_sketch(
+            variable.name, self.approximate_cardinality
+        )
+        return sketch.is_within_error(cardinality)
+
     # Associate this Study Design with a Dataset
-    def assign_data(self, source: typing.Union[os.PathLike, pd.DataFrame]):
+    def assign_data(
+        self,
+        source: typing.Union[os.PathLike, pd.DataFrame],
+        chunksize: int = None,
+        n_workers: int = None,
+        cache_dir: os.PathLike = None,
+        table: str = None,
+    ):
         """Associate this study design with a dataset
 
         Assigning data to the study design allows Tisane to perform
@@ -215,12 +617,49 @@ class Design(object):
         to make sure that the cardinality of the variable and the
         cardinality in the data make sense.
 
+        The `Design` also checks that the data has the structure the
+        variables declare: that each unit is nested within one group
+        of the unit it is nested in, and that each unit has the
+        declared number of instances of its measures, or fewer. A
+        `ValueError` lists every mismatch. These checks are skipped when the data
+        is read in chunks (`chunksize`) by a `Design` with
+        `approximate_cardinality`, because only sketches of the units'
+        values are kept, not the values to group the rows by.
+
         Parameters
         ----------
         source : os.PathLike or pandas.DataFrame
             How to get the data. This can be a string containing
             a path, such as "path/to/my/data.csv", or some kind of path object, or simply a `Pandas DataFrame <https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.html>`_.
-            If it is a path, it must be a csv file.
+            If it is a path, it must be a csv, Parquet (.parquet, .pq) or
+            Feather/Arrow IPC (.feather, .arrow, .ipc) file. Parquet and
+            Feather files are memory mapped and require pyarrow.
+            It can also be a DB-API connection to a database, such as
+            one from `sqlite3.connect`, with the data in `table`.
+        chunksize : int, optional
+            If the data is in a file too large to fit in memory,
+            the number of rows to read at a time. The data is then
+            never loaded in full: only the statistics needed to check
+            the design are kept.
+        n_workers : int, optional
+            The number of threads to use to check the variables'
+            cardinality, nesting and number of instances against the
+            data, one column at a time. Useful
+            for designs with hundreds of variables. By default, the
+            columns are checked one after another.
+        cache_dir : os.PathLike, optional
+            A directory in which to keep statistics about the columns
+            of the data file, such as their unique values. When the
+            design is checked against the same, unchanged file again,
+            the statistics are read from the directory instead of
+            being computed again, and in chunked mode the file is not
+            read at all. The least recently used statistics are removed
+            once the directory holds more than 1 GiB.
+        table : str, optional
+            If `source` is a database connection, the name of the table
+            with the data. The database counts the unique values and
+            the instances per unit that Tisane checks, and columns are
+            only read when their values are needed, e.g., to fit a model.
 
         Returns
         -------
@@ -243,13 +682,178 @@ class Design(object):
 
         >>> design = ts.Design(ivs=[exercise_condition], dv=weight).assign_data(rats_df)
 
+        If "rats_data.csv" is too large to fit in memory, read it one million rows at a time.
+
+        >>> design = ts.Design(ivs=[exercise_condition], dv=weight).assign_data("rats_data.csv", chunksize=1000000)
+
+        Keep the statistics of "rats_data.csv" in a directory next to it, so running the script again is faster.
+
+        >>> design = ts.Design(ivs=[exercise_condition], dv=weight).assign_data("rats_data.csv", chunksize=1000000, cache_dir=".tisane_cache")
+
+        If the data is in the table "rats" of a SQLite database instead, let the database count the values.
+
+        >>> import sqlite3
+        >>> connection = sqlite3.connect("rats.db")
+        >>> design = ts.Design(ivs=[exercise_condition], dv=weight).assign_data(connection, table="rats")
+
         """
-        self.dataset = Dataset(source)
+        cache = StatisticsCache(cache_dir) if cache_dir is not None else None
+        self.dataset = self._load_data(
+            source, chunksize=chunksize, cache=cache, table=table
+        )
+
+        self.check_variable_cardinality(n_workers=n_workers)
+        # Check nesting and repeated measures before any model is fit
+        self.check_data_structure(n_workers=n_workers)
+
+        return self
 
+    def append_data(self, source: typing.Union[os.PathLike, pd.DataFrame]):
+        """Add new rows to the data associated with this study design
+
+        Use this when data arrives in batches, e.g., from an ongoing
+        study. Only the new rows are read: the unique values and other
+        statistics of the data assigned so far are updated with them,
+        so each call takes time proportional to the size of the batch
+        (and the number of unique values), not to all the data so far.
+        The design is then checked again as in `assign_data`.
+
+        Cardinalities and categories that were calculated from the data
+        are calculated again; those you specified are checked against
+        the new rows.
+
+        Parameters
+        ----------
+        source : os.PathLike or pandas.DataFrame
+            The new rows, with the same columns as the data already
+            assigned, in a file or a `DataFrame` (see `assign_data`).
+
+        Returns
+        -------
+        Design
+            A reference to the object this was called on
+
+        Raises
+        ------
+        ValueError
+            If no data was assigned yet, or if the data including the
+            new rows does not match the design. The new rows are kept
+            even if the checks fail.
+
+        Warns
+        -----
+        UserWarning
+            For each categorical variable, unit or set up whose values
+            in the new rows include values not seen before.
+
+        Examples
+        --------
+
+        Participants' responses for this week are in "week_2.csv".
+
+        >>> design = ts.Design(ivs=[condition], dv=score).assign_data("week_1.csv")
+        >>> design = design.append_data("week_2.csv")
+
+        """
+        if self.dataset is None:
+            raise ValueError(
+                "Cannot append data to a design without data. Assign data to the design first with assign_data."
+            )
+
+        # Keep the pairs counted by the structure checks, so they are updated with the new rows only
+        if not (
+            isinstance(self.dataset, StreamingDataset)
+            and self.dataset.sketch_error is not None
+        ):
+            for (unit, unit_checks) in self._get_data_structure_checks().items():
+                self.dataset.keep_unique_counts_per(
+                    unit.name, [column.name for (column, r) in unit_checks]
+                )
+
+        new_values = self.dataset.append(source)
+        for v in self.graph.get_variables():
+            values = new_values.get(v.name)
+            if values is not None and len(values) > 0:
+                examples = ", ".join([str(value) for value in values[:5]])
+                warnings.warn(
+                    f"The new data has {len(values)} value(s) of {v.name} that were not in the data before, e.g., {examples}."
+                )
+
+        # Calculate again what was calculated from the data before
+        for v in self._calculated_cardinalities:
+            v.cardinality = None
+        for v in self._calculated_categories:
+            v.categories = None
         self.check_variable_cardinality()
+        self.check_data_structure()
 
         return self
 
+    # @returns Dataset for @param source
+    # Files are read with only the columns of the variables in this design, and with categorical
+    # variables and identifiers stored compactly
+    # Files are streamed @param chunksize rows at a time if @param chunksize is not None
+    # Statistics of files' columns are kept in @param cache, if any
+    # If @param source is a DB-API connection, the data is in the table @param table
+    def _load_data(
+        self,
+        source: typing.Union[os.PathLike, pd.DataFrame],
+        chunksize: int = None,
+        cache: StatisticsCache = None,
+        table: str = None,
+    ) -> Dataset:
+        columns = list()
+        categorical_columns = list()
+        identifier_columns = list()
+        variables = self.graph.get_variables()
+        # Variables that distinguish repeated measures may only appear in has relationships
+        for (n0, n1, edge_data) in self.graph.get_edges():
+            edge_obj = edge_data["edge_obj"]
+            if isinstance(edge_obj, Has) and edge_obj.according_to is not None:
+                if edge_obj.according_to not in variables:
+                    variables.append(edge_obj.according_to)
+        for v in variables:
+            if isinstance(v, Nominal) and v.isInteraction:
+                # Interactions are computed from their moderators' columns
+                continue
+            columns.append(v.name)
+            if isinstance(v, Nominal) or isinstance(v, Ordinal):
+                categorical_columns.append(v.name)
+            elif isinstance(v, Unit) or isinstance(v, SetUp):
+                identifier_columns.append(v.name)
+
+        if hasattr(source, "cursor"):
+            if table is None:
+                raise ValueError(
+                    "The data is in a database. Specify the table with the data with table."
+                )
+            return SQLDataset(
+                source,
+                table=table,
+                columns=columns,
+                categorical_columns=categorical_columns,
+                identifier_columns=identifier_columns,
+            )
+
+        if chunksize is not None and not isinstance(source, pd.DataFrame):
+            return StreamingDataset(
+                source,
+                chunksize=chunksize,
+                columns=columns,
+                categorical_columns=categorical_columns,
+                identifier_columns=identifier_columns,
+                sketch_error=self.approximate_cardinality,
+                cache=cache,
+            )
+
+        return Dataset(
+            source,
+            columns=columns,
+            categorical_columns=categorical_columns,
+            identifier_columns=identifier_columns,
+            cache=cache,
+        )
+
     def has_data(self) -> bool:
         return self.dataset is not None
 
@@ -259,34 +863,25 @@ class Design(object):
         # else
         return None
 
-    def _add_variable_to_graph(self, variable: AbstractVariable):
-        for r in variable.relationships:
-            self.graph.add_relationship(relationship=r)
-
     def _add_nesting_relationships_to_graph(self):
         variables = self.graph.get_variables()
 
-        for v in variables:
-            relationships = v.relationships
-
-            for r in relationships:
-                if isinstance(r, Nests):
-                    self.graph.add_relationship(relationship=r)
+        self.graph.add_relationships(
+            [r for v in variables for r in v.relationships if isinstance(r, Nests)]
+        )
 
     def _add_identifiers_has_relationships_to_graph(self):
         identifiers = self.graph.get_identifiers()
 
-        for unit in identifiers:
-            # Does this unit have any other relationships/edges not already in the graph?
-            relationships = unit.relationships
-
-            for r in relationships:
-                if isinstance(r, Has):
-                    measure = r.measure
-                    if not self.graph.has_edge(
-                        start=unit, end=measure, edge_type="has"
-                    ):
-                        self.graph.add_relationship(relationship=r)
+        # Has relationships of the units that are already in the graph are skipped
+        self.graph.add_relationships(
+            [
+                r
+                for unit in identifiers
+                for r in unit.relationships
+                if isinstance(r, Has)
+            ]
+        )
 
     # def _add_ivs(self, ivs: List[typing.Union[Treatment, AbstractVariable]]):
 
@@ -339,6 +934,7 @@ class Design(object):
 
         return variables
 
+    # @returns the column of data for @param variable, or None if the design has no data
     def get_data_for_variable(self, variable: AbstractVariable):
 
         # Does design object have data?
@@ -14,9 +14,9 @@ from tisane.variable import (
 )
 import networkx as nx
 import pydot
-from typing import List, Set, Union, Tuple
+from collections import OrderedDict
+from typing import Dict, List, Set, Union, Tuple
 import typing
-import copy
 from tisane.graph_vis_support import (
     formatTikzVis,
     dot_formats,
@@ -34,8 +34,130 @@ conceptual level: cause, correlate, contribute.
 """
 
 
+"""
+Class for the unit a measure belongs to and how many times the unit has it
+"""
+
+
+class UnitMembership(object):
+    unit: AbstractVariable
+    has_obj: Has  # edge_obj of the "has" edge from unit to the measure
+    repetitions: NumberValue
+    is_within: bool  # True if the unit has multiple instances of the measure
+
+    def __init__(self, unit: AbstractVariable, has_obj: Has):
+        self.unit = unit
+        self.has_obj = has_obj
+        self.repetitions = has_obj.repetitions if has_obj is not None else None
+        self.is_within = (
+            isinstance(self.repetitions, NumberValue)
+            and self.repetitions.is_greater_than_one()
+        )
+
+
+"""
+Class for caching the units (identifiers) in a Graph, which unit each variable
+belongs to, and how the units nest within one another.
+Built lazily by Graph and discarded whenever the Graph changes.
+"""
+
+
+class UnitHierarchy(object):
+    identifiers: List[AbstractVariable]
+    variable_to_identifier: Dict[str, AbstractVariable]
+    # variable name -> unit and "has" relationship for every variable a unit has
+    variable_to_membership: Dict[str, UnitMembership]
+    _ordered_units: List[str]
+    # unit name -> names of the units it is nested within, transitively and directly
+    _nesting_units: Dict[str, Set[str]]
+    _nesting_groups: Dict[str, Set[str]]
+
+    def __init__(self, gr: "Graph"):
+        self._gr = gr
+        self.identifiers = list()
+        self.variable_to_identifier = dict()
+        self.variable_to_membership = dict()
+        self._ordered_units = None
+        self._nesting_units = None
+        self._nesting_groups = None
+
+        for (n, data) in gr._graph.nodes(data=True):
+            is_id = data["is_identifier"]
+            n_var = data["variable"]
+
+            if isinstance(n_var, Unit):
+                assert is_id
+                self.identifiers.append(n_var)
+            elif isinstance(n_var, SetUp):
+                assert is_id
+                self.identifiers.append(n_var)
+
+        # Identifiers are their own identifiers
+        for i in self.identifiers:
+            self.variable_to_identifier[i.name] = i
+        # Otherwise, the first identifier that "has" the variable is its identifier
+        for i in self.identifiers:
+            for (_, n1, edge_data) in gr._graph.out_edges(i.name, data=True):
+                if edge_data["edge_type"] == "has":
+                    self.variable_to_identifier.setdefault(n1, i)
+                    # Keep the first "has" edge between the unit and the variable
+                    if self.variable_to_identifier[n1] is i:
+                        self.variable_to_membership.setdefault(
+                            n1, UnitMembership(unit=i, has_obj=edge_data["edge_obj"])
+                        )
+
+    # @returns the unit and "has" relationship of @param variable, None if no unit has @param variable
+    def get_membership(self, variable: AbstractVariable) -> UnitMembership:
+        return self.variable_to_membership.get(variable.name)
+
+    # @returns True if the unit that has @param variable has multiple instances of it (i.e., @param variable is within-subjects)
+    def is_within(self, variable: AbstractVariable) -> bool:
+        membership = self.get_membership(variable)
+        return membership is not None and membership.is_within
+
+    # @returns list of unit names in the nesting subgraph, topologically sorted so that the lowest unit comes first
+    def get_ordered_units(self) -> List[str]:
+        if self._ordered_units is None:
+            nesting_sub = self._gr.get_nesting_subgraph()
+            self._ordered_units = list(nx.topological_sort(nesting_sub._graph))
+        return self._ordered_units
+
+    # @returns set of names of all the units that @param unit_name is (transitively) nested within
+    def get_nesting_units(self, unit_name: str) -> Set[str]:
+        if self._nesting_units is None:
+            nesting_sub = self._gr.get_nesting_subgraph()
+            self._nesting_units = {
+                n: nx.descendants(nesting_sub._graph, n) for n in nesting_sub._graph
+            }
+        return self._nesting_units.get(unit_name, set())
+
+    # @returns set of names of the units that @param unit_name is directly nested within
+    def get_nesting_groups(self, unit_name: str) -> Set[str]:
+        if self._nesting_groups is None:
+            nesting_sub = self._gr.get_nesting_subgraph()
+            self._nesting_groups = {
+                n: set(nesting_sub._graph.successors(n)) for n in nesting_sub._graph
+            }
+        return self._nesting_groups.get(unit_name, set())
+
+
 class Graph(object):
     _graph: nx.MultiDiGraph
+    # (start name, end name) -> {edge_type: key of the edge in _graph}
+    _edge_index: Dict[Tuple[str, str], Dict[str, int]]
+    # Incremented whenever nodes or edges change
+    # For a view, the version of the parent graph that _edge_index was last built for
+    _version: int
+    # Graph this graph is a view of, or None
+    _parent: "Graph" = None
+    # key -> (version it was computed for, derived result), least recently used first
+    _memo: "OrderedDict[typing.Hashable, Tuple[int, typing.Any]]"
+    # Maximum number of derived results kept in _memo
+    _memo_size: int = 32
+    # variable name -> names of the interaction variables it moderates
+    _moderator_index: Dict[str, Set[str]]
+    # names of the moderators -> the one interaction variable for them
+    _interactions: Dict[typing.FrozenSet[str], Nominal]
 
     @classmethod
     def cast(**kwargs):
@@ -45,6 +167,11 @@ class Graph(object):
 
     def __init__(self):
         self._graph = nx.MultiDiGraph()
+        self._edge_index = dict()
+        self._version = 0
+        self._memo = OrderedDict()
+        self._moderator_index = dict()
+        self._interactions = dict()
 
     def __repr__(self):
         return str(self._graph.__dict__)
@@ -72,22 +199,57 @@ class Graph(object):
     def get_edge(
         self, start: AbstractVariable, end: AbstractVariable, edge_type: str
     ) -> Union[Tuple, None]:
-        edges = self.get_edges()
-
-        for (n0, n1, edge_data) in edges:
-
-            if n0 == start.name and n1 == end.name:
-                if edge_type == edge_data["edge_type"]:
-                    return (n0, n1, edge_data)
-
-        return None
+        self._sync_with_parent()
+        keys = self._edge_index.get((start.name, end.name))
+        if keys is None or edge_type not in keys:
+            return None
+
+        edge_data = self._graph.edges[start.name, end.name, keys[edge_type]]
+        return (start.name, end.name, edge_data)
+
+    # Rebuild the edge index of a view if its parent graph has changed since the index was built
+    # The view's nodes and edges follow the parent's, so the index is all that can go stale
+    def _sync_with_parent(self):
+        if self._parent is None:
+            return
+        parent_version = self._parent.get_version()
+        if self._version != parent_version:
+            self._edge_index = dict()
+            for (n0, n1, key) in self._graph.edges(keys=True):
+                self._index_edge(n0, n1, key)
+            self._version = parent_version
+
+    # Record the edge with @param key between @param start_name and @param end_name in the edge index
+    # If there already is an edge of the same type between the nodes, the first one added is kept
+    def _index_edge(self, start_name: str, end_name: str, key: int):
+        edge_type = self._graph.edges[start_name, end_name, key]["edge_type"]
+        keys = self._edge_index.setdefault((start_name, end_name), dict())
+        if edge_type not in keys:
+            keys[edge_type] = key
+
+    # Rebuild the edge index entries for all the edges between @param start_name and @param end_name
+    def _reindex_edges_between(self, start_name: str, end_name: str):
+        self._edge_index.pop((start_name, end_name), None)
+        if self._graph.has_edge(start_name, end_name):
+            for key in self._graph[start_name][end_name]:
+                self._index_edge(start_name, end_name, key)
+
+    # Remove an edge between @param start_name and @param end_name, keeping the edge index up to date
+    # Like networkx, removes the most recently added edge between the nodes if @param edge_type is None
+    def _remove_edge(self, start_name: str, end_name: str, edge_type: str = None):
+        key = None
+        if edge_type is not None:
+            key = self._edge_index[(start_name, end_name)][edge_type]
+        self._graph.remove_edge(start_name, end_name, key=key)
+        self._version += 1
+        self._reindex_edges_between(start_name, end_name)
 
     # @returns handle to Node that represents the @param variable
     # @returns None if @param variable is not found in the graph
     def _get_variable_node(self, variable: AbstractVariable):
-        for n in self._graph.nodes("variable"):
-            if n[0] == variable.name:
-                return n
+        # Nodes are keyed by variable name, so look the node up directly
+        if self._graph.has_node(variable.name):
+            return (variable.name, self._graph.nodes[variable.name]["variable"])
         return None
 
     # Variables have unique names and are indexed by their names.
@@ -103,6 +265,7 @@ class Graph(object):
         self._graph.add_node(
             variable.name, variable=variable, is_identifier=is_identifier
         )
+        self._version += 1
 
     # Add edge to graph
     # If nodes aren't already in the graph, add them
@@ -134,38 +297,15 @@ class Graph(object):
         # Add edges between variable names, use the variable names later to look
         # up the actual variable objects
         # Add edge using NetworkGraph's API
-        if edge_type == "treat":
-            self._graph.add_edge(
-                start_node[0],
-                end_node[0],
-                edge_type=edge_type,
-                edge_obj=edge_obj,
-                repetitions=repetitions,
-            )
-        elif edge_type == "nests":
-            self._graph.add_edge(
-                start_node[0],
-                end_node[0],
-                edge_type=edge_type,
-                edge_obj=edge_obj,
-                repetitions=repetitions,
-            )
-        elif edge_type == "repeat":
-            self._graph.add_edge(
-                start_node[0],
-                end_node[0],
-                edge_type=edge_type,
-                edge_obj=edge_obj,
-                repetitions=repetitions,
-            )
-        else:
-            self._graph.add_edge(
-                start_node[0],
-                end_node[0],
-                edge_type=edge_type,
-                edge_obj=edge_obj,
-                repetitions=repetitions,
-            )
+        key = self._graph.add_edge(
+            start_node[0],
+            end_node[0],
+            edge_type=edge_type,
+            edge_obj=edge_obj,
+            repetitions=repetitions,
+        )
+        self._version += 1
+        self._index_edge(start_node[0], end_node[0], key)
 
     def get_causes_associates_tikz_graph(
         self, path="causes_associates_graph.tex", dv: AbstractVariable = None
@@ -444,11 +584,8 @@ class Graph(object):
 
     # @return Node representing @param variable in graph
     def get_node(self, variable: AbstractVariable):
-        nodes = self.get_nodes()
-
-        for n in nodes:
-            if n[1]["variable"].name == variable.name:
-                return n
+        if self._graph.has_node(variable.name):
+            return (variable.name, self._graph.nodes[variable.name])
 
     # @return list of edges in graph
     def get_edges(self) -> List:
@@ -478,62 +615,56 @@ class Graph(object):
     # @param name is the name of the variable we are looking for
     # @return AbstractVariable in Graph with @param name, None otherwise
     def get_variable(self, name: str) -> AbstractVariable:
-        nodes = self.get_nodes()
-
-        for (n, data) in nodes:
-            n_var = data["variable"]
-            if n_var.name == name:
-                return n_var
+        if self._graph.has_node(name):
+            return self._graph.nodes[name]["variable"]
         return None
 
     # @return iterator over predecessors of @param var
     def get_predecessors(self, var: AbstractVariable):
         if self.has_variable(var):
-            nodes = self.get_nodes()
-            for n, data in nodes:
-                n_var = data["variable"]
-                if n_var == var:
-                    return self._graph.predecessors(n)  # pass node, not variable
+            return self._graph.predecessors(var.name)  # pass node, not variable
+
+    # @returns the number of changes made to the nodes and edges of this graph so far
+    def get_version(self) -> int:
+        self._sync_with_parent()
+        return self._version
+
+    # @returns the result of @param compute, a function of this graph, cached under @param key until the graph changes
+    # Only the @attr _memo_size most recently used results are kept
+    def memoize(self, key: typing.Hashable, compute: typing.Callable[[], typing.Any]):
+        self._sync_with_parent()
+        entry = self._memo.get(key)
+        if entry is not None and entry[0] == self._version:
+            self._memo.move_to_end(key)
+            return entry[1]
+
+        value = compute()
+        self._memo[key] = (self._version, value)
+        self._memo.move_to_end(key)
+        while len(self._memo) > self._memo_size:
+            self._memo.popitem(last=False)
+
+        return value
+
+    # @return the cached unit hierarchy for this graph, building it if the graph changed since it was last built
+    def get_unit_hierarchy(self) -> UnitHierarchy:
+        return self.memoize("unit hierarchy", lambda: UnitHierarchy(self))
 
     # @return a list of identifiers
     def get_identifiers(self) -> List[AbstractVariable]:
-        identifiers = list()
-
-        nodes = self.get_nodes()
-
-        for (n, data) in nodes:
-            is_id = data["is_identifier"]
-            n_var = data["variable"]
-
-            if isinstance(n_var, Unit):
-                assert is_id
-                identifiers.append(n_var)
-            elif isinstance(n_var, SetUp):
-                assert is_id
-                identifiers.append(n_var)
-            # Removed this when add composing/has relationships between measure and unit
-            # This is to be backwards compatible with code that does not use the Unit type
-            # else:
-            #     if is_id:
-            #         identifiers.append(n_var)
-
-        return identifiers
+        return list(self.get_unit_hierarchy().identifiers)
 
     # @return the variable in graph that is the identifier for @param variable
     def get_identifier_for_variable(
         self, variable: AbstractVariable
     ) -> AbstractVariable:
-        identifiers = self.get_identifiers()
-
-        # Is the variable itself an identifier?
-        if variable in identifiers:
-            return variable
+        variable_to_identifier = self.get_unit_hierarchy().variable_to_identifier
 
-        for i in identifiers:
-            if self.has_edge(i, variable, "has"):
-                return i
+        return variable_to_identifier.get(variable.name)
 
-        return None
+    # @return list of unit names, ordered from the lowest (most nested) unit to the highest
+    def get_ordered_units(self) -> List[str]:
+        return list(self.get_unit_hierarchy().get_ordered_units())
 
     # Update the edge by first removing then adding
     def update_edge(
@@ -544,7 +675,7 @@ class Graph(object):
 
         # First remove
         assert self._graph.has_edge(start_node[0], end_node[0])
-        self._graph.remove_edge(start_node[0], end_node[0])
+        self._remove_edge(start_node[0], end_node[0])
 
         # Then add back in
         self._add_edge(start=start, end=end, edge_type=new_edge_type)
@@ -590,6 +721,118 @@ class Graph(object):
             according_to = relationship.according_to
             self.repeat(unit=unit, measure=measure, repeat_obj=relationship)
 
+    # Add every relationship in @param relationships, in order, as add_relationship would one at a time
+    # Relationships already in the graph or repeated in @param relationships are skipped, and the new
+    # nodes and edges are added to the underlying graph with one call each
+    # Moderates relationships create interaction variables from the graph so far, so the relationships
+    # before each of them are added first
+    def add_relationships(self, relationships: typing.Iterable):
+        # node name -> attributes of the node to add or update, in order of first appearance
+        nodes = dict()
+        # (start name, end name, edge type, edge object, repetitions) for each new edge, in order
+        edges = list()
+        # (start name, end name, edge type) for each new edge
+        new_edges = set()
+
+        def add_node(
+            variable: AbstractVariable, is_identifier: bool = False, replace=False
+        ):
+            name = variable.name
+            if (name in nodes or self._graph.has_node(name)) and not replace:
+                if is_identifier and not (
+                    nodes.get(name, dict()).get("is_identifier")
+                    or self._graph.nodes.get(name, dict()).get("is_identifier")
+                ):
+                    nodes.setdefault(name, dict())["is_identifier"] = True
+                return
+            # As in _add_variable
+            nodes.setdefault(name, dict()).update(
+                variable=variable,
+                is_identifier=is_identifier
+                or isinstance(variable, Unit)
+                or isinstance(variable, SetUp),
+            )
+
+        def is_new_edge(start: AbstractVariable, end: AbstractVariable, edge_type: str):
+            keys = self._edge_index.get((start.name, end.name), dict())
+            return (
+                edge_type not in keys
+                and (start.name, end.name, edge_type) not in new_edges
+            )
+
+        def add_edge(
+            start: AbstractVariable,
+            end: AbstractVariable,
+            edge_type: str,
+            edge_obj,
+            repetitions: NumberValue = None,
+        ):
+            add_node(start)
+            add_node(end)
+            new_edges.add((start.name, end.name, edge_type))
+            edges.append((start.name, end.name, edge_type, edge_obj, repetitions))
+
+        def flush():
+            if len(nodes) > 0:
+                self._graph.add_nodes_from(nodes.items())
+                self._version += 1
+            if len(edges) > 0:
+                # The attributes of each edge are only created as networkx copies them, so that
+                # a large batch does not keep a dict per edge alive for the garbage collector to walk
+                keys = self._graph.add_edges_from(
+                    (
+                        start_name,
+                        end_name,
+                        {
+                            "edge_type": edge_type,
+                            "edge_obj": edge_obj,
+                            "repetitions": repetitions,
+                        },
+                    )
+                    for (
+                        start_name,
+                        end_name,
+                        edge_type,
+                        edge_obj,
+                        repetitions,
+                    ) in edges
+                )
+                # add_edges_from returns the key of each new edge, in order
+                # Every edge added is the first of its type between its nodes
+                for ((start_name, end_name, edge_type, _, _), key) in zip(edges, keys):
+                    self._edge_index.setdefault((start_name, end_name), dict())[
+                        edge_type
+                    ] = key
+                self._version += 1
+            nodes.clear()
+            edges.clear()
+            new_edges.clear()
+
+        for r in relationships:
+            if isinstance(r, Has):
+                add_node(r.variable, is_identifier=True)
+                if is_new_edge(r.variable, r.measure, "has"):
+                    add_edge(r.variable, r.measure, "has", r, r.repetitions)
+            elif isinstance(r, Nests):
+                if is_new_edge(r.base, r.group, "nests"):
+                    add_node(r.base, is_identifier=True, replace=True)
+                    add_node(r.group, is_identifier=True, replace=True)
+                    add_edge(r.base, r.group, "nests", r)
+            elif isinstance(r, Associates):
+                if is_new_edge(r.lhs, r.rhs, "associates"):
+                    add_edge(r.lhs, r.rhs, "associates", r)
+                    add_edge(r.rhs, r.lhs, "associates", r)
+            elif isinstance(r, Causes):
+                if is_new_edge(r.cause, r.effect, "causes"):
+                    add_edge(r.cause, r.effect, "causes", r)
+            elif isinstance(r, Repeats):
+                if is_new_edge(r.unit, r.measure, "repeat"):
+                    add_edge(r.unit, r.measure, "repeat", r)
+            else:
+                flush()
+                self.add_relationship(r)
+        flush()
+
     # Add an edge that indicates that identifier 'has' the variable measurement
     def has(
         self,
@@ -664,10 +907,6 @@ class Graph(object):
                         repetitions=relationship.repetitions,
                     )
 
-        # Create new interaction variable
-        m_names = [m.name for m in moderator]
-        name = "*".join(m_names)
-
         m_cardinality = None
         if all(m.get_cardinality() is not None for m in moderator):
             # only specify cardinality if all of them are specified
@@ -676,15 +915,31 @@ class Graph(object):
             for m in moderator:
                 m_cardinality *= m.get_cardinality()
 
-        var = Nominal(
-            name, cardinality=m_cardinality, isInteraction=True, moderators=moderator
-        )  # Interaction variables are cast as nominal variables
+        # Reuse the interaction variable for these moderators if there already is one,
+        # regardless of the order the moderators are listed in
+        var = self.get_interaction(moderator)
+        if var is None:
+            # Create new interaction variable
+            m_names = [m.name for m in moderator]
+            name = "*".join(m_names)
+            var = Nominal(
+                name,
+                cardinality=m_cardinality,
+                isInteraction=True,
+                moderators=moderator,
+            )  # Interaction variables are cast as nominal variables
+            self._interactions[frozenset(m_names)] = var
+        name = var.name
 
         # Add associate edges between interaction and @param on variable
         # associates_obj = Associates(lhs=var, rhs=on)
         # Store Moderates obj even though edge is an Associates edge
         self.associates(lhs=var, rhs=on, associates_obj=moderates_obj)
 
+        # Index the interaction variable under each of its moderators
+        for m in moderator:
+            self._moderator_index.setdefault(m.name, set()).add(name)
+
         # Inherit unit has relationships from moderators
         for m in moderator:
             identifier = self.get_identifier_for_variable(m)
@@ -695,6 +950,14 @@ class Graph(object):
                 )
                 self.has(identifier, var, relationship, repetitions=m_cardinality)
 
+    # @return the interaction variable for exactly the variables in @param moderator, None if there is none
+    def get_interaction(self, moderator: List[AbstractVariable]) -> Nominal:
+        return self._interactions.get(frozenset(m.name for m in moderator))
+
+    # @return set of names of the interaction variables that @param variable is one of the moderators of
+    def get_interactions_moderated_by(self, variable: AbstractVariable) -> Set[str]:
+        return self._moderator_index.get(variable.name, set())
+
     # Add an ambiguous/contribute edge to the graph
     def contribute(self, lhs: AbstractVariable, rhs: AbstractVariable):
         # Is this edge new?
@@ -740,71 +1003,82 @@ class Graph(object):
     # def generate_consts(self):
     #     pass
 
-    # @returns sub-graph containing only conceptual edges
-    def get_conceptual_subgraph(self):
-        gr = copy.deepcopy(self)
+    # @returns read-only Graph over the nodes and edges of this graph that pass @param filter_node and @param filter_edge
+    # The view shares its nodes, variables and edge data with this graph instead of copying them,
+    # so it follows later changes to this graph; its edge index is built on the first lookup
+    # and rebuilt on the first lookup after this graph changes
+    # @param filter_node takes a node name; @param filter_edge takes the start name, end name and edge data
+    def get_view(self, filter_node=None, filter_edge=None) -> "Graph":
+        graph = self._graph
 
-        edges = self.get_edges()
-        for (n0, n1, edge_data) in edges:
-            edge_type = edge_data["edge_type"]
-            if edge_type == "causes" or edge_type == "associates":
-                pass
-            else:
-                gr._graph.remove_edge(n0, n1)
+        def _filter_edge(n0, n1, key):
+            return filter_edge(n0, n1, graph.edges[n0, n1, key])
+
+        gr = Graph()
+        gr._moderator_index = self._moderator_index
+        gr._interactions = self._interactions
+        gr._graph = nx.subgraph_view(
+            graph,
+            filter_node=filter_node if filter_node else nx.filters.no_filter,
+            filter_edge=_filter_edge if filter_edge else nx.filters.no_filter,
+        )
+        gr._parent = self
+        # Not a version of this graph, so the first lookup builds the edge index
+        gr._version = -1
 
         return gr
 
+    # @returns sub-graph containing only conceptual edges
+    def get_conceptual_subgraph(self):
+        return self.memoize(
+            "conceptual subgraph",
+            lambda: self.get_view(
+                filter_edge=lambda n0, n1, edge_data: edge_data["edge_type"] == "causes"
+                or edge_data["edge_type"] == "associates"
+            ),
+        )
+
     # @returns sub-graph containing only CAUSAL edges
     def get_causal_subgraph(self):
-        gr = copy.deepcopy(self)
-
-        edges = self.get_edges()
-        for (n0, n1, edge_data) in edges:
-            edge_type = edge_data["edge_type"]
-            if edge_type == "causes":
-                pass
-            else:
-                gr._graph.remove_edge(n0, n1)
-
-        return gr
+        return self.memoize(
+            "causal subgraph",
+            lambda: self.get_view(
+                filter_edge=lambda n0, n1, edge_data: edge_data["edge_type"] == "causes"
+            ),
+        )
 
     # @returns sub-graph containing only NESTS edges
     def get_nesting_subgraph(self):
-        gr = copy.deepcopy(self)
-        nodes_to_remove = set()
-
-        edges = self.get_edges()
-        for (n0, n1, edge_data) in edges:
-            edge_type = edge_data["edge_type"]
-            if edge_type == "nests":
-                edge_obj = edge_data["edge_obj"]
-                assert isinstance(edge_obj, Nests)
-            else:
-                gr._graph.remove_edge(n0, n1)
-                n0_var = gr.get_variable(n0)
-                n1_var = gr.get_variable(n1)
-                # If all the edges have been removed from a node, remove the node from the graph
-                # but make sure not to prematurely remove Units
-                if len(gr._graph.edges(n0)) == 0 and not isinstance(n0_var, Unit):
-                    # gr._graph.remove_node(n0)
-                    nodes_to_remove.add(n0)
-                if len(gr._graph.edges(n1)) == 0 and not isinstance(n1_var, Unit):
-                    # gr._graph.remove_node(n1)
-                    nodes_to_remove.add(n1)
-
-        for n in nodes_to_remove:
-            gr._graph.remove_node(n)
-
-        return gr
+        return self.memoize("nesting subgraph", self._get_nesting_subgraph)
+
+    def _get_nesting_subgraph(self):
+        nodes_to_keep = set()
+
+        for (n, data) in self._graph.nodes(data=True):
+            out_edge_types = [e[2] for e in self._graph.out_edges(n, data="edge_type")]
+            in_edge_types = [e[2] for e in self._graph.in_edges(n, data="edge_type")]
+            if "nests" in out_edge_types:
+                nodes_to_keep.add(n)
+            # Make sure not to remove Units, even if they have no nests edges
+            elif isinstance(data["variable"], Unit):
+                nodes_to_keep.add(n)
+            # Leave nodes without any other edges in the graph
+            elif all(t == "nests" for t in out_edge_types + in_edge_types):
+                nodes_to_keep.add(n)
+
+        def is_nests_edge(n0, n1, edge_data):
+            if edge_data["edge_type"] == "nests":
+                assert isinstance(edge_data["edge_obj"], Nests)
+                return True
+            return False
+
+        return self.get_view(
+            filter_node=nodes_to_keep.__contains__, filter_edge=is_nests_edge
+        )
 
     # Remove outgoing associative relationships from the DV
-    # Remove outgoing edges from @param variable
+    # @returns sub-graph without the outgoing edges from @param variable
     def remove_outgoing_edges(self, variable: AbstractVariable):
         assert self.has_variable(variable)
-        gr = copy.deepcopy(self)
-
-        # Iterate over outgoing edges from dv
-        for n in self._graph.neighbors(variable.name):
-            gr._graph.remove_edge(variable.name, n)
 
-        return gr
+        return self.get_view(filter_edge=lambda n0, n1, edge_data: n0 != variable.name)
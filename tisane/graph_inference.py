@@ -136,69 +136,110 @@ def cast_to_variables(
 ) -> Set[AbstractVariable]:
     named_variables = set()
 
-    for n in names:
-        for v in variables:
-            if n == v.name:
-                named_variables.add(v)
+    # @param names is usually a set, so check membership once per variable
+    for v in variables:
+        if v.name in names:
+            named_variables.add(v)
 
     return named_variables
 
 
+# Ancestors of every node along causes edges, computed in a single topological sweep
+# Each node gets an integer id (its position in the topological order) and its
+# ancestors are stored as a bitset (a Python int) over those ids.
+class CausalAncestors(object):
+    names: List[str]
+    # node name -> bitset of all its causal ancestors
+    ancestors: Dict[str, int]
+    # node name -> bitset of its causal ancestors, ignoring causes edges between @param variables
+    ancestors_without_edges_between_variables: Dict[str, int]
+
+    def __init__(self, gr: Graph, variables: List[AbstractVariable] = None):
+        var_names = set(v.name for v in variables) if variables is not None else set()
+        causal_sub = gr.get_causal_subgraph()
+
+        self.names = list(nx.topological_sort(causal_sub._graph))
+        ids = {n: i for (i, n) in enumerate(self.names)}
+        self.ancestors = dict()
+        self.ancestors_without_edges_between_variables = dict()
+
+        # Predecessors come before their children in topological order, so
+        # their bitsets are complete by the time the children are visited
+        for n in self.names:
+            ancestors = 0
+            ancestors_without_edges = 0
+            for p in causal_sub._graph.predecessors(n):
+                p_bit = 1 << ids[p]
+                ancestors |= self.ancestors[p] | p_bit
+                if not (p in var_names and n in var_names):
+                    ancestors_without_edges |= (
+                        self.ancestors_without_edges_between_variables[p] | p_bit
+                    )
+            self.ancestors[n] = ancestors
+            self.ancestors_without_edges_between_variables[n] = ancestors_without_edges
+
+    # @returns list of names of the nodes in @param bitset, in topological order
+    def to_names(self, bitset: int) -> List[str]:
+        names = list()
+        while bitset:
+            lowest_bit = bitset & -bitset
+            names.append(self.names[lowest_bit.bit_length() - 1])
+            bitset ^= lowest_bit
+        return names
+
+    # @returns set of names of the causal ancestors of @param variable
+    def get_ancestors(self, variable: AbstractVariable) -> Set[str]:
+        return set(self.to_names(self.ancestors.get(variable.name, 0)))
+
+    # @returns tuple: (set of names of the ancestors shared by two or more of @param variables, dict of each shared ancestor to the variables it is an ancestor of)
+    # Causes edges between @param variables are ignored, so @param variables must be the ones used to construct this object
+    def get_common_ancestors(
+        self, variables: List[AbstractVariable]
+    ) -> Tuple[Set[str], Dict[str, List[str]]]:
+        seen_once = 0
+        seen_more_than_once = 0
+        for v in variables:
+            v_ancestors = self.ancestors_without_edges_between_variables[v.name]
+            seen_more_than_once |= seen_once & v_ancestors
+            seen_once |= v_ancestors
+
+        common_ancestor_to_children = {
+            a: list() for a in self.to_names(seen_more_than_once)
+        }
+        for v in variables:
+            v_ancestors = self.ancestors_without_edges_between_variables[v.name]
+            for a in self.to_names(v_ancestors & seen_more_than_once):
+                common_ancestor_to_children[a].append(v.name)
+
+        return (set(common_ancestor_to_children.keys()), common_ancestor_to_children)
+
+
+# @returns CausalAncestors for @param gr and @param variables, cached on @param gr until it changes
+def get_causal_ancestors(
+    gr: Graph, variables: List[AbstractVariable] = None
+) -> CausalAncestors:
+    var_names = frozenset(v.name for v in variables) if variables is not None else None
+
+    return gr.memoize(
+        ("causal ancestors", var_names),
+        lambda: CausalAncestors(gr=gr, variables=variables),
+    )
+
+
 ## Rule 1: Find common ancestors
 def find_common_ancestors(
-    variables: List[AbstractVariable], gr: Graph
+    variables: List[AbstractVariable],
+    gr: Graph,
+    ancestry: CausalAncestors = None,
 ) -> Tuple[Set[str], Dict[str, List[str]]]:
-    common_ancestors = set()
-    common_ancestor_to_children = dict()
-
-    # Map counting ancestors of all @param variables
-    _ancestor_to_count_ = dict()
-    _ancestor_to_children_ = (
-        dict()
-    )  # keep track of children IVs for each common ancestor, mostly useful for explanations
-    # Get causal subgraph
-    causal_sub = gr.get_causal_subgraph()
-
-    # Remove any edges between variables (IVs)
-    var_names = [v.name for v in variables]
-
-    edges = causal_sub.get_edges()
-    for (n0, n1, edge_data) in edges:
-        edge_type = edge_data["edge_type"]
-        if edge_type == "causes":
-            if n0 in var_names and n1 in var_names:
-                causal_sub._graph.remove_edge(n0, n1)
-
-    # Take transitive closure of causal subgraph
-    tc = nx.transitive_closure_dag(causal_sub._graph)
-
-    # For each variable in @param variables:
-    # Get its predecessors from the transitive closure
-    # Add them to a map (key is variable, count is value)
-    for v in variables:
-        # node = causal_sub.get_node(variable=v)
-        # if v.name == "Time":
-        #     import pdb; pdb.set_trace()
-        predecessors = tc.predecessors(v.name)
-
-        # Add each predecessor to the dictionary
-        for p in predecessors:
-            # Have we seen this ancestor before?
-            if p in _ancestor_to_count_.keys():
-                _ancestor_to_count_[p] += 1
-            else:
-                _ancestor_to_count_[p] = 1
-                _ancestor_to_children_[p] = list()
-            # Add v to list of children that @p is an ancestor to
-            assert p in _ancestor_to_children_.keys()
-            _ancestor_to_children_[p].append(v.name)
-
-    # At the end, add to set and return set of variables that have count > 1
-    # At the end, also add to the dict of shared ancestor to variables that share that ancestor
-    for key, value in _ancestor_to_count_.items():
-        if value > 1:
-            common_ancestors.add(key)
-            common_ancestor_to_children[key] = _ancestor_to_children_[key]
+    # Edges between variables (IVs) are not considered when finding common ancestors
+    if ancestry is None:
+        ancestry = get_causal_ancestors(gr=gr, variables=variables)
+
+    (
+        common_ancestors,
+        common_ancestor_to_children,
+    ) = ancestry.get_common_ancestors(variables=variables)
 
     assert len(common_ancestors) == len(common_ancestor_to_children.keys())
     return (common_ancestors, common_ancestor_to_children)
@@ -206,34 +247,32 @@ def find_common_ancestors(
 
 ## Rule 2: Find causal ancestors
 # Moved outside for testing purposes
-def find_variable_causal_ancestors(variable: AbstractVariable, gr: Graph) -> Set[str]:
-    causal_ancestors = set()
-
-    causal_sub = gr.get_causal_subgraph()
-    if not isinstance(variable, AbstractVariable):
-        import pdb
-
-        pdb.set_trace()
+def find_variable_causal_ancestors(
+    variable: AbstractVariable, gr: Graph, ancestry: CausalAncestors = None
+) -> Set[str]:
     assert isinstance(variable, AbstractVariable)
-    if gr.has_variable(variable):
-        pred = causal_sub._graph.predecessors(variable.name)  # Returns an iterator obj
-        # Add each predecessor to the set
-        for p in pred:
-            causal_ancestors.add(p)
-            ancestors = find_variable_causal_ancestors(gr.get_variable(p), gr)
-            causal_ancestors = causal_ancestors.union(ancestors)
-    # Else: There is nothing to add to the set of causal ancestors
-    return causal_ancestors
+    if not gr.has_variable(variable):
+        # There is nothing to add to the set of causal ancestors
+        return set()
+
+    if ancestry is None:
+        ancestry = get_causal_ancestors(gr=gr)
+    return ancestry.get_ancestors(variable)
 
 
 def find_all_causal_ancestors(
-    variables: List[AbstractVariable], gr: Graph
+    variables: List[AbstractVariable],
+    gr: Graph,
+    ancestry: CausalAncestors = None,
 ) -> Tuple[Set[str], Dict[str, List[str]]]:
     all_causal_ancestors = set()
     variable_to_causal_ancestors = dict()
 
+    if ancestry is None:
+        ancestry = get_causal_ancestors(gr=gr)
+
     for v in variables:
-        ancestors = find_variable_causal_ancestors(variable=v, gr=gr)
+        ancestors = find_variable_causal_ancestors(variable=v, gr=gr, ancestry=ancestry)
         variable_to_causal_ancestors[v.name] = list(
             ancestors
         )  # Add to dict which is used for deriving explanations
@@ -345,10 +384,13 @@ def infer_main_effects_with_explanations(
     dv = query.dv
     all_variables_in_graph = gr.get_variables()
 
+    # One sweep over the causal edges answers both Rule 1 and Rule 2
+    ancestry = get_causal_ancestors(gr=gr, variables=ivs)
+
     (
         common_ancestors_names,
         common_ancestors_names_to_variables,
-    ) = find_common_ancestors(variables=ivs, gr=gr)
+    ) = find_common_ancestors(variables=ivs, gr=gr, ancestry=ancestry)
     common_ancestors_variables = cast_to_variables(
         names=common_ancestors_names, variables=all_variables_in_graph
     )
@@ -368,7 +410,7 @@ def infer_main_effects_with_explanations(
         main_candidates_explanations[v].append(expl)
 
     (causal_ancestors, variable_to_causal_ancestors) = find_all_causal_ancestors(
-        variables=ivs, gr=gr
+        variables=ivs, gr=gr, ancestry=ancestry
     )
     causal_ancestors_variables = cast_to_variables(
         names=causal_ancestors, variables=all_variables_in_graph
@@ -458,10 +500,11 @@ def infer_main_effects_with_explanations(
 def find_moderates_edges_on_variable(gr: Graph, on: AbstractVariable) -> Set[str]:
     moderates = set()
 
-    # Get causal subgraph
-    conceptual_sub = gr.get_conceptual_subgraph()
+    if not gr.has_variable(on):
+        return moderates
 
-    edges = conceptual_sub.get_edges()
+    # Only the edges into @param on can be moderates edges on it
+    edges = gr._graph.in_edges(on.name, data=True)
     for e in edges:
         (n0, n1, edge_data) = e
         if n1 == on.name:
@@ -494,8 +537,34 @@ def filter_interactions_involving_variables(
 
 
 # More computationally efficient: Look through list of main effects in @param variables and find any interaction effects involving them
-def find_interactions_for_main_effects(variables: List[AbstractVariable]):
-    pass
+# Uses the graph's index of variables to the interactions they moderate, so
+# variable names are matched exactly rather than as substrings of interaction names
+# @returns the names of interaction variables on @param on that involve two or more of the @param variables
+def find_interactions_for_main_effects(
+    gr: Graph, on: AbstractVariable, variables: List[AbstractVariable]
+) -> Set[str]:
+    interactions = set()
+
+    # Count how many of @param variables moderate each interaction
+    interaction_to_count = dict()
+    seen_names = set()
+    for v in variables:
+        if v.name in seen_names:
+            continue
+        seen_names.add(v.name)
+        for ixn in gr.get_interactions_moderated_by(v):
+            interaction_to_count[ixn] = interaction_to_count.get(ixn, 0) + 1
+
+    for ixn, count in interaction_to_count.items():
+        if count >= 2:
+            ixn_var = gr.get_variable(ixn)
+            edge = gr.get_edge(start=ixn_var, end=on, edge_type="associates")
+            if edge is not None:
+                (n0, n1, edge_data) = edge
+                if isinstance(edge_data["edge_obj"], Moderates):
+                    interactions.add(ixn)
+
+    return interactions
 
 
 # Infer candidate interaction effects for @param query given the relationships contained in @param gr
@@ -513,12 +582,9 @@ def infer_interaction_effects_with_explanations(
 
     ivs = query.ivs
     dv = query.dv
-    interactions = find_moderates_edges_on_variable(
-        gr=gr, on=dv
-    )  # Find all possible interactions
-    interactions = filter_interactions_involving_variables(
-        variables=main_effects, interaction_names=interactions
-    )  # Filter to interactions involving two or more ivs
+    interactions = find_interactions_for_main_effects(
+        gr=gr, on=dv, variables=main_effects
+    )  # Find interactions on the dv involving two or more ivs
     interactions_variables = cast_to_variables(
         names=interactions, variables=gr.get_variables()
     )
@@ -545,11 +611,11 @@ def construct_random_effects_for_repeated_measures(
     random_effects = set()
     # Get dv's unit
     dv = query.dv
-    dv_unit = gr.get_identifier_for_variable(dv)
+    dv_membership = gr.get_unit_hierarchy().get_membership(dv)
 
-    if gr.has_edge(start=dv_unit, end=dv, edge_type="has"):
-        (n0, n1, edge_data) = gr.get_edge(start=dv_unit, end=dv, edge_type="has")
-        edge_obj = edge_data["edge_obj"]
+    if dv_membership is not None:
+        dv_unit = dv_membership.unit
+        edge_obj = dv_membership.has_obj
         assert isinstance(edge_obj, Has)
         assert edge_obj.variable == dv_unit
         assert edge_obj.measure == dv
@@ -558,8 +624,7 @@ def construct_random_effects_for_repeated_measures(
             edge_obj.repetitions, NumberValue
         ), "Unexpected type for repetitions: {}".format(type(edge_obj.repetitions))
         # There is more than one observation of the DV for each unit
-        # import pdb; pdb.set_trace()
-        if edge_obj.repetitions.is_greater_than_one():
+        if dv_membership.is_within:
             # Add a random intercept for the unit U
             ri = RandomIntercept(groups=dv_unit)
             random_effects.add(ri)
@@ -572,12 +637,10 @@ def construct_random_effects_for_repeated_measures(
 
 # @returns an ordered list of unitts included in @param gr, the lowest unit/level is in the lowest index
 def find_ordered_list_of_units(gr: Graph) -> List[str]:
-    measurement_sub = (
-        gr.get_nesting_subgraph()
-    )  # returns subgraph containing nests edges only
-    # Topologically sort the edges/nodes
+    # Topologically sorted units from the subgraph containing nests edges only
+    # The graph caches this order until the graph changes
     # Note: this may need to be revised to more fully support units/levels where one unit can nest within multiple other units (e.g., in some non-nested cases)
-    ordered_units = list(nx.topological_sort(measurement_sub._graph))
+    ordered_units = gr.get_ordered_units()
     # If there is only one unit, there would be no nesting relationships to the set of ordered_units in case all measures come from the same unit
     if len(ordered_units) == 0:
         identifiers = gr.get_identifiers()
@@ -602,9 +665,9 @@ def construct_random_effects_for_nests(
         gr=gr
     )  # returns a list of unit names for which there are nests relationships
     assert dv_unit.name in all_ordered_units
-    idx = all_ordered_units.index(dv_unit.name)
     # For random effects due to nesting, focus on those that nest the unit that has the DV
-    units_to_consider = all_ordered_units[idx + 1 :]
+    nesting_units = gr.get_unit_hierarchy().get_nesting_units(dv_unit.name)
+    units_to_consider = [u for u in all_ordered_units if u in nesting_units]
 
     # Add random effects for nested variables now
     for v in variables:
@@ -615,12 +678,9 @@ def construct_random_effects_for_nests(
             variable_units.add(v_unit.name)
 
         else:
-            if v_unit is not None:
-                if v_unit.name not in units_to_consider:
-                    assert v_unit == v
-                    assert isinstance(v, SetUp)
-                else:
-                    assert v_unit.name in units_to_consider
+            # Set ups, and units that do not nest the unit that has the DV, add no random effects for nesting
+            if v_unit is not None and v_unit.name not in units_to_consider:
+                assert v_unit == v or v_unit.name not in nesting_units
 
     # Add any nesting units whose measures are not included in the list of variables
     for u in units_to_consider:
@@ -643,20 +703,19 @@ def construct_random_effects_for_composed_measures(
     gr: Graph, variables: List[AbstractVariable]
 ) -> Set[RandomEffect]:
     random_effects = set()
+    hierarchy = gr.get_unit_hierarchy()
 
     # Go through the selected main effects, looking only for Measures
     for v in variables:
         if isinstance(v, Measure):
             for r in v.relationships:
                 if isinstance(r, Has):
-                    v_unit = gr.get_identifier_for_variable(v)
-                    (n0, n1, edge_data) = gr.get_edge(
-                        start=v_unit, end=v, edge_type="has"
-                    )
-                    v_unit_has_obj = edge_data["edge_obj"]
+                    v_membership = hierarchy.get_membership(v)
+                    v_unit = v_membership.unit
+                    v_unit_has_obj = v_membership.has_obj
                     assert isinstance(v_unit_has_obj.repetitions, NumberValue)
                     # Is variable v within-subjects?
-                    if v_unit_has_obj.repetitions.is_greater_than_one():
+                    if v_membership.is_within:
                         # Does variable v have multiple instances of the unit r.measure?
                         if r.repetitions.is_greater_than_one():
                             # If so, for each instance of v_unit account for clusters in r.measure observations within each instance of v.
@@ -696,13 +755,25 @@ def filter_random_candidates(random_candidates: Set[RandomEffect]) -> Set[Random
     return random_effects
 
 
+# @returns the names of the variables that comprise @param interaction_effect
+# Interaction variables keep their moderators, so only fall back on parsing the name for other variables
+def get_interaction_component_names(interaction_effect: AbstractVariable) -> List[str]:
+    if isinstance(interaction_effect, Nominal) and interaction_effect.isInteraction:
+        return [m.name for m in interaction_effect.moderators]
+    return interaction_effect.name.split("*")
+
+
 def get_variables_in_interaction_effect(
     gr: Graph, interaction_effect: AbstractVariable
 ) -> List[AbstractVariable]:
     variables = list()
 
-    interaction_effect_name = interaction_effect.name
-    names = interaction_effect_name.split("*")
+    # Interaction variables in the graph already know their moderators
+    if isinstance(interaction_effect, Nominal) and interaction_effect.isInteraction:
+        if all(gr.has_variable(m) for m in interaction_effect.moderators):
+            return list(interaction_effect.moderators)
+
+    names = get_interaction_component_names(interaction_effect)
     # Get the variables that comprise @param interaction_effect
     for n in names:
         var = gr.get_variable(name=n)
@@ -722,8 +793,10 @@ def create_variable_from_set_of_variables(
     variables: Set[AbstractVariable],
 ) -> AbstractVariable:
     # Create new interaction variable
+    variables = sorted(
+        variables, key=lambda v: v.name
+    )  # Alphabetize the names to avoid multiple interaction effects with inversed order of variable names
     names = [v.name for v in variables]
-    names.sort()  # Alphabetize the names to avoid multiple interaction effects with inversed order of variable names
     name = "*".join(names)
 
     cardinality = 1
@@ -732,7 +805,7 @@ def create_variable_from_set_of_variables(
             cardinality *= v.get_cardinality()
 
     var = Nominal(
-        name, cardinality=cardinality
+        name, cardinality=cardinality, isInteraction=True, moderators=variables
     )  # Interaction variables are cast as nominal variables
 
     return var
@@ -745,23 +818,19 @@ def find_largest_subset_of_variables_that_vary_within_unit(
         gr=gr, interaction_effect=interaction_effect
     )
     subset = set()
+    hierarchy = gr.get_unit_hierarchy()
     for v in variables:
         assert gr.has_variable(variable=v)
         v_unit = gr.get_identifier_for_variable(variable=v)
         # Is the variable a unit variable?
         if v == v_unit:
             # Get nesting parent
-            for r in v.relationships:
-                if isinstance(r, Nests):
-                    if r.base == v:
-                        subset.add(r.group)
+            for group in hierarchy.get_nesting_groups(v.name):
+                subset.add(gr.get_variable(name=group))
         else:
-            assert gr.has_variable(variable=v)
-            v_unit = gr.get_identifier_for_variable(variable=v)
-            (n0, n1, edge_data) = gr.get_edge(start=v_unit, end=v, edge_type="has")
-            edge_obj = edge_data["edge_obj"]
+            assert hierarchy.get_membership(v) is not None
             # Is v is within-subjects?
-            if edge_obj.repetitions.is_greater_than_one():
+            if hierarchy.is_within(v):
                 subset.add(v)
 
     return subset
@@ -798,7 +867,7 @@ def interaction_is_all_within(
 ) -> bool:
     within_subset_names = [w.name for w in within_subset]
     within_subset_names.sort()  # interactions with variables in different orders are still the same effect
-    ixn_var_names = interaction.name.split("*")
+    ixn_var_names = get_interaction_component_names(interaction)
     ixn_var_names.sort()  # interactions with variables in different orders are still the same effect
 
     return within_subset_names == ixn_var_names
@@ -832,15 +901,16 @@ def construct_random_effects_for_interactions(
             rs = RandomSlope(within_subset_variable, within_subset_variable_unit)
             random_effects.add(rs)
         elif len(within_subset) == 0:
-            ixn_names = ixn.name.split("*")
-            ixn_variables = [gr.get_variable(name) for name in ixn_names]
+            ixn_variables = get_variables_in_interaction_effect(
+                gr=gr, interaction_effect=ixn
+            )
 
             dv = query.dv
-            dv_unit = gr.get_identifier_for_variable(dv)
+            dv_membership = gr.get_unit_hierarchy().get_membership(dv)
 
-            assert gr.has_edge(start=dv_unit, end=dv, edge_type="has")
-            (n0, n1, edge_data) = gr.get_edge(start=dv_unit, end=dv, edge_type="has")
-            edge_obj = edge_data["edge_obj"]
+            assert dv_membership is not None
+            dv_unit = dv_membership.unit
+            edge_obj = dv_membership.has_obj
 
             if edge_obj.according_to is not None:
                 for v in ixn_variables:
@@ -914,6 +984,7 @@ def infer_random_effects_with_explanations(
     )
     # nests_variables = cast_to_variables(names=nests_names, variables=main_effects)
     random_candidates = random_candidates.union(nests_effects)
+    units = find_ordered_list_of_units(gr)
     # Add explanations
     for rc in nests_effects:
         # Is the variable a new random effect candidate?
@@ -926,7 +997,6 @@ def infer_random_effects_with_explanations(
             # declare the list of explanations/reasons for this variable
             random_candidates_explanations[name_key] = list()
         # add explanation
-        units = find_ordered_list_of_units(gr)
         nested = rc.groups.name
         idx = units.index(nested)
         if idx + 1 < len(units):
@@ -982,7 +1052,7 @@ def infer_random_effects_with_explanations(
         unit = gr.get_identifier_for_variable(variable=rc.iv)
         assert unit is not None
 
-        var_names = rc.iv.name.split("*")
+        var_names = get_interaction_component_names(rc.iv)
         var_names_str = ",".join(var_names)
         expl = random_explanations["interaction"].format(
             unit=unit, variables=var_names_str
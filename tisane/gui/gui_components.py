@@ -7,6 +7,7 @@ import os
 import logging
 from typing import Dict, List
 from tisane.variable import AbstractVariable
+from tisane.data import summarize_column
 import dash_html_components as html
 import dash_bootstrap_components as dbc
 import dash_core_components as dcc
@@ -137,8 +138,8 @@ class GUIComponents:
         query = self.getQuery()
         self.output["dependent variable"] = query["DV"]
         self.dv = query["DV"]
-        if self.hasData():
-            self.dataDf = pd.DataFrame(self.getData())
+        # The DV's raw values are only loaded when a component needs them
+        self.dvData = None
         for me in self.getGeneratedMainEffects():
             self.variables["main effects"][me] = {"info-id": self.getNewComponentId()}
             pass
@@ -507,12 +508,27 @@ class GUIComponents:
         return self.data["input"]["data"]
 
     def hasData(self):
-        return (
-            "input" in self.data
-            and "data" in self.data["input"]
-            and self.data["input"]["data"]
+        return "input" in self.data and bool(
+            self.data["input"].get("data summary") or self.data["input"].get("data")
         )
 
+    def getDataSummary(self, variable):
+        if "data summary" in self.data["input"]:
+            return self.data["input"]["data summary"][variable]
+        # Older input files include the data itself
+        return summarize_column(pd.Series(self.getData()[variable]))
+
+    def getDVData(self):
+        if self.dvData is None:
+            dataColumns = self.data["input"].get("data columns", {})
+            if self.dv in dataColumns:
+                values = np.load(dataColumns[self.dv], mmap_mode="r")
+                self.dvData = pd.Series(values, name=self.dv)
+            elif self.data["input"].get("data"):
+                self.dvData = pd.Series(self.getData()[self.dv], name=self.dv)
+            # Otherwise only the summaries of the data are available
+        return self.dvData
+
     def getDefaultLinkForFamily(self, family):
         if family in self.defaultLinkForFamily:
             return self.defaultLinkForFamily[family]
@@ -1224,14 +1240,7 @@ class GUIComponents:
 
     def isDVDataAllNonNegativeIntegers(self):
         if self.hasData():
-            dvData = self.dataDf[self.dv]
-            allIntegers = dvData.dtype.kind == "i" or dvData.dtype.kind == "u"
-            if not allIntegers:
-                dvData = dvData.astype(float)
-                allIntegers = dvData.apply(float.is_integer).all()
-                pass
-            allIntegers = allIntegers and dvData.apply(lambda x: x >= 0).all()
-            return allIntegers
+            return self.getDataSummary(self.dv).get("non-negative integers", False)
         return None
 
     def shouldEnableTypesOfDataControls(self):
@@ -1511,9 +1520,19 @@ class GUIComponents:
         # Generate figure
         fig = go.Figure()
         if self.hasData():
-            fig.add_trace(
-                go.Histogram(x=self.dataDf[self.dv], name=f"{self.dv}", showlegend=True)
-            )
+            # Plot the pre-binned histogram from the data summary
+            histogram = self.getDataSummary(self.dv).get("histogram")
+            if histogram is not None:
+                binEdges = np.array(histogram["bin edges"])
+                fig.add_trace(
+                    go.Bar(
+                        x=(binEdges[:-1] + binEdges[1:]) / 2,
+                        y=histogram["counts"],
+                        width=np.diff(binEdges),
+                        name=f"{self.dv}",
+                        showlegend=True,
+                    )
+                )
         # if family:
         #     key = f"{family}_data"
         #
@@ -1574,9 +1593,9 @@ class GUIComponents:
                 trigger="hover",
             ),
         ]
-        if self.hasData():
+        if self.hasData() and self.getDVData() is not None:
             normalityTestExplanation = self.getDefaultExplanation("normality-tests")
-            dvData = self.dataDf[self.dv].dropna()
+            dvData = self.getDVData().dropna()
             shapiroStat, shapiroPvalue = stats.shapiro(dvData.values)
             normaltestStat, normaltestPvalue = stats.normaltest(dvData.values)
 
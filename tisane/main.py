@@ -20,17 +20,18 @@ from tisane.family_link_inference import (
     generate_family_selection_questions_options,
 )
 from tisane.design import Design
+from tisane.data import Dataset
 from tisane.statistical_model import StatisticalModel
 from tisane.code_generator import *
-from tisane.gui.gui import TisaneGUI
 
 from enum import Enum
-from typing import List, Set, Dict
+from typing import List, Set, Dict, Union
 import copy
 from pathlib import Path
 import os
 from itertools import chain, combinations
 import pandas as pd
+import numpy as np
 import networkx as nx
 import json
 import logging
@@ -157,6 +158,26 @@ def collect_model_candidates(
     return data
 
 
+# Write each numeric column of @param data to its own .npy file in @param output_dir
+# The GUI memory maps these files when it needs the raw values instead of reading them from JSON
+# @returns dict of column name -> path of the .npy file
+def write_data_columns(
+    data: Union[pd.DataFrame, Dataset], output_dir: str
+) -> Dict[str, str]:
+    if isinstance(data, pd.DataFrame):
+        data = Dataset(data)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = dict()
+    for (i, name) in enumerate(data.get_column_names()):
+        vector = data.get_vector(name)
+        if vector.is_numeric():
+            path = Path(output_dir, f"column_{i}.npy")
+            np.save(path, vector.get_values())
+            paths[str(name)] = str(path.resolve())
+
+    return paths
+
+
 # Write data to JSON file specified in @param output_path
 def write_to_json(data: Dict, output_path: str, output_filename: str):
     assert output_filename.endswith(".json")
@@ -181,7 +202,7 @@ def write_to_script(code: str, output_dir: str, output_filename: str):
 
 # @param file is the path to the JSON file from which to construct the statistical model
 def construct_statistical_model(
-    filename: typing.Union[Path],
+    filename: Union[Path],
     query: Design,
     main_effects_candidates: Set[AbstractVariable],
     interaction_effects_candidates: Set[AbstractVariable],
@@ -193,14 +214,33 @@ def construct_statistical_model(
     dir = os.getcwd()
     path = Path(dir, filename)
 
-    gr = query.graph
-
     # Read in JSON file as a dict
     file_data = None
     with open(path, "r") as f:
         file_data = f.read()
     model_dict = json.loads(file_data)  # file_data is a string
 
+    return construct_statistical_model_from_dict(
+        model_dict=model_dict,
+        query=query,
+        main_effects_candidates=main_effects_candidates,
+        interaction_effects_candidates=interaction_effects_candidates,
+        random_effects_candidates=random_effects_candidates,
+        family_link_paired_candidates=family_link_paired_candidates,
+    )
+
+
+# @param model_dict has the same format as the model spec JSON file the GUI outputs
+def construct_statistical_model_from_dict(
+    model_dict: Dict,
+    query: Design,
+    main_effects_candidates: Set[AbstractVariable],
+    interaction_effects_candidates: Set[AbstractVariable],
+    random_effects_candidates: Set[RandomEffect],
+    family_link_paired_candidates: Dict[AbstractFamily, Set[AbstractLink]],
+):
+    gr = query.graph
+
     # Specify dependent variable
     dependent_variable = query.dv
 
@@ -338,41 +378,99 @@ def construct_statistical_model(
     return sm
 
 
-def infer_model(design: Design, jupyter: bool = False):
-    return infer_statistical_model_from_design(design=design, jupyter=jupyter)
+# Candidate effects, family and link functions, and explanations inferred from a Design
+class ModelCandidates(object):
+    design: Design
+    main_effects: Set[AbstractVariable]
+    interaction_effects: Set[AbstractVariable]
+    random_effects: Set[RandomEffect]
+    family_link_paired: Dict[AbstractFamily, Set[AbstractLink]]
+    # effect name -> list of reasons for including it
+    explanations: Dict[str, List[str]]
+    # names of the main effects that are associative intermediaries with the DV
+    associative_intermediaries: List[str]
+
+    def __init__(
+        self,
+        design: Design,
+        main_effects: Set[AbstractVariable],
+        interaction_effects: Set[AbstractVariable],
+        random_effects: Set[RandomEffect],
+        family_link_paired: Dict[AbstractFamily, Set[AbstractLink]],
+        explanations: Dict[str, List[str]],
+        associative_intermediaries: List[str],
+    ):
+        self.design = design
+        self.main_effects = main_effects
+        self.interaction_effects = interaction_effects
+        self.random_effects = random_effects
+        self.family_link_paired = family_link_paired
+        self.explanations = explanations
+        self.associative_intermediaries = associative_intermediaries
+
+    # @returns a Python dict with the candidates, explanations and questions the GUI needs, without the data
+    def to_dict(self) -> Dict:
+        design = self.design
+
+        # Get combined dict
+        combined_dict = collect_model_candidates(
+            query=design,
+            main_effects_candidates=self.main_effects,
+            interaction_effects_candidates=self.interaction_effects,
+            random_effects_candidates=self.random_effects,
+            family_link_paired_candidates=self.family_link_paired,
+        )
 
+        # Add explanations
+        combined_dict["input"]["explanations"] = self.explanations
+        combined_dict["input"][
+            "associative intermediary main effects"
+        ] = self.associative_intermediaries
 
-# @returns statistical model that reflects the study design
-def infer_statistical_model_from_design(design: Design, jupyter: bool = False):
-    """Infer a stats model from design and launch the Tisane GUI.
+        # Add questions for selecting family functions
+        family_link_questions = generate_family_selection_questions_options(
+            dv=design.dv
+        )
+        combined_dict["input"]["types of data"] = family_link_questions
 
-    The Tisane GUI will walk you through making additional
-    choices for your statistical model, all inferred from your
-    original design. After selecting any additional variables as
-    well as a family and link functions, the Tisane GUI will
-    generate code.
+        if isinstance(design.dv, Numeric):
+            combined_dict["input"]["dv type"] = Numeric.__name__
+            pass
+        elif isinstance(design.dv, Ordinal):
+            combined_dict["input"]["dv type"] = Ordinal.__name__
+            pass
+        elif isinstance(design.dv, Nominal):
+            combined_dict["input"]["dv type"] = Nominal.__name__
+
+        return combined_dict
+
+
+# @returns ModelCandidates for @param design
+def infer_model_candidates(design: Design) -> ModelCandidates:
+    """Infer candidate statistical models from design without launching the Tisane GUI.
+
+    Runs the same conceptual checks and inference as
+    infer_statistical_model_from_design, but keeps the results in
+    memory: nothing is written to disk and the GUI is not started.
 
     Parameters
     ----------
     design : Design
-        The study design to infer a statistical model from
-    jupyter : bool, default=False
-        Whether to run the GUI in a plain server or as the output
-        of a jupyter notebook cell.
+        The study design to infer candidate statistical models from
+
+    Returns
+    -------
+    ModelCandidates
+        The candidate main, interaction, and random effects, the
+        family and link function options, and the explanations for
+        each effect
 
     Examples
     --------
 
-    >>> import tisane as ts
-    >>> participant = ts.Unit("participant", cardinality=20)
-    >>> input_device = ts.Unit("input_device", cardinality=2) # The two within-subjects conditions
-    >>> reaction_time = participant.numeric("reaction_time", number_of_instances=input_device)
-    >>> design = ts.Design(dv=reaction_time, ivs=[reaction_time])
-    >>> ts.infer_statistical_model_from_design(design)
-
-    If you want to run the GUI inside of a jupyter notebook, you use:
-
-    >>> ts.infer_statistical_model_from_design(design, jupyter=True)
+    >>> candidates = ts.infer_model_candidates(design)
+    >>> selection = {"main effects": [...], "interaction effects": [], "random effects": {}, "family": "GaussianFamily", "link": "IdentityLink"}
+    >>> sm = ts.construct_statistical_model_from_selection(candidates, selection)
     """
     gr = design.graph
 
@@ -402,7 +500,6 @@ def infer_statistical_model_from_design(design: Design, jupyter: bool = False):
         interaction_effects=interaction_effects_candidates,
     )
     family_candidates = infer_family_functions(query=design)
-    link_candidates = set()
     family_link_paired = dict()
     for f in family_candidates:
         l = infer_link_functions(query=design, family=f)
@@ -428,40 +525,112 @@ def infer_statistical_model_from_design(design: Design, jupyter: bool = False):
     explanations.update(interaction_explanations)
     explanations.update(random_explanations)
 
-    # Get combined dict
-    combined_dict = collect_model_candidates(
+    return ModelCandidates(
+        design=design,
+        main_effects=main_effects_candidates,
+        interaction_effects=interaction_effects_candidates,
+        random_effects=random_effects_candidates,
+        family_link_paired=family_link_paired,
+        explanations=explanations,
+        associative_intermediaries=associative_intermediaries,
+    )
+
+
+# @returns StatisticalModel with the effects, family and link function chosen in @param selection out of @param candidates
+# @param selection has the same format as the model spec JSON file the GUI outputs
+def construct_statistical_model_from_selection(
+    candidates: ModelCandidates, selection: Dict
+) -> StatisticalModel:
+    """Construct the statistical model chosen out of candidates.
+
+    Parameters
+    ----------
+    candidates : ModelCandidates
+        The candidates returned by infer_model_candidates
+    selection : dict
+        The chosen effects, family, and link function, in the same
+        format as the model specification JSON file the Tisane GUI
+        outputs
+
+    Returns
+    -------
+    StatisticalModel
+        The statistical model, with the design's data assigned if
+        the design has data
+    """
+    design = candidates.design
+    sm = construct_statistical_model_from_dict(
+        model_dict=selection,
         query=design,
-        main_effects_candidates=main_effects_candidates,
-        interaction_effects_candidates=interaction_effects_candidates,
-        random_effects_candidates=random_effects_candidates,
-        family_link_paired_candidates=family_link_paired,
+        main_effects_candidates=candidates.main_effects,
+        interaction_effects_candidates=candidates.interaction_effects,
+        random_effects_candidates=candidates.random_effects,
+        family_link_paired_candidates=candidates.family_link_paired,
     )
 
-    # Add explanations
-    combined_dict["input"]["explanations"] = explanations
-    combined_dict["input"][
-        "associative intermediary main effects"
-    ] = associative_intermediaries
-
-    # Add questions for selecting family functions
-    family_link_questions = generate_family_selection_questions_options(dv=design.dv)
-    combined_dict["input"]["types of data"] = family_link_questions
-
-    if isinstance(design.dv, Numeric):
-        combined_dict["input"]["dv type"] = Numeric.__name__
-        pass
-    elif isinstance(design.dv, Ordinal):
-        combined_dict["input"]["dv type"] = Ordinal.__name__
-        pass
-    elif isinstance(design.dv, Nominal):
-        combined_dict["input"]["dv type"] = Nominal.__name__
-
-    # Add data
-    data = design.get_data()
-    if data is not None:
-        combined_dict["input"]["data"] = data.to_dict("list")
+    if design.has_data():
+        # Assign statistical model data from @parm design
+        sm.assign_data(design.dataset)
+
+    return sm
+
+
+def infer_model(design: Design, jupyter: bool = False):
+    return infer_statistical_model_from_design(design=design, jupyter=jupyter)
+
+
+# @returns statistical model that reflects the study design
+def infer_statistical_model_from_design(design: Design, jupyter: bool = False):
+    """Infer a stats model from design and launch the Tisane GUI.
+
+    The Tisane GUI will walk you through making additional
+    choices for your statistical model, all inferred from your
+    original design. After selecting any additional variables as
+    well as a family and link functions, the Tisane GUI will
+    generate code.
+
+    Parameters
+    ----------
+    design : Design
+        The study design to infer a statistical model from
+    jupyter : bool, default=False
+        Whether to run the GUI in a plain server or as the output
+        of a jupyter notebook cell.
+
+    Examples
+    --------
+
+    >>> import tisane as ts
+    >>> participant = ts.Unit("participant", cardinality=20)
+    >>> input_device = ts.Unit("input_device", cardinality=2) # The two within-subjects conditions
+    >>> reaction_time = participant.numeric("reaction_time", number_of_instances=input_device)
+    >>> design = ts.Design(dv=reaction_time, ivs=[reaction_time])
+    >>> ts.infer_statistical_model_from_design(design)
+
+    If you want to run the GUI inside of a jupyter notebook, you use:
+
+    >>> ts.infer_statistical_model_from_design(design, jupyter=True)
+    """
+    from tisane.gui.gui import TisaneGUI
+
+    ### Steps 1 and 2: Conceptual checks and candidate inference
+    candidates = infer_model_candidates(design)
+    combined_dict = candidates.to_dict()
+
+    # Add summaries of the data rather than the data itself
+    # The raw values of numeric columns are written to .npy files next to the JSON file
+    if design.has_data():
+        combined_dict["input"]["data summary"] = design.dataset.get_summary()
+        if design.get_data() is not None:
+            # Shares the encoded columns the summary was made from
+            combined_dict["input"]["data columns"] = write_data_columns(
+                design.dataset, "./input_data/"
+            )
+        else:  # The data is read in chunks and not kept in memory
+            combined_dict["input"]["data columns"] = dict()
     else:  # There is no data
-        combined_dict["input"]["data"] = dict()
+        combined_dict["input"]["data summary"] = dict()
+        combined_dict["input"]["data columns"] = dict()
 
     # Write out to JSON in order to pass data to Tisane GUI for disambiguation
     input_file = "input.json"
@@ -490,10 +659,10 @@ def infer_statistical_model_from_design(design: Design, jupyter: bool = False):
         sm = construct_statistical_model(
             filename=output_filename,
             query=design,
-            main_effects_candidates=main_effects_candidates,
-            interaction_effects_candidates=interaction_effects_candidates,
-            random_effects_candidates=random_effects_candidates,
-            family_link_paired_candidates=family_link_paired,
+            main_effects_candidates=candidates.main_effects,
+            interaction_effects_candidates=candidates.interaction_effects,
+            random_effects_candidates=candidates.random_effects,
+            family_link_paired_candidates=candidates.family_link_paired,
         )
 
         if design.has_data():
@@ -282,17 +282,18 @@ class SetUp(AbstractVariable):
         return self.variable.get_cardinality()
 
     # Estimate the cardinality of a variable by counting the number of unique values in the column of data representing this variable
-    def calculate_cardinality_from_data(self, data: Dataset):
+    # If @param error is not None, approximate the count with a sketch whose relative standard error is about @param error
+    def calculate_cardinality_from_data(self, data: Dataset, error: float = None):
         assert data is not None
-        data = data.dataset[self.name]  # Get data corresponding to this variable
-        unique_values = data.unique()
+        if error is not None:
+            return data.get_cardinality_sketch(self.name, error).estimate()
 
-        return len(unique_values)
+        return data.get_cardinality(self.name)
 
     # Assign cardinalty from data
-    def assign_cardinality_from_data(self, data: Dataset):
+    def assign_cardinality_from_data(self, data: Dataset, error: float = None):
         assert data is not None
-        self.cardinality = self.calculate_cardinality_from_data(data)
+        self.cardinality = self.calculate_cardinality_from_data(data, error=error)
 
 
 class Unit(AbstractVariable):
@@ -576,17 +577,18 @@ class Unit(AbstractVariable):
         return self.cardinality
 
     # Estimate the cardinality of a variable by counting the number of unique values in the column of data representing this variable
-    def calculate_cardinality_from_data(self, data: Dataset):
+    # If @param error is not None, approximate the count with a sketch whose relative standard error is about @param error
+    def calculate_cardinality_from_data(self, data: Dataset, error: float = None):
         assert data is not None
-        data = data.dataset[self.name]  # Get data corresponding to this variable
-        unique_values = data.unique()
+        if error is not None:
+            return data.get_cardinality_sketch(self.name, error).estimate()
 
-        return len(unique_values)
+        return data.get_cardinality(self.name)
 
     # Assign cardinalty from data
-    def assign_cardinality_from_data(self, data: Dataset):
+    def assign_cardinality_from_data(self, data: Dataset, error: float = None):
         assert data is not None
-        self.cardinality = self.calculate_cardinality_from_data(data)
+        self.cardinality = self.calculate_cardinality_from_data(data, error=error)
 
 
 class Measure(AbstractVariable):
@@ -785,60 +787,66 @@ class Nominal(Measure):
         return self.categories
 
     # Estimate the cardinality of a variable by counting the number of unique values in the column of data representing this variable
-    def calculate_cardinality_from_data(self, data: Dataset):
+    # For interactions, counts all possible combinations of the moderators' categories, or only the combinations that occur in the data if @param observed
+    def calculate_cardinality_from_data(self, data: Dataset, observed: bool = False):
         assert data is not None
+        if self.isInteraction and self.moderators and observed:
+            return len(self.calculate_categories_from_data(data, observed=True))
         if self.isInteraction and self.moderators:
             data_cardinality = 1
             for m in self.moderators:
                 if not isinstance(m, Numeric):
-                    moderatorData = data.dataset[m.name]
-                    data_cardinality *= len(moderatorData.unique())
+                    data_cardinality *= len(data.get_unique_values(m.name))
                 pass
             return data_cardinality
-        data = data.dataset[self.name]  # Get data corresponding to this variable
-        unique_values = data.unique()
+        unique_values = data.get_unique_values(self.name)
 
         return len(unique_values)
 
     # Get the number of unique categorical values this nominal variable represents
-    def calculate_categories_from_data(self, data: Dataset) -> List[Any]:
+    # For interactions, @param observed limits the categories to the combinations of the moderators' categories that occur in the data
+    def calculate_categories_from_data(
+        self, data: Dataset, observed: bool = False
+    ) -> List[Any]:
         assert data is not None
 
-        def getUniqueValuesList(name):
-            nameData = data.dataset[name]
-            return map(lambda x: str(x), nameData.unique().tolist())
-
         if self.isInteraction and self.moderators:
-            categories = (
-                getUniqueValuesList(self.moderators[0].name)
-                if not isinstance(self.moderators[0], Numeric)
-                else [""]
-            )
-            if len(self.moderators) > 1:
-                for mod in self.moderators[1:]:
-                    if not isinstance(mod, Numeric):
-                        categories = [
-                            "{}.{}".format(cat1, cat2)
-                            for cat1 in categories
-                            for cat2 in getUniqueValuesList(mod.name)
-                        ]
-                    pass
-            return categories
-
-        data = data.dataset[self.name]  # Get data corresponding to this variable
-        unique_values = data.unique()
+            # Both modes label a category by its non-numeric moderators' values, joined by "."
+            names = [m.name for m in self.moderators if not isinstance(m, Numeric)]
+            if len(names) == 0:
+                return [""]
+            if observed:
+                combinations = data.get_observed_combinations(names).astype(str)
+                categories = combinations[names[0]]
+                for name in names[1:]:
+                    categories = categories + "." + combinations[name]
+                return categories.tolist()
+
+            def getUniqueValuesList(name):
+                return map(lambda x: str(x), data.get_unique_values(name).tolist())
+
+            categories = getUniqueValuesList(names[0])
+            for name in names[1:]:
+                categories = [
+                    "{}.{}".format(cat1, cat2)
+                    for cat1 in categories
+                    for cat2 in getUniqueValuesList(name)
+                ]
+            return list(categories)
+
+        unique_values = data.get_unique_values(self.name)
 
         return unique_values
 
     # Assign cardinalty from data
-    def assign_cardinality_from_data(self, data: Dataset):
+    def assign_cardinality_from_data(self, data: Dataset, observed: bool = False):
         assert data is not None
-        self.cardinality = self.calculate_cardinality_from_data(data)
+        self.cardinality = self.calculate_cardinality_from_data(data, observed=observed)
 
     # Assign categories from data
-    def assign_categories_from_data(self, data: Dataset):
+    def assign_categories_from_data(self, data: Dataset, observed: bool = False):
         assert data is not None
-        self.categories = self.calculate_categories_from_data(data)
+        self.categories = self.calculate_categories_from_data(data, observed=observed)
 
 
 class Ordinal(Measure):
@@ -947,8 +955,7 @@ class Ordinal(Measure):
     # Estimate the cardinality of a variable by counting the number of unique values in the column of data representing this variable
     def calculate_cardinality_from_data(self, data: Dataset):
         assert data is not None
-        data = data.dataset[self.name]  # Get data corresponding to this variable
-        unique_values = data.unique()
+        unique_values = data.get_unique_values(self.name)
 
         return len(unique_values)
 